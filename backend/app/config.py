@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from typing import Dict, List
 from pydantic import BaseSettings
 
 load_dotenv()
@@ -24,9 +25,91 @@ class Settings(BaseSettings):
     
     # OpenAI 설정
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_API_BASE: str = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")  # 로컬 테스트 서버 사용 시 변경
+    OPENAI_MAX_CONNECTIONS: int = 50  # 워커당 연결 풀 최대 연결 수
+    OPENAI_MAX_KEEPALIVE: int = 20  # 워커당 유지할 keep-alive 연결 수
+    OPENAI_MAX_RETRIES: int = 0  # SDK 자체 재시도 (서비스 계층에서 재시도하므로 0)
+    OPENAI_DEFAULT_TIMEOUT: float = 60.0  # 모델별 설정이 없을 때 요청 타임아웃(초)
+    OPENAI_DEFAULT_CONCURRENCY: int = 8  # 모델별 설정이 없을 때 워커당 동시 호출 수
+    OPENAI_MODEL_CONCURRENCY: Dict[str, int] = {"gpt-4-1106-preview": 16, "gpt-3.5-turbo-1106": 32, "whisper-1": 4}
+    OPENAI_MODEL_TIMEOUTS: Dict[str, float] = {"gpt-4-1106-preview": 60.0, "gpt-3.5-turbo-1106": 20.0, "whisper-1": 120.0}
+    
+    # 작업별 모델 등급 라우팅 (등급 호출이 시간 초과/오류면 대체 등급으로 재시도)
+    OPENAI_MODEL_TIERS: Dict[str, str] = {
+        "fast": os.getenv("OPENAI_FAST_MODEL", "gpt-3.5-turbo-1106"),
+        "standard": os.getenv("OPENAI_STANDARD_MODEL", "gpt-4-1106-preview")
+    }
+    OPENAI_TIER_FALLBACKS: Dict[str, List[str]] = {"fast": ["standard"], "standard": ["fast"]}
+    OPENAI_TIER_TIMEOUTS: Dict[str, float] = {"fast": 15.0, "standard": 60.0}
+    OPENAI_HEDGE_DELAYS: Dict[str, float] = {}  # 헤지 요청을 켤 작업별 최소 대기 시간(초), 기본값은 끔
+    OPENAI_HEDGE_QUANTILE: float = 0.95  # 헤지 대기 시간으로 쓸 관측 지연 시간 분위
+    OPENAI_HEDGE_MIN_SAMPLES: int = 50  # 분위수를 믿을 수 있는 최소 관측 수 (모이기 전에는 헤지하지 않음)
+    OPENAI_DEFAULT_TIER: str = "standard"
+    OPENAI_TASK_TIERS: Dict[str, str] = {
+        # 대화 및 콘텐츠 생성은 품질 우선
+        "generate_response": "standard",
+        "stream_response": "standard",
+        "generate_drama_sentences": "standard",
+        "extract_grammar_points": "standard",
+        "generate_test_questions": "standard",
+        "analyze_test_weaknesses": "standard",
+        "generate_reading_content": "standard",
+        "generate_reading_guide": "standard",
+        # 짧고 응답 속도가 중요한 작업
+        "summarize_conversation": "fast",
+        "generate_similar_sentences": "fast",
+        "evaluate_pronunciation": "fast",
+        "analyze_pronunciation_details": "fast",
+        "translate_learning_feedback": "fast"
+    }
+    
+    # GPT 응답 캐시 설정 (메서드별 TTL(초), 목록에 없는 메서드는 캐시하지 않음)
+    GPT_CACHE_TTLS: Dict[str, int] = {
+        "extract_grammar_points": 7 * 24 * 3600,
+        "generate_similar_sentences": 24 * 3600,
+        "generate_reading_guide": 7 * 24 * 3600,
+        "analyze_test_weaknesses": 24 * 3600
+    }
+    RESPONSE_CACHE_LOCAL_MAX_ENTRIES: int = 1024  # 워커당 프로세스 내 LRU 최대 항목 수
+    
+    # GPT 배치 호출 설정 (문장 여러 개를 한 번에 처리하는 메서드)
+    GPT_BATCH_TOKEN_BUDGET: int = 1500  # 배치 하나에 넣을 입력 문장 토큰 수
+    GPT_BATCH_MAX_ITEMS: int = 8  # 배치 하나에 넣을 최대 문장 수 (출력 토큰 한도 고려)
+    GPT_BATCH_CONCURRENCY: int = 4  # 메서드 호출당 동시에 보낼 배치 수
+    
+    # 동시 요청 합치기(single-flight) 설정
+    SINGLE_FLIGHT_LOCK_TTL: int = 120  # 워커 간 락 유지 시간(초), 콘텐츠 생성 최대 소요 시간보다 길게
+    SINGLE_FLIGHT_RESULT_TTL: int = 10  # 다른 워커가 결과를 가져갈 수 있도록 유지하는 시간(초)
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.2  # 다른 워커의 결과 확인 주기(초)
+    
+    # 콘텐츠 풀 설정 ((상품, 레벨, 유형)별 재고, 부족하면 백그라운드에서 생성)
+    CONTENT_POOL_TARGETS: Dict[str, int] = {"drama": 6, "test": 3, "journey": 3}  # 키별 목표 재고
+    CONTENT_POOL_LOW_WATER: Dict[str, int] = {"drama": 3, "test": 1, "journey": 1}  # 이 수보다 적으면 채우기 시작
+    CONTENT_POOL_FRESH_DAYS: int = 7  # 재고로 보는 콘텐츠의 최대 생성 경과 일수
+    CONTENT_POOL_CHECK_INTERVAL: float = 300.0  # 재고 확인 주기(초)
+    CONTENT_POOL_CONCURRENCY: int = 2  # 동시에 채우는 키 수
+    CONTENT_POOL_ENRICH_BATCH: int = 20  # 확인 주기마다 유사 문장/문법 포인트를 채울 드라마 수
+    
+    # Drama 문장 복습 스케줄 설정 (SM-2 간격 반복)
+    DRAMA_BATCH_SIZE: int = 20  # 한 번에 내려주는 문장 수 (복습 예정 문장 우선, 나머지는 새 문장)
+    DRAMA_NEW_SENTENCE_DRAMAS: int = 20  # 새 문장을 고르는 최신 드라마 수
     
     # Google Cloud 설정
     GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "./credentials.json")
+    GOOGLE_TTS_API_ENDPOINT: str = os.getenv("GOOGLE_TTS_API_ENDPOINT", "")  # 지정하면 이 호스트로 REST 호출 (로컬 대역 서버용, 예: localhost:8090)
+    GOOGLE_TRANSLATE_API_BASE: str = os.getenv("GOOGLE_TRANSLATE_API_BASE", "https://translation.googleapis.com/language/translate/v2")  # 로컬 테스트 서버 사용 시 변경
+    GOOGLE_TTS_TIMEOUT: float = 10.0  # TTS 요청 타임아웃(초)
+    GOOGLE_TRANSLATE_TIMEOUT: float = 5.0  # Translate 요청 타임아웃(초)
+    
+    # 외부 호출 복원력 설정 (서킷 브레이커, 요청 시간 예산, 재시도)
+    REQUEST_DEADLINE: float = 30.0  # 요청 하나가 외부 호출에 쓸 수 있는 전체 시간(초)
+    CONTENT_GENERATION_DEADLINE: float = 120.0  # 콘텐츠 생성 작업의 시간 예산(초)
+    BACKGROUND_TASK_DEADLINE: float = 60.0  # 응답 이후 실행하는 백그라운드 작업의 시간 예산(초)
+    RESILIENCE_MAX_RETRIES: int = 1  # 일시적인 오류의 최대 재시도 횟수
+    RESILIENCE_BACKOFF_BASE: float = 0.2  # 재시도 대기 시간 기준값(초, 지수 증가 + 무작위)
+    RESILIENCE_BACKOFF_MAX: float = 2.0  # 재시도 대기 시간 상한(초)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # 서킷을 여는 연속 실패 횟수
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # 서킷이 열린 뒤 시험 호출까지의 시간(초)
     
     # 상품별 사용 제한
     TALK_DAILY_LIMIT: int = 60  # Talk Like You Mean It
@@ -34,6 +117,17 @@ class Settings(BaseSettings):
     TEST_DAILY_LIMIT: int = 20   # Test & Study
     JOURNEY_DAILY_LIMIT: int = 20  # Korean Journey
     
+    # 사용자 프로필/구독 캐시 설정
+    USER_PROFILE_CACHE_TTL: int = 300  # 프로필·활성 상품 스냅샷 캐시 시간(초)
+    
+    # Talk 대화 컨텍스트 설정
+    TALK_CONTEXT_TOKEN_BUDGET: int = 3000  # 프롬프트 토큰 예산
+    TALK_CONTEXT_KEEP_TURNS: int = 6  # 원문 그대로 유지할 최근 턴 수
+    TALK_SUMMARY_BATCH_TURNS: int = 4  # 요약 갱신 시 한 번에 접어 넣을 턴 수
+    TALK_SESSION_TTL: int = 1800  # Redis 활성 세션 유지 시간(초)
+    TALK_SESSION_FLUSH_INTERVAL: float = 2.0  # 활성 세션 MongoDB 저장 주기(초)
+    TALK_SESSION_FLUSH_BATCH: int = 100  # 한 번에 저장할 최대 세션 수
+    
     # 구독 상품 가격 ID
     STRIPE_PRICE_TALK: str = os.getenv("STRIPE_PRICE_TALK", "")
     STRIPE_PRICE_DRAMA: str = os.getenv("STRIPE_PRICE_PHRASE", "")
@@ -4,7 +4,7 @@ Redis 기반 캐시 시스템
 """
 import json
 import logging
-from typing import Any, Optional, Dict
+from typing import Any, Awaitable, Callable, Optional, Dict
 from redis.asyncio import Redis
 
 logger = logging.getLogger(__name__)
@@ -82,6 +82,27 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Cache set error for key '{key}': {e}")
     
+    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = 3600) -> Optional[Any]:
+        """캐시 조회 후 없으면 loader로 불러와 저장 (read-through)
+        
+        Args:
+            key: 캐시 키
+            loader: 캐시 미스 시 값을 불러올 비동기 함수
+            ttl: 만료 시간(초), 기본값 1시간
+            
+        Returns:
+            Any: 캐시된 값 또는 새로 불러온 값 (loader가 None을 반환하면 저장하지 않음)
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        value = await loader()
+        if value is not None:
+            await self.set(key, value, ttl)
+        
+        return value
+    
     async def delete(self, key: str):
         """캐시에서 값 삭제
         
@@ -0,0 +1,105 @@
+"""
+SpitKorean 배치 로더
+요청 안에서 여러 곳이 요청한 문서를 모아 $in 쿼리 한 번으로 조회하는 DataLoader 방식 로더
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, List, Optional
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+logger = logging.getLogger(__name__)
+
+class DataLoader:
+    """요청 단위 배치 로더
+
+    같은 이벤트 루프 차례에 load()로 요청된 키를 모아 컬렉션별 $in 쿼리 한 번으로 조회하고,
+    같은 요청 안에서 반복된 키는 한 번만 조회합니다. 캐시가 요청 동안만 유지되도록 요청마다 새로 만들어 씁니다.
+
+    예:
+        loader = DataLoader(db[Drama.collection_name], {"title": 1, "level": 1})
+        dramas = await loader.load_many([item["dramaId"] for item in progress_list])
+    """
+
+    def __init__(self, collection, projection: Optional[Dict] = None, key_field: str = "_id",
+                 max_batch_size: int = 500):
+        """
+        Args:
+            collection: Motor 컬렉션
+            projection: 조회할 필드 (key_field는 항상 포함)
+            key_field: 조회 키 필드 (기본값: _id)
+            max_batch_size: $in 쿼리 하나에 넣을 최대 키 수
+        """
+        self.collection = collection
+        self.key_field = key_field
+        self.max_batch_size = max_batch_size
+        self.projection = projection
+        if projection and key_field != "_id" and any(projection.values()):
+            self.projection = {**projection, key_field: 1}
+
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._queue: List[Any] = []
+
+    def _normalize(self, key: Any) -> Any:
+        """_id 키는 ObjectId로 변환 (잘못된 ID는 None)"""
+        if self.key_field == "_id" and isinstance(key, str):
+            try:
+                return ObjectId(key)
+            except InvalidId:
+                return None
+        return key
+
+    def load(self, key: Any) -> Awaitable[Optional[Dict]]:
+        """문서 하나 요청 (없으면 None으로 완료)
+
+        Args:
+            key: 조회 키 (_id는 문자열/ObjectId 모두 가능)
+
+        Returns:
+            Awaitable: 문서를 돌려주는 future
+        """
+        loop = asyncio.get_running_loop()
+        key = self._normalize(key)
+
+        if key is None:
+            future = loop.create_future()
+            future.set_result(None)
+            return future
+
+        future = self._futures.get(key)
+        if future is None:
+            future = self._futures[key] = loop.create_future()
+            if not self._queue:
+                # 현재 차례에 요청되는 키를 모두 모은 뒤 조회
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+            self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: List[Any]) -> List[Optional[Dict]]:
+        """여러 문서를 요청 순서대로 조회 (없는 문서는 None)"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _dispatch(self):
+        """모인 키를 배치로 조회해 future 완료"""
+        keys, self._queue = self._queue, []
+
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = keys[start:start + self.max_batch_size]
+            try:
+                cursor = self.collection.find({self.key_field: {"$in": batch}}, self.projection)
+                documents = await cursor.to_list(length=None)
+            except Exception as e:
+                logger.error(f"DataLoader batch on {self.collection.name} failed: {e}")
+                for key in batch:
+                    # 실패한 키는 캐시에서 빼서 다음 load()에서 다시 조회
+                    future = self._futures.pop(key)
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            found = {document.get(self.key_field): document for document in documents}
+            for key in batch:
+                future = self._futures[key]
+                if not future.done():
+                    future.set_result(found.get(key))
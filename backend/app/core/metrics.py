@@ -0,0 +1,242 @@
+"""
+SpitKorean 메트릭
+모델 호출(GPT, Whisper) 지연 시간, 토큰 사용량, 재시도, 캐시 적중 집계 및 요청별 요약
+"""
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 요청 단위로 모델 호출 기록을 모으는 컨텍스트 (요청 밖에서는 None)
+_request_calls: ContextVar[Optional[List[Dict]]] = ContextVar("model_calls", default=None)
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+class Histogram:
+    """라벨별 누적 히스토그램 (Prometheus 텍스트 형식으로 출력)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        """
+        Args:
+            name: 메트릭 이름
+            help_text: 메트릭 설명
+            label_names: 라벨 이름 목록
+            buckets: 버킷 상한값 목록 (오름차순)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[Tuple[str, ...], List[float]] = {}  # 라벨 값 -> [버킷별 개수..., 합계, 개수]
+
+    def observe(self, value: float, *label_values: str):
+        """값 기록"""
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def quantile(self, q: float, *label_values: str) -> Tuple[Optional[float], int]:
+        """분위수 추정 (값이 속한 버킷의 상한값)
+
+        Args:
+            q: 분위 (0-1)
+            *label_values: 라벨 값
+
+        Returns:
+            tuple: (분위수, 관측 개수), 관측이 없거나 마지막 버킷을 넘으면 분위수는 None
+        """
+        series = self.series.get(label_values)
+        if not series or not series[-1]:
+            return None, 0
+        target = q * series[-1]
+        for bound, count in zip(self.buckets, series):
+            if count >= target:
+                return bound, series[-1]
+        return None, series[-1]
+
+    def render(self) -> List[str]:
+        """Prometheus 텍스트 형식 줄 목록"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, label_values))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float, *label_values: str):
+        """값 증가"""
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        """Prometheus 텍스트 형식 줄 목록"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value}")
+        return lines
+
+class ModelMetrics:
+    """모델 호출 메트릭
+
+    워커(프로세스)별로 집계하므로 /metrics는 요청을 받은 워커의 값을 보여줍니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duration = Histogram(
+            "spitkorean_model_call_duration_seconds", "Model call wall time",
+            ("method", "model", "status", "cache"), LATENCY_BUCKETS
+        )
+        self.prompt_tokens = Histogram(
+            "spitkorean_model_prompt_tokens", "Prompt tokens per model call",
+            ("method", "model"), TOKEN_BUCKETS
+        )
+        self.completion_tokens = Histogram(
+            "spitkorean_model_completion_tokens", "Completion tokens per model call",
+            ("method", "model"), TOKEN_BUCKETS
+        )
+        self.tokens_total = Counter(
+            "spitkorean_model_tokens_total", "Total tokens billed",
+            ("method", "model", "kind")
+        )
+        self.retries_total = Counter(
+            "spitkorean_model_retries_total", "Model call retries", ("method",)
+        )
+        self.cache_hits_total = Counter(
+            "spitkorean_model_cache_hits_total", "Model responses served from cache", ("method", "model")
+        )
+
+    def record_call(self, method: str, model: str, duration: float, prompt_tokens: int = 0,
+                    completion_tokens: int = 0, status: str = "ok", cache_hit: bool = False):
+        """모델 호출 1건 기록
+
+        Args:
+            method: 호출한 서비스 메서드 이름
+            model: 모델 이름
+            duration: 소요 시간(초)
+            prompt_tokens: 입력 토큰 수
+            completion_tokens: 출력 토큰 수
+            status: "ok" 또는 "error"
+            cache_hit: 캐시에서 응답했는지 여부
+        """
+        method = method or "unknown"
+        with self._lock:
+            self.duration.observe(duration, method, model, status, "hit" if cache_hit else "miss")
+            if cache_hit:
+                self.cache_hits_total.inc(1, method, model)
+            elif status == "ok" and (prompt_tokens or completion_tokens):
+                self.prompt_tokens.observe(prompt_tokens, method, model)
+                self.completion_tokens.observe(completion_tokens, method, model)
+                self.tokens_total.inc(prompt_tokens, method, model, "prompt")
+                self.tokens_total.inc(completion_tokens, method, model, "completion")
+
+        calls = _request_calls.get()
+        if calls is not None:
+            calls.append({
+                "method": method,
+                "model": model,
+                "duration": duration,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "status": status,
+                "cache_hit": cache_hit
+            })
+
+    def latency_quantile(self, method: str, model: str, q: float) -> Tuple[Optional[float], int]:
+        """성공한 비캐시 호출의 지연 시간 분위수
+
+        Returns:
+            tuple: (분위수(초), 관측 개수)
+        """
+        with self._lock:
+            return self.duration.quantile(q, method, model, "ok", "miss")
+
+    def record_retry(self, method: str):
+        """재시도 1회 기록"""
+        with self._lock:
+            self.retries_total.inc(1, method)
+
+        calls = _request_calls.get()
+        if calls is not None:
+            calls.append({"method": method, "retry": True})
+
+    def render(self) -> str:
+        """전체 메트릭을 Prometheus 텍스트 형식으로 출력"""
+        with self._lock:
+            lines = []
+            for metric in (self.duration, self.prompt_tokens, self.completion_tokens,
+                           self.tokens_total, self.retries_total, self.cache_hits_total):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def start_request(self):
+        """현재 요청의 모델 호출 기록 시작"""
+        _request_calls.set([])
+
+    def request_summary(self) -> Optional[Dict]:
+        """현재 요청의 모델 호출 요약 (모델 호출이 없었으면 None)
+
+        스트리밍 응답은 응답 본문을 보내는 중에 호출이 일어나므로 요약에는 포함되지 않고
+        히스토그램에만 반영됩니다.
+        """
+        calls = _request_calls.get()
+        if not calls:
+            return None
+
+        summary = {
+            "model_calls": 0,
+            "model_time_ms": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "retries": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "methods": {}
+        }
+        for call in calls:
+            per_method = summary["methods"].setdefault(
+                call["method"], {"calls": 0, "time_ms": 0.0, "tokens": 0, "retries": 0}
+            )
+            if call.get("retry"):
+                summary["retries"] += 1
+                per_method["retries"] += 1
+                continue
+
+            duration_ms = call["duration"] * 1000
+            tokens = call["prompt_tokens"] + call["completion_tokens"]
+            summary["model_calls"] += 1
+            summary["model_time_ms"] += duration_ms
+            summary["prompt_tokens"] += call["prompt_tokens"]
+            summary["completion_tokens"] += call["completion_tokens"]
+            summary["cache_hits"] += int(call["cache_hit"])
+            summary["errors"] += int(call["status"] != "ok")
+            per_method["calls"] += 1
+            per_method["time_ms"] = round(per_method["time_ms"] + duration_ms, 1)
+            per_method["tokens"] += tokens
+
+        summary["model_time_ms"] = round(summary["model_time_ms"], 1)
+        return summary
+
+# 프로세스 전체에서 공유하는 인스턴스
+model_metrics = ModelMetrics()
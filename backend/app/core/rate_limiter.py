@@ -55,30 +55,39 @@ class UsageLimiter:
             # 에러 시 기본적으로 허용
             return True
     
-    async def increment_usage(self, user_id: str, product: str):
+    async def increment_usage(self, user_id: str, product: str) -> Optional[int]:
         """사용량 증가
         
         Args:
             user_id: 사용자 ID
             product: 상품명
+            
+        Returns:
+            int: 증가 후 오늘 사용량 (실패 시 None)
         """
         try:
             today = datetime.utcnow().date().isoformat()
             key = f"usage:{user_id}:{product}:{today}"
             
             if self.redis:
-                # Redis 사용
-                await self.redis.incr(key)
-                await self.redis.expire(key, 86400)  # 24시간 후 만료
+                # Redis 사용 (INCR + EXPIRE를 한 번의 왕복으로 처리)
+                pipe = self.redis.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, 86400)  # 24시간 후 만료
+                current_usage, _ = await pipe.execute()
             else:
                 # 메모리 캐시 사용 (개발용)
                 self.fallback_cache[key] = self.fallback_cache.get(key, 0) + 1
+                current_usage = self.fallback_cache[key]
                 logger.warning("Using fallback memory cache for usage increment")
             
             logger.info(f"Usage incremented - User: {user_id}, Product: {product}")
             
+            return int(current_usage)
+            
         except Exception as e:
             logger.error(f"Usage increment error: {e}")
+            return None
     
     async def get_remaining(self, user_id: str, product: str, daily_limit: int) -> int:
         """남은 사용량 조회
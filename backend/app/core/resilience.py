@@ -0,0 +1,256 @@
+"""
+SpitKorean 외부 호출 복원력 계층
+의존 서비스별 서킷 브레이커, 요청 단위 시간 예산, 제한된 재시도, 헤지 요청
+"""
+import asyncio
+import functools
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from app.config import settings
+from app.core.metrics import model_metrics
+
+logger = logging.getLogger(__name__)
+
+# 현재 요청이 외부 호출을 끝내야 하는 시각 (time.monotonic 기준, 요청 밖에서는 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출을 보내지 않음"""
+
+    def __init__(self, message: str = "", retry_after: float = None):
+        super().__init__(message)
+        # 시험 호출이 허용되기까지 남은 시간(초)
+        self.retry_after = retry_after or settings.CIRCUIT_RESET_TIMEOUT
+
+class DeadlineExceededError(Exception):
+    """요청의 시간 예산을 모두 사용함"""
+
+    retry_after = 1.0
+
+# 클라이언트에 503(잠시 후 재시도)으로 알리는 예외
+UNAVAILABLE_ERRORS = (CircuitOpenError, DeadlineExceededError)
+
+def retry_after_seconds(error: BaseException) -> int:
+    """503 응답의 Retry-After 값(초, 최소 1)"""
+    return max(1, int(round(getattr(error, "retry_after", 1.0))))
+
+class CircuitBreaker:
+    """의존 서비스별 서킷 브레이커
+
+    연속 실패가 failure_threshold에 도달하면 열려서 reset_timeout 동안 호출을 즉시 거절합니다.
+    이후 시험 호출 하나만 보내(half-open) 성공하면 닫고, 실패하면 다시 엽니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        """
+        Args:
+            name: 의존 서비스 이름 (예: "openai:gpt-4-1106-preview", "google_tts")
+            failure_threshold: 서킷을 여는 연속 실패 횟수
+            reset_timeout: 열린 뒤 시험 호출을 허용하기까지의 시간(초)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.CIRCUIT_RESET_TIMEOUT
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self) -> bool:
+        """호출을 보내도 되는지 확인 (half-open 상태에서는 시험 호출 하나만 허용)"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self.probing = False
+
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        """호출 성공 기록"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        """호출 실패 기록"""
+        self.probing = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """열린 서킷이 시험 호출을 허용하기까지 남은 시간(초)"""
+        if self.state != self.OPEN:
+            return 1.0
+        return max(1.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def release(self):
+        """결과 없이 끝난 호출(취소 등)의 시험 호출 슬롯 반환"""
+        self.probing = False
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    """의존 서비스 이름별 서킷 브레이커 (프로세스 내 공유)"""
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        breaker = _breakers[dependency] = CircuitBreaker(dependency)
+    return breaker
+
+def start_deadline(seconds: float = None):
+    """현재 요청의 외부 호출 시간 예산 설정
+
+    Args:
+        seconds: 예산(초), 없으면 REQUEST_DEADLINE
+    """
+    _deadline.set(time.monotonic() + (seconds or settings.REQUEST_DEADLINE))
+
+def detached(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """요청이 끝난 뒤 이어서 실행할 백그라운드 작업 래퍼
+
+    add_background_task는 요청의 컨텍스트를 복사하므로 그대로 실행하면 요청의 남은 시간 예산을 물려받습니다.
+    래퍼는 작업 시작 시 BACKGROUND_TASK_DEADLINE으로 예산을 새로 설정합니다 (작업의 컨텍스트 사본에만 적용).
+
+    예:
+        current_app.add_background_task(resilience.detached(_refresh_summary), user_id, session_id, level)
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start_deadline(settings.BACKGROUND_TASK_DEADLINE)
+        return await fn(*args, **kwargs)
+    return wrapper
+
+def remaining_time() -> Optional[float]:
+    """현재 요청의 남은 시간 예산(초), 예산이 없으면 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+async def _hedged(fn: Callable[[float], Awaitable[Any]], timeout: float, delay: float,
+                  gate: Optional[asyncio.Semaphore] = None) -> Any:
+    """첫 호출이 delay 안에 끝나지 않으면 같은 호출을 하나 더 보내고 먼저 성공한 결과 사용
+
+    gate가 있으면 헤지 요청도 그 동시 호출 슬롯을 하나 따로 잡고, 비어 있는 슬롯이 없으면 헤지 없이 첫 호출만 기다립니다.
+    """
+    first = asyncio.ensure_future(fn(timeout))
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        if gate is not None:
+            if gate.locked():
+                return await first
+            await gate.acquire()
+    except BaseException:
+        # 호출한 쪽이 취소되면 asyncio.wait는 첫 호출을 취소하지 않으므로 직접 정리
+        first.cancel()
+        raise
+
+    async def hedge(t: float) -> Any:
+        try:
+            return await fn(t)
+        finally:
+            if gate is not None:
+                gate.release()
+
+    second = asyncio.ensure_future(hedge(max(timeout - delay, 0.1)))
+    pending = {first, second}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def call(dependency: str, fn: Callable[[float], Awaitable[Any]], timeout: float,
+               transient: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, ConnectionError),
+               retries: int = None, hedge_delay: float = None, hedge_gate: asyncio.Semaphore = None,
+               label: str = None) -> Any:
+    """외부 호출 실행
+
+    서킷이 열려 있으면 바로 CircuitOpenError, 요청 시간 예산이 없으면 DeadlineExceededError를 발생시킵니다.
+    타임아웃은 남은 예산을 넘지 않도록 줄이고, 일시적인 오류는 서킷이 닫혀 있고 예산이 남아 있을 때만
+    짧은 지수 백오프로 retries회까지 다시 시도합니다.
+
+    Args:
+        dependency: 의존 서비스 이름 (서킷 브레이커 단위)
+        fn: 타임아웃(초)을 받아 실제 호출을 수행하는 비동기 함수
+        timeout: 호출 타임아웃(초)
+        transient: 재시도/서킷 실패로 취급할 예외 목록
+        retries: 최대 재시도 횟수 (없으면 RESILIENCE_MAX_RETRIES)
+        hedge_delay: 지정하면 이 시간(초) 안에 응답이 없을 때 헤지 요청을 보냄
+        hedge_gate: 헤지 요청이 따로 잡을 동시 호출 세마포어 (빈 슬롯이 없으면 헤지 생략)
+        label: 재시도 메트릭에 기록할 이름
+
+    Returns:
+        Any: fn의 결과
+    """
+    breaker = get_breaker(dependency)
+    retries = settings.RESILIENCE_MAX_RETRIES if retries is None else retries
+    attempt = 0
+
+    while True:
+        budget = remaining_time()
+        if budget is not None and budget <= 0:
+            raise DeadlineExceededError(f"{dependency}: request deadline exceeded")
+        effective_timeout = min(timeout, budget) if budget is not None else timeout
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"{dependency}: circuit open", breaker.retry_after())
+
+        try:
+            if hedge_delay and hedge_delay < effective_timeout:
+                result = await _hedged(fn, effective_timeout, hedge_delay, hedge_gate)
+            else:
+                result = await fn(effective_timeout)
+        except transient as e:
+            breaker.record_failure()
+            backoff = min(settings.RESILIENCE_BACKOFF_MAX,
+                          settings.RESILIENCE_BACKOFF_BASE * 2 ** attempt) * random.random()
+            budget = remaining_time()
+            if (attempt >= retries or breaker.state != CircuitBreaker.CLOSED
+                    or (budget is not None and budget <= backoff)):
+                raise
+            attempt += 1
+            logger.warning(f"{dependency}: {type(e).__name__}, retrying ({attempt}/{retries})")
+            model_metrics.record_retry(label or dependency)
+            await asyncio.sleep(backoff)
+            continue
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            # 잘못된 요청 등은 서비스가 정상 응답한 것이므로 서킷 실패로 세지 않음
+            breaker.record_success()
+            raise
+
+        breaker.record_success()
+        return result
@@ -0,0 +1,124 @@
+"""
+SpitKorean 응답 캐시
+프로세스 내 LRU + Redis 2단계 캐시 (GPT 응답 등 비싼 호출 결과 재사용)
+"""
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """2단계 응답 캐시
+
+    먼저 프로세스 내 LRU를 확인하고, 없으면 Redis를 확인합니다.
+    Redis에서 찾은 값은 LRU에도 올려 같은 워커의 다음 조회는 네트워크 왕복 없이 처리합니다.
+    """
+
+    def __init__(self, namespace: str, redis_client: Optional[Redis] = None,
+                 max_entries: int = None):
+        """
+        Args:
+            namespace: 캐시 키 접두사 (예: "gpt")
+            redis_client: 앱 공유 Redis 클라이언트 (없으면 bind_redis로 연결하기 전까지 워커 내에서만 동작)
+            max_entries: 프로세스 내 LRU 최대 항목 수
+        """
+        self.namespace = namespace
+        self.redis = redis_client
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES
+        self.local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def bind_redis(self, redis_client: Optional[Redis]):
+        """앱 공유 Redis 클라이언트 연결 (앱 시작 시 설정, 연결 풀을 따로 만들지 않음)"""
+        self.redis = redis_client
+
+    async def get_redis(self) -> Optional[Redis]:
+        """Redis 연결 가져오기 (연결되지 않았으면 None)"""
+        return self.redis
+
+    @staticmethod
+    def normalize(value: Any) -> Any:
+        """키 계산용 입력 정규화 - 유니코드 NFC, 앞뒤 공백 제거, 연속 공백 축약"""
+        if isinstance(value, str):
+            return " ".join(unicodedata.normalize("NFC", value).split())
+        if isinstance(value, dict):
+            return {k: ResponseCache.normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [ResponseCache.normalize(v) for v in value]
+        return value
+
+    def make_key(self, *parts: Any) -> str:
+        """입력값의 안정적인 해시로 캐시 키 생성
+
+        Args:
+            *parts: 키에 포함할 값 (메서드, 모델, 파라미터, 입력 등)
+
+        Returns:
+            str: "{namespace}:{sha256}" 형태의 키
+        """
+        payload = json.dumps(self.normalize(list(parts)), ensure_ascii=False,
+                             sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """캐시 조회
+
+        Args:
+            key: make_key로 만든 캐시 키
+
+        Returns:
+            Any: 캐시된 값, 없으면 None
+        """
+        entry = self.local.get(key)
+        if entry:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self.local.move_to_end(key)
+                return value
+            self.local.pop(key, None)
+
+        try:
+            redis = await self.get_redis()
+            if redis:
+                raw = await redis.get(key)
+                if raw:
+                    value = json.loads(raw)
+                    ttl = await redis.ttl(key)
+                    self._set_local(key, value, ttl if ttl and ttl > 0 else 60)
+                    return value
+        except Exception as e:
+            logger.error(f"Response cache get error for key '{key}': {e}")
+
+        return None
+
+    async def set(self, key: str, value: Any, ttl: int):
+        """캐시 저장
+
+        Args:
+            key: make_key로 만든 캐시 키
+            value: JSON 직렬화 가능한 값
+            ttl: 만료 시간(초)
+        """
+        self._set_local(key, value, ttl)
+
+        try:
+            redis = await self.get_redis()
+            if redis:
+                await redis.set(key, json.dumps(value, ensure_ascii=False), ex=ttl)
+        except Exception as e:
+            logger.error(f"Response cache set error for key '{key}': {e}")
+
+    def _set_local(self, key: str, value: Any, ttl: int):
+        """프로세스 내 LRU 저장 (가장 오래 사용되지 않은 항목부터 제거)"""
+        self.local[key] = (time.monotonic() + ttl, value)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_entries:
+            self.local.popitem(last=False)
@@ -0,0 +1,346 @@
+"""
+SpitKorean 대화 세션 저장소
+Redis에 활성 세션을 보관하고 MongoDB에는 백그라운드에서 일괄 저장(write-behind)
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from app.config import settings
+from app.models.chat import Chat
+
+logger = logging.getLogger(__name__)
+
+class SessionStore:
+    """Redis 기반 활성 대화 세션 저장소
+
+    세션마다 다음 키를 사용합니다.
+        talk:session:{user_id}:{session_id}  최근 메시지, 레벨, 요약, 메시지 수 (TTL 적용)
+        talk:pending:{user_id}:{session_id}  아직 MongoDB에 저장되지 않은 메시지 (flush 전까지 유지)
+        talk:dirty                           저장 대기 중인 세션 목록
+
+    Redis가 없으면 모든 읽기/쓰기를 MongoDB로 바로 처리합니다.
+    """
+
+    DIRTY_KEY = "talk:dirty"
+    MAX_WATCH_RETRIES = 5  # 같은 세션을 동시에 갱신해 트랜잭션이 취소됐을 때 다시 시도하는 횟수
+
+    def __init__(self, redis_client: Optional[Redis] = None, db=None,
+                 window: int = None, ttl: int = None,
+                 flush_interval: float = None, flush_batch: int = None):
+        """
+        Args:
+            redis_client: Redis 클라이언트 인스턴스
+            db: Talk MongoDB 데이터베이스 연결
+            window: 세션별로 Redis에 유지할 최근 메시지 수
+            ttl: 활성 세션 유지 시간(초)
+            flush_interval: MongoDB 저장 주기(초)
+            flush_batch: 한 번에 저장할 최대 세션 수
+        """
+        self.redis = redis_client
+        self.db = db
+        self.window = window or (settings.TALK_CONTEXT_KEEP_TURNS + settings.TALK_SUMMARY_BATCH_TURNS) * 2
+        self.ttl = ttl or settings.TALK_SESSION_TTL
+        self.flush_interval = flush_interval or settings.TALK_SESSION_FLUSH_INTERVAL
+        self.flush_batch = flush_batch or settings.TALK_SESSION_FLUSH_BATCH
+        self.is_flushing = False
+
+    @staticmethod
+    def _member(user_id: str, session_id: str) -> str:
+        return f"{user_id}:{session_id}"
+
+    @staticmethod
+    def _session_key(member: str) -> str:
+        return f"talk:session:{member}"
+
+    @staticmethod
+    def _pending_key(member: str) -> str:
+        return f"talk:pending:{member}"
+
+    @staticmethod
+    def _dumps(value) -> str:
+        """datetime을 보존하도록 직렬화"""
+        def default(obj):
+            if isinstance(obj, datetime):
+                return {"$date": obj.isoformat()}
+            return str(obj)
+        return json.dumps(value, ensure_ascii=False, default=default)
+
+    @staticmethod
+    def _loads(raw):
+        """_dumps로 직렬화한 값 복원"""
+        def object_hook(obj):
+            if len(obj) == 1 and "$date" in obj:
+                return datetime.fromisoformat(obj["$date"])
+            return obj
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return json.loads(raw, object_hook=object_hook)
+
+    async def _modify_context(self, member: str, modify: Callable[[Optional[Dict]], Optional[Dict]],
+                              extra: Callable = None):
+        """활성 세션 컨텍스트를 WATCH/MULTI로 원자적으로 갱신
+
+        읽은 뒤 저장하기 전에 다른 요청(새 턴, 백그라운드 요약 갱신)이 같은 세션을 바꾸면
+        트랜잭션이 취소되므로 다시 읽어서 적용합니다.
+
+        Args:
+            member: 세션 멤버 ({user_id}:{session_id})
+            modify: 현재 컨텍스트(없으면 None)를 받아 저장할 컨텍스트를 반환 (None이면 저장하지 않음)
+            extra: 같은 트랜잭션에서 실행할 명령을 파이프라인에 추가하는 함수 (선택적)
+
+        Raises:
+            WatchError: MAX_WATCH_RETRIES번 모두 동시 갱신과 충돌한 경우
+        """
+        key = self._session_key(member)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for _ in range(self.MAX_WATCH_RETRIES):
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    context = modify(self._loads(raw) if raw else None)
+                    pipe.multi()
+                    if extra:
+                        extra(pipe)
+                    if context is not None:
+                        pipe.set(key, self._dumps(context), ex=self.ttl)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+        raise WatchError(f"Session {member} changed concurrently {self.MAX_WATCH_RETRIES} times")
+
+    async def get_context(self, session_id: str, user_id: str, limit: int) -> Optional[Dict]:
+        """프롬프트 구성용 세션 컨텍스트 조회 (Chat.get_context와 같은 형태)
+
+        Redis에 없으면 MongoDB에서 불러오고, 아직 저장되지 않은 메시지를 합쳐 Redis에 다시 올립니다.
+
+        Args:
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            limit: 가져올 최근 메시지 수
+
+        Returns:
+            dict: messages, level, messageCount, summary, summarizedCount 또는 None
+        """
+        if not self.redis:
+            return await Chat.get_context(self.db, session_id, user_id, limit)
+
+        member = self._member(user_id, session_id)
+        try:
+            raw = await self.redis.get(self._session_key(member))
+            if raw:
+                context = self._loads(raw)
+                context["messages"] = context.get("messages", [])[-limit:]
+                return context
+        except Exception as e:
+            logger.error(f"Session store get error: {e}")
+            return await Chat.get_context(self.db, session_id, user_id, limit)
+
+        # 캐시 미스: MongoDB + 저장 대기 메시지로 복원
+        context = await Chat.get_context(self.db, session_id, user_id, max(limit, self.window))
+        try:
+            pending = await self.redis.lrange(self._pending_key(member), 0, -1)
+            pending_messages = []
+            for entry in pending:
+                pending_messages.extend(self._loads(entry).get("messages", []))
+
+            if not context and not pending_messages:
+                return None
+
+            context = dict(context or {})
+            context.pop("_id", None)
+            stored_messages = context.get("messages", [])
+            stored_count = context.get("messageCount") or len(stored_messages)
+            context["messages"] = (stored_messages + pending_messages)[-self.window:]
+            context["messageCount"] = stored_count + len(pending_messages)
+
+            # 그사이 다른 요청이 세션을 올렸으면 그쪽이 최신이므로 덮어쓰지 않음
+            await self.redis.set(self._session_key(member), self._dumps(context), ex=self.ttl, nx=True)
+        except Exception as e:
+            logger.error(f"Session store reload error: {e}")
+
+        if context:
+            context["messages"] = context.get("messages", [])[-limit:]
+        return context
+
+    async def append_messages(self, session_id: str, user_id: str, messages: List[Dict],
+                              level: str = "beginner", previous_count: int = 0) -> bool:
+        """세션에 메시지 추가
+
+        Redis의 활성 세션을 갱신하고 저장 대기 목록에 넣으면 바로 반환합니다.
+        MongoDB 저장은 flush에서 일괄 처리됩니다.
+
+        Args:
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            messages: 추가할 메시지 목록
+            level: 한국어 레벨 (새 세션 생성 시 사용)
+            previous_count: 추가 전 세션 메시지 수 (0이면 새 세션으로 간주)
+
+        Returns:
+            bool: 추가 성공 여부
+        """
+        if not self.redis:
+            return await Chat.append_messages(self.db, session_id, user_id, messages, level)
+
+        member = self._member(user_id, session_id)
+
+        def modify(context):
+            if context is None:
+                if previous_count:
+                    # 기존 세션인데 Redis에서 만료된 경우에는 다음 조회 때 MongoDB에서 복원
+                    return None
+                context = {"messages": [], "level": level, "messageCount": 0,
+                           "summary": None, "summarizedCount": 0}
+            context["messages"] = (context.get("messages", []) + messages)[-self.window:]
+            context["messageCount"] = context.get("messageCount", 0) + len(messages)
+            return context
+
+        def enqueue(pipe):
+            pipe.rpush(self._pending_key(member), self._dumps({"messages": messages, "level": level}))
+            pipe.sadd(self.DIRTY_KEY, member)
+
+        try:
+            await self._modify_context(member, modify, enqueue)
+            return True
+        except Exception as e:
+            logger.error(f"Session store append error, writing through: {e}")
+            return await Chat.append_messages(self.db, session_id, user_id, messages, level)
+
+    async def update_summary(self, session_id: str, user_id: str, summary: str, summarized_count: int):
+        """활성 세션의 요약 반영
+
+        Args:
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            summary: 새 요약 텍스트
+            summarized_count: 요약에 포함된 메시지 수
+        """
+        if not self.redis:
+            return
+
+        def modify(context):
+            # 더 많은 턴을 접어 넣은 요약이 이미 저장됐으면 늦게 끝난 이전 요약으로 덮어쓰지 않음
+            if context is None or context.get("summarizedCount", 0) > summarized_count:
+                return None
+            context["summary"] = summary
+            context["summarizedCount"] = summarized_count
+            return context
+
+        try:
+            await self._modify_context(self._member(user_id, session_id), modify)
+        except Exception as e:
+            logger.error(f"Session store summary update error: {e}")
+
+    async def flush_session(self, session_id: str, user_id: str):
+        """특정 세션의 저장 대기 메시지를 즉시 MongoDB에 저장
+
+        Args:
+            session_id: 세션 ID
+            user_id: 사용자 ID
+        """
+        if not self.redis:
+            return
+        await self._flush_members([self._member(user_id, session_id)])
+
+    async def flush(self) -> int:
+        """저장 대기 중인 세션을 최대 flush_batch개까지 MongoDB에 일괄 저장
+
+        Returns:
+            int: 처리한 세션 수
+        """
+        if not self.redis:
+            return 0
+
+        members = await self.redis.spop(self.DIRTY_KEY, self.flush_batch)
+        if not members:
+            return 0
+        members = [m.decode("utf-8") if isinstance(m, bytes) else m for m in members]
+        await self._flush_members(members)
+        return len(members)
+
+    async def _flush_members(self, members: List[str]) -> int:
+        """세션별 저장 대기 메시지를 꺼내 bulk_write로 저장
+
+        저장에 실패하면 꺼낸 메시지를 순서대로 되돌려 놓고 예외를 다시 발생시킵니다.
+        """
+        entries = []
+        drained = []
+
+        for member in members:
+            pending_key = self._pending_key(member)
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.lrange(pending_key, 0, -1)
+            pipe.delete(pending_key)
+            raw_entries, _ = await pipe.execute()
+            if not raw_entries:
+                continue
+
+            user_id, session_id = member.split(":", 1)
+            messages = []
+            level = "beginner"
+            for raw in raw_entries:
+                entry = self._loads(raw)
+                messages.extend(entry.get("messages", []))
+                level = entry.get("level", level)
+
+            entries.append((session_id, user_id, messages, level))
+            drained.append((member, raw_entries))
+
+        if not entries:
+            return 0
+
+        try:
+            return await Chat.bulk_append(self.db, entries)
+        except Exception as e:
+            logger.error(f"Session store flush error: {e}")
+            # 다음 flush에서 다시 시도하도록 순서를 유지해 되돌림
+            pipe = self.redis.pipeline()
+            for member, raw_entries in drained:
+                pipe.lpush(self._pending_key(member), *reversed(raw_entries))
+                pipe.sadd(self.DIRTY_KEY, member)
+            await pipe.execute()
+            raise
+
+    async def start_flusher(self):
+        """주기적 MongoDB 저장 시작 (백그라운드 태스크)"""
+        if not self.redis:
+            logger.warning("Redis not available, session flusher not started")
+            return
+
+        if self.is_flushing:
+            logger.warning("Session flusher already running")
+            return
+
+        self.is_flushing = True
+        logger.info("Session flusher started")
+
+        while self.is_flushing:
+            try:
+                flushed = await self.flush()
+                if flushed >= self.flush_batch:
+                    # 밀린 세션이 남아 있으면 바로 다음 배치 처리
+                    continue
+            except Exception as e:
+                logger.error(f"Session flusher error: {e}")
+            await asyncio.sleep(self.flush_interval)
+
+        logger.info("Session flusher stopped")
+
+    async def stop_flusher(self):
+        """주기적 저장 중지 후 남은 세션 모두 저장"""
+        self.is_flushing = False
+        if not self.redis:
+            return
+
+        try:
+            while await self.flush():
+                pass
+        except Exception as e:
+            logger.error(f"Session final flush error: {e}")
+        logger.info("Session flusher stop requested")
@@ -0,0 +1,140 @@
+"""
+SpitKorean single-flight
+같은 키로 동시에 들어온 요청을 하나의 실행으로 합치고 결과를 공유 (워커 내 + Redis 락으로 워커 간)
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 락 소유자만 락을 해제하도록 하는 스크립트
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+else
+    return 0
+end
+"""
+
+class SingleFlight:
+    """동시 요청 합치기
+
+    같은 워커 안에서는 진행 중인 태스크를 그대로 기다리고,
+    다른 워커와는 Redis 락으로 실행할 워커 하나를 정한 뒤 나머지는 결과 키를 기다립니다.
+    Redis가 없거나 오류가 나면 워커 내 합치기만 동작합니다.
+    결과는 워커 간에 공유되도록 JSON 직렬화 가능해야 합니다.
+    """
+
+    def __init__(self, namespace: str, redis_client: Optional[Redis] = None,
+                 lock_ttl: int = None, result_ttl: int = None, poll_interval: float = None):
+        """
+        Args:
+            namespace: 락/결과 키 접두사 (예: "gpt")
+            redis_client: 앱 공유 Redis 클라이언트 (없으면 bind_redis로 연결하기 전까지 워커 내에서만 동작)
+            lock_ttl: 락 유지 시간(초) - 실행이 이보다 오래 걸리면 다른 워커도 실행을 시작
+            result_ttl: 다른 워커가 결과를 가져갈 수 있도록 유지하는 시간(초)
+            poll_interval: 다른 워커의 결과를 확인하는 주기(초)
+        """
+        self.namespace = namespace
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl or settings.SINGLE_FLIGHT_LOCK_TTL
+        self.result_ttl = result_ttl or settings.SINGLE_FLIGHT_RESULT_TTL
+        self.poll_interval = poll_interval or settings.SINGLE_FLIGHT_POLL_INTERVAL
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+    def bind_redis(self, redis_client: Optional[Redis]):
+        """앱 공유 Redis 클라이언트 연결 (앱 시작 시 설정, 연결 풀을 따로 만들지 않음)"""
+        self.redis = redis_client
+
+    async def get_redis(self) -> Optional[Redis]:
+        """Redis 연결 가져오기 (연결되지 않았으면 None)"""
+        return self.redis
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key가 같은 동시 호출을 한 번의 fn 실행으로 합쳐 결과 반환
+
+        Args:
+            key: 요청 키 (같은 요청이면 같은 키)
+            fn: 실제 작업을 수행하는 비동기 함수
+
+        Returns:
+            Any: fn의 결과 (동시에 호출한 모든 호출자가 같은 결과를 받음)
+        """
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            logger.debug(f"Single-flight joined in-process call: {key}")
+
+        # 한 호출자가 취소되어도 다른 호출자가 기다리는 실행은 계속되도록 보호
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """워커 간 합치기 - 락을 잡은 워커만 실행하고 나머지는 결과를 기다림"""
+        try:
+            redis = await self.get_redis()
+        except Exception as e:
+            logger.error(f"Single-flight redis unavailable: {e}")
+            redis = None
+
+        if not redis:
+            return await fn()
+
+        lock_key = f"singleflight:{self.namespace}:lock:{key}"
+        result_key = f"singleflight:{self.namespace}:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+
+        while True:
+            try:
+                acquired = await redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+            except Exception as e:
+                logger.error(f"Single-flight lock error for '{key}': {e}")
+                return await fn()
+
+            if acquired:
+                return await self._lead(redis, lock_key, result_key, token, fn)
+
+            # 다른 워커가 실행 중 - 결과가 나오거나 락이 풀릴 때까지 대기
+            try:
+                while time.monotonic() < deadline:
+                    raw = await redis.get(result_key)
+                    if raw:
+                        logger.debug(f"Single-flight joined cross-worker call: {key}")
+                        return json.loads(raw)
+                    if not await redis.exists(lock_key):
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    logger.warning(f"Single-flight wait timed out for '{key}', running locally")
+                    return await fn()
+            except Exception as e:
+                logger.error(f"Single-flight wait error for '{key}': {e}")
+                return await fn()
+            # 락이 결과 없이 풀렸으면(실행 실패) 다시 락을 잡아 직접 실행
+
+    async def _lead(self, redis: Redis, lock_key: str, result_key: str, token: str,
+                    fn: Callable[[], Awaitable[Any]]) -> Any:
+        """락을 잡은 워커에서 실행하고 결과를 공유"""
+        try:
+            result = await fn()
+            try:
+                await redis.set(result_key, json.dumps(result, ensure_ascii=False, default=str),
+                                ex=self.result_ttl)
+            except Exception as e:
+                logger.error(f"Single-flight result publish error: {e}")
+            return result
+        finally:
+            try:
+                await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.error(f"Single-flight lock release error: {e}")
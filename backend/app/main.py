@@ -1,7 +1,8 @@
-from quart import Quart, jsonify
+from quart import Quart, jsonify, request, g, Response
 from motor.motor_asyncio import AsyncIOMotorClient
 from redis.asyncio import Redis  # aioredis 대신 redis.asyncio 사용
 import os
+import time
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -9,6 +10,15 @@ from app.core.auth import AuthManager
 from app.core.rate_limiter import UsageLimiter
 from app.core.cache_manager import CacheManager
 from app.core.event_bus import EventBus
+from app.core.session_store import SessionStore
+from app.core.metrics import model_metrics
+from app.core import resilience
+from app.utils.logger import LogManager
+from app.services.openai_client import openai_registry
+from app.services.gpt_service import gpt_response_cache, gpt_single_flight
+from app.models.chat import Chat
+from app.models.drama import Drama
+from app.services.content_pool import ContentPool
 
 from app.routes.auth import auth_routes
 from app.routes.talk import talk_routes
@@ -21,6 +31,7 @@ from app.routes.translation import translation_routes
 load_dotenv()
 
 app = Quart(__name__)
+request_logger = LogManager("spitkorean.requests")
 
 # 환경 변수
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "your-secret-key")
@@ -55,7 +66,13 @@ async def setup_clients():
         app.auth_manager = AuthManager(app.config["SECRET_KEY"])
         app.usage_limiter = UsageLimiter(app.redis_client)
         app.cache_manager = CacheManager(app.redis_client)
+        gpt_response_cache.bind_redis(app.redis_client)
+        gpt_single_flight.bind_redis(app.redis_client)
         app.event_bus = EventBus(app.redis_client)
+        app.session_store = SessionStore(
+            app.redis_client,
+            app.mongo_client[os.getenv("MONGO_DB_TALK", "spitkorean_talk")]
+        )
         
         # 데이터베이스 연결 테스트
         try:
@@ -65,6 +82,21 @@ async def setup_clients():
             print(f"❌ MongoDB connection failed: {e}")
             raise
         
+        # 컬렉션 인덱스 생성 (인덱스별 실패는 모델 로거에 기록하고 나머지는 계속 생성)
+        failed_indexes = await Chat.ensure_indexes(app.mongo_client[os.getenv("MONGO_DB_TALK", "spitkorean_talk")])
+        failed_indexes += await Drama.ensure_indexes(
+            app.mongo_client[os.getenv("MONGO_DB_DRAMA", "spitkorean_drama")], gpt_single_flight
+        )
+        if failed_indexes:
+            print(f"⚠️ {failed_indexes} MongoDB indexes could not be created (see logs)")
+        else:
+            print("✅ MongoDB indexes ensured")
+        
+        # 콘텐츠 풀 (요청은 풀에서 읽기만 하고 생성은 백그라운드에서 처리)
+        app.content_pool = ContentPool(app.mongo_client)
+        app.add_background_task(app.content_pool.start_worker)
+        print("✅ Content pool worker started")
+        
         # 이벤트 버스 백그라운드 리스너 시작 (수정됨)
         if app.redis_client:
             # Redis가 있을 때만 이벤트 리스너 시작
@@ -73,6 +105,11 @@ async def setup_clients():
         else:
             print("⚠️ Event bus listener not started (Redis not available)")
         
+        # 활성 대화 세션 MongoDB 저장(write-behind) 시작
+        if app.redis_client:
+            app.add_background_task(app.session_store.start_flusher)
+            print("✅ Session flusher started")
+        
         print("🚀 SpitKorean application initialized successfully!")
         
     except Exception as e:
@@ -89,6 +126,20 @@ async def cleanup_clients():
             await app.event_bus.stop_listener()
             print("✅ Event bus listener stopped")
         
+        # 활성 대화 세션 저장 중지 및 남은 메시지 저장
+        if hasattr(app, 'session_store'):
+            await app.session_store.stop_flusher()
+            print("✅ Session store flushed")
+        
+        # 콘텐츠 풀 채우기 중지
+        if hasattr(app, 'content_pool'):
+            await app.content_pool.stop_worker()
+            print("✅ Content pool worker stopped")
+        
+        # OpenAI 연결 풀 정리
+        await openai_registry.close()
+        print("✅ OpenAI client closed")
+        
         # Redis 연결 종료
         if hasattr(app, 'redis_client') and app.redis_client:
             await app.redis_client.close()
@@ -123,6 +174,16 @@ async def not_found(error):
         "error_type": "not_found"
     }, 404
 
+@app.errorhandler(resilience.CircuitOpenError)
+@app.errorhandler(resilience.DeadlineExceededError)
+async def dependency_unavailable(error):
+    """외부 서비스 장애/시간 예산 초과 핸들러"""
+    return {
+        "status": "error",
+        "message": "외부 서비스가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요",
+        "error_type": "service_unavailable"
+    }, 503, {"Retry-After": str(resilience.retry_after_seconds(error))}
+
 @app.errorhandler(401)
 async def unauthorized(error):
     """401 에러 핸들러"""
@@ -132,6 +193,27 @@ async def unauthorized(error):
         "error_type": "unauthorized"
     }, 401
         
+# 요청별 모델 호출 요약 로깅 및 외부 호출 시간 예산 설정
+@app.before_request
+async def start_request_metrics():
+    g.request_started = time.perf_counter()
+    model_metrics.start_request()
+    resilience.start_deadline()
+
+@app.after_request
+async def log_request_metrics(response):
+    summary = model_metrics.request_summary()
+    if summary:
+        summary.update({
+            "method": request.method,
+            "path": request.path,
+            "status_code": response.status_code,
+            "user_id": getattr(request, "user_id", None),
+            "duration_ms": round((time.perf_counter() - g.request_started) * 1000, 1)
+        })
+        request_logger.info("Model usage", summary)
+    return response
+
 # CORS 설정
 @app.after_request
 async def add_cors_headers(response):
@@ -164,5 +246,10 @@ async def index():
 async def health():
     return jsonify({"status": "healthy"})
 
+# 모델 호출 메트릭 (Prometheus 텍스트 형식, 워커별 값)
+@app.route("/metrics")
+async def metrics():
+    return Response(model_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     app.run(debug=os.getenv("FLASK_ENV") == "development", host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
\ No newline at end of file
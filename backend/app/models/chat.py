@@ -1,5 +1,10 @@
+import base64
+import logging
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
 
 class Chat:
     """대화 모델 - Talk Like You Mean It 서비스를 위한 모델"""
@@ -44,6 +49,7 @@ class Chat:
             "userId": user_id,
             "sessionId": chat.session_id,
             "messages": [],
+            "messageCount": 0,
             "level": level,
             "date": chat.date,
             "created_at": chat.created_at,
@@ -82,11 +88,261 @@ class Chat:
             {"sessionId": session_id, "userId": user_id},
             {
                 "$push": {"messages": message},
+                "$inc": {"messageCount": 1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
         return result.modified_count > 0
     
+    @classmethod
+    async def append_messages(cls, db, session_id, user_id, messages, level="beginner"):
+        """메시지 추가 (append-only)
+        
+        세션 문서 전체를 다시 쓰지 않고 $push/$each로 새 메시지만 추가합니다.
+        세션이 없으면 upsert로 생성하므로 새 세션과 기존 세션 모두 한 번의 왕복으로 처리되며,
+        동시에 들어온 턴끼리 메시지를 덮어쓰지 않습니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            messages: 추가할 메시지 목록
+            level: 한국어 레벨 (새 세션 생성 시 사용)
+            
+        Returns:
+            bool: 추가 성공 여부
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        result = await db[cls.collection_name].update_one(
+            {"sessionId": session_id, "userId": user_id},
+            cls._append_update(messages, level),
+            upsert=True
+        )
+        return result.acknowledged
+    
+    @classmethod
+    async def bulk_append(cls, db, entries):
+        """여러 세션의 메시지를 한 번의 bulk_write로 추가
+        
+        Args:
+            db: 데이터베이스 연결
+            entries: (session_id, user_id, messages, level) 튜플 목록
+            
+        Returns:
+            int: 반영된 세션 수
+        """
+        operations = []
+        for session_id, user_id, messages, level in entries:
+            if not messages:
+                continue
+            if isinstance(user_id, str):
+                user_id = ObjectId(user_id)
+            operations.append(UpdateOne(
+                {"sessionId": session_id, "userId": user_id},
+                cls._append_update(messages, level),
+                upsert=True
+            ))
+        
+        if not operations:
+            return 0
+        
+        await db[cls.collection_name].bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    @classmethod
+    def _append_update(cls, messages, level):
+        """메시지 추가용 업데이트 문서 생성"""
+        now = datetime.utcnow()
+        return {
+            "$push": {"messages": {"$each": messages}},
+            "$inc": {"messageCount": len(messages)},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {
+                "level": level,
+                "date": now,
+                "created_at": now
+            }
+        }
+    
+    @classmethod
+    async def get_recent_messages(cls, db, session_id, user_id, limit=20):
+        """최근 메시지만 조회
+        
+        $slice 프로젝션으로 프롬프트에 필요한 최근 구간만 가져오므로
+        세션 길이와 관계없이 조회 크기가 일정합니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            limit: 가져올 최근 메시지 수 (기본값: 20)
+            
+        Returns:
+            list: 최근 메시지 목록 (오래된 순)
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        session = await db[cls.collection_name].find_one(
+            {"sessionId": session_id, "userId": user_id},
+            {"messages": {"$slice": -limit}, "level": 1, "messageCount": 1}
+        )
+        if not session:
+            return []
+        return session.get("messages", [])
+    
+    @classmethod
+    async def get_context(cls, db, session_id, user_id, limit=20):
+        """프롬프트 구성용 세션 컨텍스트 조회
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            limit: 가져올 최근 메시지 수 (기본값: 20)
+            
+        Returns:
+            dict: 최근 메시지, 요약(summary), 요약된 메시지 수(summarizedCount), 전체 메시지 수 또는 None
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        return await db[cls.collection_name].find_one(
+            {"sessionId": session_id, "userId": user_id},
+            {
+                "messages": {"$slice": -limit},
+                "level": 1,
+                "messageCount": 1,
+                "summary": 1,
+                "summarizedCount": 1
+            }
+        )
+    
+    @classmethod
+    async def get_summary_state(cls, db, session_id, user_id):
+        """요약 상태 조회
+        
+        messageCount 필드가 없는 이전 세션도 정확히 처리하도록 배열 크기를 서버에서 계산합니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            
+        Returns:
+            dict: messageCount, summary, summarizedCount 또는 None
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        pipeline = [
+            {"$match": {"sessionId": session_id, "userId": user_id}},
+            {"$project": {
+                "_id": 0,
+                "messageCount": {"$size": {"$ifNull": ["$messages", []]}},
+                "summary": {"$ifNull": ["$summary", ""]},
+                "summarizedCount": {"$ifNull": ["$summarizedCount", 0]}
+            }}
+        ]
+        result = await db[cls.collection_name].aggregate(pipeline).to_list(length=1)
+        return result[0] if result else None
+    
+    @classmethod
+    async def get_message_range(cls, db, session_id, user_id, skip, limit):
+        """특정 구간의 메시지 조회
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            skip: 시작 인덱스
+            limit: 가져올 메시지 수
+            
+        Returns:
+            list: 메시지 목록
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        if limit <= 0:
+            return []
+        
+        session = await db[cls.collection_name].find_one(
+            {"sessionId": session_id, "userId": user_id},
+            {"messages": {"$slice": [skip, limit]}}
+        )
+        if not session:
+            return []
+        return session.get("messages", [])
+    
+    @classmethod
+    async def update_summary(cls, db, session_id, user_id, summary, summarized_count, previous_count=0, message_count=0):
+        """대화 요약 갱신
+        
+        다른 작업이 먼저 요약을 갱신한 경우 덮어쓰지 않도록 이전 summarizedCount를 조건으로 사용합니다.
+        messageCount 필드가 없던 이전 세션은 실제 메시지 수로 보정합니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            summary: 새 요약 텍스트
+            summarized_count: 요약에 포함된 메시지 수
+            previous_count: 갱신 전 summarizedCount
+            message_count: 요약 시점의 실제 전체 메시지 수
+            
+        Returns:
+            bool: 갱신 성공 여부
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        query = {"sessionId": session_id, "userId": user_id}
+        if previous_count:
+            query["summarizedCount"] = previous_count
+        else:
+            query["summarizedCount"] = {"$in": [0, None]}
+        
+        result = await db[cls.collection_name].update_one(
+            query,
+            {
+                "$set": {
+                    "summary": summary,
+                    "summarizedCount": summarized_count,
+                    "summary_updated_at": datetime.utcnow()
+                },
+                "$max": {"messageCount": message_count}
+            }
+        )
+        return result.modified_count > 0
+    
+    @classmethod
+    async def ensure_indexes(cls, db):
+        """채팅 로그 인덱스 생성
+        
+        인덱스마다 따로 생성해 하나가 실패해도 나머지는 만들어지도록 하고, 실패는 로그로 남깁니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            
+        Returns:
+            int: 생성에 실패한 인덱스 수
+        """
+        indexes = [
+            ([("userId", 1), ("sessionId", 1)], {"unique": True}),
+            ([("userId", 1), ("updated_at", -1), ("_id", -1)], {})
+        ]
+        failed = 0
+        for keys, options in indexes:
+            try:
+                await db[cls.collection_name].create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"Index creation on {cls.collection_name} {keys} failed: {e}")
+                failed += 1
+        return failed
+    
     @classmethod
     async def get_session(cls, db, session_id, user_id):
         """세션 정보 조회
@@ -128,6 +384,132 @@ class Chat:
         
         return await cursor.to_list(length=None)
     
+    @classmethod
+    def encode_session_cursor(cls, session):
+        """세션 목록 페이지 커서 생성 (updated_at, _id 기준)
+        
+        Args:
+            session: 페이지의 마지막 세션 문서
+            
+        Returns:
+            str: URL에 그대로 쓸 수 있는 커서 문자열
+        """
+        raw = f"{session['updated_at'].isoformat()}|{session['_id']}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @classmethod
+    def decode_session_cursor(cls, cursor):
+        """세션 목록 페이지 커서 해석
+        
+        Args:
+            cursor: encode_session_cursor로 만든 커서 문자열
+            
+        Returns:
+            tuple: (updated_at, _id)
+            
+        Raises:
+            ValueError: 커서 형식이 올바르지 않은 경우
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            updated_at, object_id = raw.split("|", 1)
+            return datetime.fromisoformat(updated_at), ObjectId(object_id)
+        except Exception as e:
+            raise ValueError(f"Invalid session cursor: {cursor}") from e
+    
+    @classmethod
+    async def get_user_sessions_page(cls, db, user_id, limit=20, cursor=None):
+        """사용자의 세션 목록 페이지 조회 (keyset 페이지네이션)
+        
+        skip 없이 (updated_at, _id) 기준으로 이어서 조회하므로 세션 수와 관계없이
+        페이지마다 인덱스 범위 조회 한 번으로 처리됩니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            user_id: 사용자 ID
+            limit: 페이지 크기 (기본값: 20)
+            cursor: 이전 페이지의 next_cursor (선택적)
+            
+        Returns:
+            tuple: (세션 목록, 다음 페이지 커서 또는 None)
+            
+        Raises:
+            ValueError: 커서 형식이 올바르지 않은 경우
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        query = {"userId": user_id}
+        if cursor:
+            updated_at, object_id = cls.decode_session_cursor(cursor)
+            query["$or"] = [
+                {"updated_at": {"$lt": updated_at}},
+                {"updated_at": updated_at, "_id": {"$lt": object_id}}
+            ]
+        
+        sessions = await db[cls.collection_name].find(
+            query,
+            {"_id": 1, "sessionId": 1, "date": 1, "updated_at": 1, "level": 1, "messageCount": 1}
+        ).sort([("updated_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(sessions) > limit:
+            sessions = sessions[:limit]
+            next_cursor = cls.encode_session_cursor(sessions[-1])
+        
+        return sessions, next_cursor
+    
+    @classmethod
+    async def get_message_window(cls, db, session_id, user_id, limit=50, before=None):
+        """세션 메시지를 구간 단위로 조회
+        
+        before(메시지 인덱스) 이전의 최근 limit개만 서버에서 잘라 가져옵니다.
+        before가 없으면 가장 최근 구간을 반환합니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            session_id: 세션 ID
+            user_id: 사용자 ID
+            limit: 가져올 메시지 수 (기본값: 50)
+            before: 이 인덱스 이전의 메시지만 조회 (선택적)
+            
+        Returns:
+            dict: messages, start(첫 메시지 인덱스), total, level, created_at, updated_at 또는 None
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        
+        query = {"sessionId": session_id, "userId": user_id}
+        
+        # 전체 메시지 수는 배열을 가져오지 않고 서버에서 크기만 계산
+        session = await db[cls.collection_name].find_one(
+            query,
+            {
+                "_id": 0,
+                "level": 1,
+                "created_at": 1,
+                "updated_at": 1,
+                "total": {"$size": {"$ifNull": ["$messages", []]}}
+            }
+        )
+        if not session:
+            return None
+        
+        total = session["total"]
+        end = min(max(0, before), total) if before is not None else total
+        start = max(0, end - limit)
+        session["start"] = start
+        session["messages"] = []
+        
+        if end > start:
+            window = await db[cls.collection_name].find_one(
+                query, {"_id": 0, "sessionId": 1, "messages": {"$slice": [start, end - start]}}
+            )
+            if window:
+                session["messages"] = window.get("messages", [])
+        
+        return session
+    
     @classmethod
     async def delete_session(cls, db, session_id, user_id):
         """세션 삭제
@@ -175,6 +557,16 @@ class ChatSession:
         """메시지 추가"""
         return await Chat.add_message(db, session_id, user_id, role, content, emotion)
     
+    @classmethod
+    async def append_messages(cls, db, session_id, user_id, messages, level="beginner"):
+        """메시지 추가 (append-only)"""
+        return await Chat.append_messages(db, session_id, user_id, messages, level)
+    
+    @classmethod
+    async def get_recent_messages(cls, db, session_id, user_id, limit=20):
+        """최근 메시지만 조회"""
+        return await Chat.get_recent_messages(db, session_id, user_id, limit)
+    
     @classmethod
     async def get_session(cls, db, session_id, user_id):
         """세션 정보 조회"""
@@ -185,6 +577,16 @@ class ChatSession:
         """사용자의 세션 목록 조회"""
         return await Chat.get_user_sessions(db, user_id, limit, skip)
     
+    @classmethod
+    async def get_user_sessions_page(cls, db, user_id, limit=20, cursor=None):
+        """사용자의 세션 목록 페이지 조회"""
+        return await Chat.get_user_sessions_page(db, user_id, limit, cursor)
+    
+    @classmethod
+    async def get_message_window(cls, db, session_id, user_id, limit=50, before=None):
+        """세션 메시지를 구간 단위로 조회"""
+        return await Chat.get_message_window(db, session_id, user_id, limit, before)
+    
     @classmethod
     async def delete_session(cls, db, session_id, user_id):
         """세션 삭제"""
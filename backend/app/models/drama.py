@@ -1,11 +1,18 @@
+import logging
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.utils.spaced_repetition import sm2_update_stages
+
+logger = logging.getLogger(__name__)
 
 class Drama:
     """드라마 콘텐츠 모델 - Drama Builder 서비스를 위한 모델"""
     
     collection_name = "drama_content"
     progress_collection = "drama_progress"
+    review_collection = "drama_reviews"
     
     def __init__(self, title, description, level, sentences=None, genre=None, source=None):
         """
@@ -77,9 +84,254 @@ class Drama:
         
         return await db[cls.collection_name].find_one({"_id": drama_id})
     
+    @classmethod
+    async def find_sentences_by_level(cls, db, level, limit=5, unseen_by=None, max_sentences=None):
+        """레벨별 최신 드라마의 문장 목록 조회
+        
+        드라마 문서 전체 대신 화면에 필요한 문장 필드만 펼쳐서 가져옵니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            level: 난이도 (beginner, intermediate, advanced)
+            limit: 드라마 개수 (기본값: 5)
+            unseen_by: 사용자 ID - 지정하면 이 사용자의 복습 기록이 있는 문장 제외 (선택적)
+            max_sentences: 최대 문장 수 (선택적)
+            
+        Returns:
+            list: 문장 목록 (id, content, translation, grammar_points, drama_title, drama_id)
+        """
+        pipeline = [
+            {"$match": {"level": level}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": limit},
+            {"$unwind": "$sentences"},
+        ]
+        if unseen_by:
+            if isinstance(unseen_by, str):
+                unseen_by = ObjectId(unseen_by)
+            # 후보 문장마다 (userId, sentenceId) 고유 인덱스로 복습 기록 존재 여부만 확인
+            pipeline += [
+                {"$lookup": {
+                    "from": cls.review_collection,
+                    "let": {"sentence_id": "$sentences.id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$and": [
+                            {"$eq": ["$userId", unseen_by]},
+                            {"$eq": ["$sentenceId", "$$sentence_id"]}
+                        ]}}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 1}}
+                    ],
+                    "as": "reviewed"
+                }},
+                {"$match": {"reviewed": {"$size": 0}}}
+            ]
+        if max_sentences:
+            pipeline.append({"$limit": max_sentences})
+        pipeline += [
+            {"$project": {
+                "_id": 0,
+                "id": "$sentences.id",
+                "content": "$sentences.content",
+                "translation": {"$ifNull": ["$sentences.translation", ""]},
+                "grammar_points": {"$ifNull": ["$sentences.grammar_points", []]},
+                "drama_title": "$title",
+                "drama_id": {"$toString": "$_id"}
+            }}
+        ]
+        
+        return await db[cls.collection_name].aggregate(pipeline).to_list(length=None)
+    
+    @classmethod
+    async def find_sentence(cls, db, sentence_id, drama_id=None):
+        """문장 ID로 문장 하나 조회 (sentences.id 인덱스 사용)
+        
+        Args:
+            db: 데이터베이스 연결
+            sentence_id: 문장 ID
+            drama_id: 드라마 ID (선택적, 형식이 잘못된 값은 무시하고 문장 ID로만 조회)
+            
+        Returns:
+            dict: 드라마 정보(_id, title, level)와 일치하는 문장 하나만 담은 sentences, 없으면 None
+        """
+        query = {"sentences.id": sentence_id}
+        if isinstance(drama_id, str) and ObjectId.is_valid(drama_id):
+            query["_id"] = ObjectId(drama_id)
+        elif isinstance(drama_id, ObjectId):
+            query["_id"] = drama_id
+        
+        return await db[cls.collection_name].find_one(
+            query,
+            {"title": 1, "level": 1, "sentences": {"$elemMatch": {"id": sentence_id}}}
+        )
+    
+    @classmethod
+    async def ensure_indexes(cls, db, single_flight=None):
+        """드라마 콘텐츠/진행 상황/복습 스케줄 인덱스 생성
+        
+        인덱스마다 따로 생성해 하나가 실패해도 나머지는 만들어지도록 하고, 실패는 로그로 남깁니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            single_flight: 워커 간 락 (선택적, 있으면 중복 진행 문서 병합을 워커 하나만 실행하고
+                나머지는 끝날 때까지 기다린 뒤 인덱스를 생성)
+            
+        Returns:
+            int: 생성에 실패한 인덱스 수
+        """
+        try:
+            # 고유 인덱스 이전의 동시 upsert 경쟁으로 생긴 중복 진행 문서를 먼저 합침
+            # (여러 워커가 동시에 병합하면 시도 횟수가 두 번 더해지므로 락으로 하나만 실행)
+            if single_flight is not None:
+                merged = await single_flight.do(
+                    "migrate:drama_progress_dedupe", lambda: cls.merge_duplicate_progress(db)
+                )
+            else:
+                merged = await cls.merge_duplicate_progress(db)
+            if merged:
+                logger.info(f"Merged {merged} duplicate drama progress documents")
+        except Exception as e:
+            logger.error(f"Drama progress duplicate merge failed: {e}")
+        
+        indexes = [
+            (cls.collection_name, [("sentences.id", 1)], {}),
+            (cls.collection_name, [("level", 1), ("created_at", -1)], {}),
+            (cls.progress_collection, [("userId", 1), ("dramaId", 1)], {"unique": True}),
+            (cls.progress_collection, [("userId", 1), ("updated_at", -1)], {}),
+            (cls.review_collection, [("userId", 1), ("sentenceId", 1)], {"unique": True}),
+            (cls.review_collection, [("userId", 1), ("level", 1), ("due_at", 1)], {})
+        ]
+        failed = 0
+        for collection, keys, options in indexes:
+            try:
+                await db[collection].create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"Index creation on {collection} {keys} failed: {e}")
+                failed += 1
+        return failed
+    
+    @classmethod
+    async def merge_duplicate_progress(cls, db):
+        """(userId, dramaId)가 같은 중복 진행 문서를 하나로 병합
+        
+        가장 먼저 만든 문서에 완료 문장(합집합), 시도 횟수(합계), 최신 레벨을 모으고 나머지는 삭제합니다.
+        고유 인덱스가 이미 있으면 중복이 있을 수 없으므로 조회하지 않습니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            
+        Returns:
+            int: 삭제된 중복 문서 수
+        """
+        collection = db[cls.progress_collection]
+        for index in (await collection.index_information()).values():
+            if index.get("unique") and index.get("key") == [("userId", 1), ("dramaId", 1)]:
+                return 0
+        
+        pipeline = [
+            {"$sort": {"updated_at": 1}},
+            {"$group": {
+                "_id": {"userId": "$userId", "dramaId": "$dramaId"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+                "completed": {"$push": {"$ifNull": ["$completedSentences", []]}},
+                "attempts": {"$sum": {"$ifNull": ["$attempts", 0]}},
+                "correctAttempts": {"$sum": {"$ifNull": ["$correctAttempts", 0]}},
+                "level": {"$last": "$level"},
+                "date": {"$min": "$date"},
+                "created_at": {"$min": "$created_at"},
+                "updated_at": {"$max": "$updated_at"}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ]
+        
+        removed = 0
+        async for group in collection.aggregate(pipeline, allowDiskUse=True):
+            keep = min(group["ids"])
+            duplicates = [object_id for object_id in group["ids"] if object_id != keep]
+            
+            completed = []
+            for sentences in group["completed"]:
+                for sentence_id in sentences:
+                    if sentence_id not in completed:
+                        completed.append(sentence_id)
+            
+            merged = {
+                "completedSentences": completed,
+                "attempts": group["attempts"],
+                "correctAttempts": group["correctAttempts"]
+            }
+            for field in ("level", "date", "created_at", "updated_at"):
+                if group.get(field) is not None:
+                    merged[field] = group[field]
+            
+            await collection.update_one({"_id": keep}, {"$set": merged})
+            result = await collection.delete_many({"_id": {"$in": duplicates}})
+            removed += result.deleted_count
+        
+        return removed
+    
+    @classmethod
+    async def find_unenriched(cls, db, level=None, limit=20):
+        """유사 문장/문법 포인트가 아직 생성되지 않은 문장이 있는 드라마 조회
+        
+        Args:
+            db: 데이터베이스 연결
+            level: 난이도 (선택적, 없으면 전체)
+            limit: 조회 개수 (기본값: 20)
+            
+        Returns:
+            list: 드라마 목록 (_id, level, sentences만 포함)
+        """
+        query = {"sentences": {"$elemMatch": {"enriched_at": {"$exists": False}}}}
+        if level:
+            query["level"] = level
+        
+        cursor = db[cls.collection_name].find(
+            query, {"level": 1, "sentences": 1}
+        ).limit(limit)
+        
+        return await cursor.to_list(length=None)
+    
+    @classmethod
+    async def set_sentence_enrichment(cls, db, drama_id, enrichments):
+        """문장별 유사 문장/문법 포인트 저장
+        
+        Args:
+            db: 데이터베이스 연결
+            drama_id: 드라마 ID
+            enrichments: {문장 ID: {"similar_sentences": [...], "grammar_points": [...]}}
+            
+        Returns:
+            int: 수정된 문장 수
+        """
+        if not enrichments:
+            return 0
+        
+        if isinstance(drama_id, str):
+            drama_id = ObjectId(drama_id)
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": drama_id},
+                {"$set": {
+                    "sentences.$[s].similar_sentences": enrichment.get("similar_sentences", []),
+                    "sentences.$[s].grammar_points": enrichment.get("grammar_points", []),
+                    "sentences.$[s].enriched_at": now,
+                    "updated_at": now
+                }},
+                array_filters=[{"s.id": sentence_id}]
+            )
+            for sentence_id, enrichment in enrichments.items()
+        ]
+        
+        result = await db[cls.collection_name].bulk_write(operations, ordered=False)
+        return result.modified_count
+    
     @classmethod
     async def update_progress(cls, db, user_id, drama_id, sentence_id, is_correct, level):
-        """진행 상황 업데이트
+        """진행 상황 업데이트 (진행 문서가 없으면 생성하는 단일 upsert)
         
         Args:
             db: 데이터베이스 연결
@@ -97,50 +349,195 @@ class Drama:
         if isinstance(drama_id, str):
             drama_id = ObjectId(drama_id)
         
-        # 기존 진행 상황 조회
-        progress = await db[cls.progress_collection].find_one({
-            "userId": user_id,
-            "dramaId": drama_id
-        })
-        
-        if progress:
-            # 기존 진행 상황 업데이트
-            if is_correct and sentence_id not in progress.get("completedSentences", []):
-                result = await db[cls.progress_collection].update_one(
-                    {"_id": progress["_id"]},
-                    {
-                        "$addToSet": {"completedSentences": sentence_id},
-                        "$set": {
-                            "updated_at": datetime.utcnow(),
-                            "level": level
-                        }
-                    }
-                )
-            else:
-                result = await db[cls.progress_collection].update_one(
-                    {"_id": progress["_id"]},
-                    {
-                        "$set": {
-                            "updated_at": datetime.utcnow(),
-                            "level": level
-                        }
-                    }
-                )
+        update = cls._progress_update([sentence_id] if is_correct else [], 1, int(bool(is_correct)), level)
+        
+        try:
+            result = await db[cls.progress_collection].update_one(
+                {"userId": user_id, "dramaId": drama_id}, update, upsert=True
+            )
+        except DuplicateKeyError:
+            # 같은 사용자/드라마의 동시 upsert 중 하나가 먼저 문서를 만든 경우 - 이제는 일반 업데이트가 됨
+            result = await db[cls.progress_collection].update_one(
+                {"userId": user_id, "dramaId": drama_id}, update, upsert=True
+            )
+        
+        return result.acknowledged
+    
+    @classmethod
+    async def bulk_update_progress(cls, db, records):
+        """진행 상황 일괄 업데이트 (오프라인 가져오기용)
+        
+        같은 사용자/드라마의 기록은 하나의 upsert로 합쳐서 보냅니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            records: [{"user_id", "drama_id", "sentence_id", "is_correct", "level"}, ...]
+            
+        Returns:
+            int: 생성 또는 수정된 진행 문서 수
+        """
+        merged = {}
+        for record in records:
+            user_id = record["user_id"]
+            drama_id = record["drama_id"]
+            key = (
+                ObjectId(user_id) if isinstance(user_id, str) else user_id,
+                ObjectId(drama_id) if isinstance(drama_id, str) else drama_id
+            )
+            entry = merged.setdefault(key, {"completed": [], "attempts": 0, "correct": 0, "level": None})
+            entry["attempts"] += 1
+            if record.get("is_correct"):
+                entry["correct"] += 1
+                if record["sentence_id"] not in entry["completed"]:
+                    entry["completed"].append(record["sentence_id"])
+            entry["level"] = record.get("level") or entry["level"]
+        
+        if not merged:
+            return 0
+        
+        operations = [
+            UpdateOne(
+                {"userId": user_id, "dramaId": drama_id},
+                cls._progress_update(entry["completed"], entry["attempts"], entry["correct"], entry["level"]),
+                upsert=True
+            )
+            for (user_id, drama_id), entry in merged.items()
+        ]
+        
+        result = await db[cls.progress_collection].bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
+    @staticmethod
+    def _progress_update(completed_sentences, attempts, correct_attempts, level):
+        """진행 상황 upsert 연산 생성"""
+        now = datetime.utcnow()
+        update = {
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"date": now, "created_at": now},
+            "$inc": {"attempts": attempts, "correctAttempts": correct_attempts}
+        }
+        if level:
+            update["$set"]["level"] = level
+        if completed_sentences:
+            update["$addToSet"] = {"completedSentences": {"$each": completed_sentences}}
         else:
-            # 새 진행 상황 생성
-            completed_sentences = [sentence_id] if is_correct else []
-            result = await db[cls.progress_collection].insert_one({
-                "userId": user_id,
-                "dramaId": drama_id,
-                "completedSentences": completed_sentences,
-                "level": level,
-                "date": datetime.utcnow(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            })
+            update["$setOnInsert"]["completedSentences"] = []
+        return update
+    
+    @classmethod
+    async def select_sentences(cls, db, user_id, level, limit=20, new_from_dramas=20, now=None):
+        """사용자별 학습 문장 선택 (간격 반복)
+        
+        복습 시각이 지난 문장을 due_at 순으로 먼저 넣고 ((userId, level, due_at) 인덱스 범위 조회 한 번),
+        남은 자리는 아직 풀지 않은 새 문장으로 채웁니다 (최신 드라마의 후보 문장만 $lookup으로 복습 기록 확인).
+        새 문장도 없으면 다음 복습 예정 문장을 앞당겨 넣습니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            user_id: 사용자 ID
+            level: 난이도 (beginner, intermediate, advanced)
+            limit: 문장 수 (기본값: 20)
+            new_from_dramas: 새 문장을 고르는 최신 드라마 수 (기본값: 20)
+            now: 기준 시각 (기본값: 현재 시각)
+            
+        Returns:
+            list: 문장 목록 (id, content, translation, grammar_points, drama_title, drama_id, review, due_at)
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        now = now or datetime.utcnow()
+        reviews = db[cls.review_collection]
+        
+        cursor = reviews.find(
+            {"userId": user_id, "level": level, "due_at": {"$lte": now}}, cls._review_projection()
+        ).sort("due_at", 1).limit(limit)
+        sentences = [cls._review_sentence(review) for review in await cursor.to_list(length=None)]
+        
+        if len(sentences) < limit:
+            new_sentences = await cls.find_sentences_by_level(
+                db, level, limit=new_from_dramas, unseen_by=user_id,
+                max_sentences=limit - len(sentences)
+            )
+            for sentence in new_sentences:
+                sentence["review"] = False
+                sentence["due_at"] = None
+            sentences += new_sentences
+        
+        if len(sentences) < limit:
+            # 새 문장이 없으면 가장 가까운 복습 예정 문장을 미리 복습
+            cursor = reviews.find(
+                {"userId": user_id, "level": level, "due_at": {"$gt": now}}, cls._review_projection()
+            ).sort("due_at", 1).limit(limit - len(sentences))
+            sentences += [cls._review_sentence(review) for review in await cursor.to_list(length=None)]
+        
+        return sentences
+    
+    @classmethod
+    async def record_review(cls, db, user_id, drama_id, sentence, drama_title, level, quality):
+        """문장 복습 결과를 SM-2 스케줄에 반영 (이전 상태를 읽지 않는 단일 upsert)
+        
+        Args:
+            db: 데이터베이스 연결
+            user_id: 사용자 ID
+            drama_id: 드라마 ID
+            sentence: 문장 정보 (id, content, translation, grammar_points)
+            drama_title: 드라마 제목
+            level: 드라마 레벨
+            quality: SM-2 응답 품질 (0-5, review_quality 참고)
+            
+        Returns:
+            bool: 업데이트 성공 여부
+        """
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+        if isinstance(drama_id, str):
+            drama_id = ObjectId(drama_id)
+        
+        now = datetime.utcnow()
+        # 복습 목록을 드라마 조회 없이 만들 수 있도록 문장 내용을 함께 저장 ($literal: 문자열이 필드 경로로 해석되지 않도록)
+        snapshot = {
+            "dramaId": drama_id,
+            "level": level,
+            "content": {"$literal": sentence.get("content", "")},
+            "translation": {"$literal": sentence.get("translation", "")},
+            "grammar_points": {"$literal": sentence.get("grammar_points", [])},
+            "drama_title": {"$literal": drama_title or ""},
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "updated_at": now
+        }
+        pipeline = [{"$set": snapshot}] + sm2_update_stages(quality, now)
+        query = {"userId": user_id, "sentenceId": sentence.get("id")}
+        
+        try:
+            result = await db[cls.review_collection].update_one(query, pipeline, upsert=True)
+        except DuplicateKeyError:
+            # 같은 문장의 동시 upsert 중 하나가 먼저 문서를 만든 경우 - 이제는 일반 업데이트가 됨
+            result = await db[cls.review_collection].update_one(query, pipeline, upsert=True)
         
         return result.acknowledged
     
+    @staticmethod
+    def _review_projection():
+        """복습 목록용 필드"""
+        return {
+            "_id": 0, "sentenceId": 1, "dramaId": 1, "content": 1, "translation": 1,
+            "grammar_points": 1, "drama_title": 1, "due_at": 1
+        }
+    
+    @staticmethod
+    def _review_sentence(review):
+        """복습 문서를 문장 목록 형식으로 변환"""
+        return {
+            "id": review.get("sentenceId"),
+            "content": review.get("content", ""),
+            "translation": review.get("translation", ""),
+            "grammar_points": review.get("grammar_points", []),
+            "drama_title": review.get("drama_title", ""),
+            "drama_id": str(review.get("dramaId")),
+            "review": True,
+            "due_at": review["due_at"].isoformat() if review.get("due_at") else None
+        }
+    
     @classmethod
     async def get_user_progress(cls, db, user_id, limit=10, skip=0):
         """사용자의 진행 상황 목록 조회
@@ -1,5 +1,6 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from app.config import settings
 
 class User:
     """사용자 모델"""
@@ -130,17 +131,81 @@ class User:
         return result.modified_count > 0
     
     @classmethod
-    async def has_active_subscription(cls, db, user_id, product):
+    def profile_cache_key(cls, user_id):
+        """사용자 프로필 스냅샷 캐시 키"""
+        return f"user:profile:{user_id}"
+    
+    @classmethod
+    async def get_profile_snapshot(cls, db, user_id, cache_manager=None):
+        """요청 처리에 필요한 사용자 정보 스냅샷 조회 (레벨, 모국어, 활성 상품)
+        
+        cache_manager가 주어지면 캐시를 먼저 확인하고, 없을 때만 DB를 조회해 저장합니다.
+        프로필이나 구독이 바뀌면 invalidate_profile_cache로 캐시를 지워야 합니다.
+        
+        Args:
+            db: 데이터베이스 연결
+            user_id: 사용자 ID
+            cache_manager: CacheManager 인스턴스 (선택적)
+            
+        Returns:
+            dict: {"koreanLevel", "nativeLanguage", "activeProducts"} 또는 None
+        """
+        async def load():
+            user = await db[cls.collection_name].find_one(
+                {"_id": ObjectId(user_id) if isinstance(user_id, str) else user_id},
+                {"profile": 1, "subscriptions": 1}
+            )
+            if not user:
+                return None
+            
+            profile = user.get("profile") or {}
+            return {
+                "koreanLevel": profile.get("koreanLevel", "beginner"),
+                "nativeLanguage": profile.get("nativeLanguage", "en"),
+                "activeProducts": sorted({
+                    sub.get("product")
+                    for sub in user.get("subscriptions") or []
+                    if sub.get("status") == "active" and sub.get("product")
+                })
+            }
+        
+        if not cache_manager:
+            return await load()
+        
+        return await cache_manager.get_or_set(
+            cls.profile_cache_key(user_id),
+            load,
+            settings.USER_PROFILE_CACHE_TTL
+        )
+    
+    @classmethod
+    async def invalidate_profile_cache(cls, cache_manager, user_id):
+        """사용자 프로필 스냅샷 캐시 삭제
+        
+        Args:
+            cache_manager: CacheManager 인스턴스
+            user_id: 사용자 ID
+        """
+        if cache_manager:
+            await cache_manager.delete(cls.profile_cache_key(user_id))
+    
+    @classmethod
+    async def has_active_subscription(cls, db, user_id, product, cache_manager=None):
         """활성 구독 여부 확인
         
         Args:
             db: 데이터베이스 연결
             user_id: 사용자 ID
             product: 상품 이름 (talk, drama, test, journey)
+            cache_manager: CacheManager 인스턴스 (선택적, 주어지면 프로필 스냅샷 캐시 사용)
             
         Returns:
             bool: 활성 구독 여부
         """
+        if cache_manager:
+            snapshot = await cls.get_profile_snapshot(db, user_id, cache_manager)
+            return bool(snapshot) and product in snapshot.get("activeProducts", [])
+        
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
         
@@ -2,6 +2,7 @@ from quart import Blueprint, request, jsonify, current_app
 from bson.objectid import ObjectId
 import bcrypt
 from datetime import datetime
+from app.models.user import User
 from app.utils.response import api_response, error_response
 
 auth_routes = Blueprint('auth', __name__, url_prefix='/api/v1/auth')
@@ -166,6 +167,9 @@ async def update_profile():
         {"$set": update_data}
     )
     
+    # 레벨/모국어 등이 바뀌었을 수 있으므로 프로필 스냅샷 캐시 무효화
+    await User.invalidate_profile_cache(current_app.cache_manager, user_id)
+    
     return api_response({
         "updated_fields": list(update_data.keys())
     }, "프로필이 성공적으로 업데이트되었습니다")
\ No newline at end of file
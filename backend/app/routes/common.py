@@ -302,6 +302,9 @@ async def subscribe():
             # User 모델에도 간단한 정보 저장
             await User.add_subscription(db, user_id, product)
         
+        # 활성 상품이 바뀌었으므로 프로필 스냅샷 캐시 무효화
+        await User.invalidate_profile_cache(current_app.cache_manager, user_id)
+        
         # 이벤트 발행
         await current_app.event_bus.publish("subscription_created", {
             "user_id": user_id,
@@ -351,6 +354,9 @@ async def subscribe():
         # User 모델에도 간단한 정보 저장
         await User.add_subscription(db, user_id, plan_id)
         
+        # 활성 상품이 바뀌었으므로 프로필 스냅샷 캐시 무효화
+        await User.invalidate_profile_cache(current_app.cache_manager, user_id)
+        
         # 이벤트 발행
         await current_app.event_bus.publish("subscription_created", {
             "user_id": user_id,
@@ -422,6 +428,9 @@ async def cancel_subscription():
     success = await Subscription.cancel(db, subscription_id)
     
     if success:
+        # 활성 상품이 바뀌었으므로 프로필 스냅샷 캐시 무효화
+        await User.invalidate_profile_cache(current_app.cache_manager, user_id)
+        
         # 이벤트 발행
         await current_app.event_bus.publish("subscription_cancelled", {
             "user_id": user_id,
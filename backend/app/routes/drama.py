@@ -1,11 +1,14 @@
 from quart import Blueprint, request, jsonify, current_app
 from bson.objectid import ObjectId
-import uuid
+import asyncio
 from datetime import datetime, timedelta 
 from app.models.drama import Drama
 from app.models.user import User
 from app.utils.response import api_response, error_response
+from app.utils.grading import grade_answer
+from app.utils.spaced_repetition import review_quality
 from app.services.gpt_service import GPTService
+from app.core.data_loader import DataLoader
 
 drama_routes = Blueprint('drama', __name__, url_prefix='/api/v1/drama')
 
@@ -25,7 +28,9 @@ async def get_sentences():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "drama")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "drama", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Drama Builder 서비스 구독이 필요합니다.", 403)
@@ -40,57 +45,21 @@ async def get_sentences():
     if not can_use:
         return error_response("오늘의 사용량을 초과했습니다.", 429)
     
-    # 드라마 문장 조회
+    # 드라마 문장 조회 (복습 시각이 된 문장 먼저, 나머지는 아직 풀지 않은 새 문장)
     db_drama = current_app.mongo_client[current_app.config.get("MONGO_DB_DRAMA")]
-    dramas = await Drama.find_by_level(db_drama, level, limit=5)
-    
-    if not dramas:
-        # 드라마 데이터가 없는 경우, GPT로 생성
-        # 실제 구현에서는 미리 생성된 데이터를 사용하는 것이 좋음
-        
-        # 레벨별 문장 생성 프롬프트
-        prompts = {
-            "beginner": "한국어 초급 레벨(3-5단어)의 간단한 한국 드라마 대화 문장 5개를 생성해주세요. 일상 대화 위주로 만들어주세요.",
-            "intermediate": "한국어 중급 레벨(7-10단어)의 한국 드라마 대화 문장 5개를 생성해주세요. 감정 표현과 연결어미를 포함해주세요.",
-            "advanced": "한국어 고급 레벨(12단어 이상)의 복잡한 한국 드라마 대화 문장 5개를 생성해주세요. 관형절과 고급 표현을 포함해주세요."
-        }
-        
-        # GPT를 사용하여 문장 생성
-        generated_sentences = await gpt_service.generate_drama_sentences(prompts[level])
-        
-        # 생성된 문장을 DB에 저장
-        drama_data = {
-            "title": f"{level.capitalize()} 드라마 대화",
-            "description": f"{level} 레벨에 적합한 드라마 대화 문장",
-            "level": level,
-            "sentences": [
-                {
-                    "id": str(uuid.uuid4()),
-                    "content": sentence,
-                    "translation": "",  # 실제로는 번역 서비스 사용
-                    "grammar_points": []  # 실제로는 문법 분석 서비스 사용
-                }
-                for sentence in generated_sentences
-            ],
-            "genre": "daily",
-            "source": "AI 생성"
-        }
-        
-        await Drama.create(db_drama, drama_data)
-        dramas = await Drama.find_by_level(db_drama, level, limit=5)
+    sentences = await Drama.select_sentences(
+        db_drama,
+        user_id,
+        level,
+        limit=current_app.config.get("DRAMA_BATCH_SIZE", 20),
+        new_from_dramas=current_app.config.get("DRAMA_NEW_SENTENCE_DRAMAS", 20)
+    )
     
-    # 응답 데이터 가공
-    sentences = []
-    for drama in dramas:
-        for sentence in drama.get('sentences', []):
-            sentences.append({
-                "id": sentence.get('id'),
-                "content": sentence.get('content'),
-                "translation": sentence.get('translation', ''),
-                "grammar_points": sentence.get('grammar_points', []),
-                "drama_title": drama.get('title'),
-                "drama_id": str(drama.get('_id'))
-            })
+    # 콘텐츠는 풀이 백그라운드에서 채우므로 요청에서는 생성하지 않음
+    current_app.content_pool.notify("drama", level)
+    if not sentences:
+        current_app.content_pool.request_refill("drama", level)
+        return error_response("콘텐츠를 준비 중입니다. 잠시 후 다시 시도해주세요.", 503)
     
     remaining = await current_app.usage_limiter.get_remaining(
         user_id, 
@@ -117,7 +86,9 @@ async def check_sentence():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "drama")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "drama", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Drama Builder 서비스 구독이 필요합니다.", 403)
@@ -130,38 +101,45 @@ async def check_sentence():
     sentence_id = data.get('sentence_id')
     drama_id = data.get('drama_id')
     
-    # 드라마 조회
-    drama = await Drama.find_by_id(db_drama, drama_id)
-    
-    if not drama:
-        return error_response("드라마를 찾을 수 없습니다.", 404)
-    
-    # 문장 찾기
-    correct_sentence = None
-    for sentence in drama.get('sentences', []):
-        if sentence.get('id') == sentence_id:
-            correct_sentence = sentence
-            break
+    # 문장 하나만 조회 (sentences.id 인덱스 + $elemMatch 프로젝션)
+    drama = await Drama.find_sentence(db_drama, sentence_id, drama_id)
     
-    if not correct_sentence:
+    if not drama or not drama.get('sentences'):
         return error_response("문장을 찾을 수 없습니다.", 404)
     
+    correct_sentence = drama['sentences'][0]
+    drama_id = str(drama['_id'])
+    
     # 사용자 응답 확인
     user_answer = data.get('user_answer')
     correct_content = correct_sentence.get('content')
     
-    # 정답 여부 확인 (간단한 비교)
-    # 실제로는 더 정교한 비교 로직 필요
-    is_correct = user_answer.strip() == correct_content.strip()
-    
-    # 유사 문장 생성 (GPT 사용)
-    similar_sentences = await gpt_service.generate_similar_sentences(correct_content, level)
-    
-    # 문법 포인트 추출 (GPT 사용)
-    grammar_points = await gpt_service.extract_grammar_points(correct_content, level)
-    
-    # 진행 상황 업데이트
-    await Drama.update_progress(db_drama, user_id, drama_id, sentence_id, is_correct, level)
+    # 정답 여부 확인 (띄어쓰기/문장 부호 차이는 정답 처리, 부분 점수와 오류 위치 계산)
+    grading = grade_answer(user_answer, correct_content)
+    is_correct = grading["is_correct"]
+    
+    # 드라마 생성 시 저장해 둔 유사 문장과 문법 포인트 사용
+    similar_sentences = correct_sentence.get('similar_sentences', [])
+    grammar_points = correct_sentence.get('grammar_points', [])
+    
+    if 'enriched_at' not in correct_sentence:
+        # 사전 생성 이전의 문서는 이번에 생성하고 저장해 다음 요청부터 재사용
+        similar_sentences, grammar_points = await asyncio.gather(
+            gpt_service.generate_similar_sentences(correct_content, level),
+            gpt_service.extract_grammar_points(correct_content, level)
+        )
+        await Drama.set_sentence_enrichment(db_drama, drama_id, {
+            sentence_id: {"similar_sentences": similar_sentences, "grammar_points": grammar_points}
+        })
+    
+    # 진행 상황과 복습 스케줄 업데이트 (점수로 다음 복습 시점 계산)
+    await asyncio.gather(
+        Drama.update_progress(db_drama, user_id, drama_id, sentence_id, is_correct, level),
+        Drama.record_review(
+            db_drama, user_id, drama_id, {**correct_sentence, "grammar_points": grammar_points}, drama.get('title'),
+            drama.get('level', level), review_quality(is_correct, grading["score"])
+        )
+    )
     
     # 게임화 데이터 업데이트
     from app.models.common import Common
@@ -194,6 +172,8 @@ async def check_sentence():
     
     return api_response({
         "is_correct": is_correct,
+        "score": grading["score"],
+        "errors": grading["errors"],
         "correct_sentence": correct_content,
         "similar_sentences": similar_sentences,
         "grammar_points": grammar_points,
@@ -208,7 +188,9 @@ async def get_progress():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "drama")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "drama", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Drama Builder 서비스 구독이 필요합니다.", 403)
@@ -217,14 +199,13 @@ async def get_progress():
     db_drama = current_app.mongo_client[current_app.config.get("MONGO_DB_DRAMA")]
     progress_list = await Drama.get_user_progress(db_drama, user_id)
     
-    # 드라마 정보 조회
-    drama_ids = [ObjectId(item.get('dramaId')) for item in progress_list]
+    # 드라마 정보 조회 (중복 제거 후 $in 쿼리 한 번)
+    loader = DataLoader(db_drama[Drama.collection_name], {"title": 1, "level": 1, "sentences.id": 1})
     dramas = {}
     
-    for drama_id in drama_ids:
-        drama = await Drama.find_by_id(db_drama, drama_id)
+    for drama in await loader.load_many([item.get('dramaId') for item in progress_list]):
         if drama:
-            dramas[str(drama_id)] = {
+            dramas[str(drama['_id'])] = {
                 "title": drama.get('title'),
                 "level": drama.get('level'),
                 "total_sentences": len(drama.get('sentences', []))
@@ -283,7 +264,9 @@ async def get_usage():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "drama")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "drama", current_app.cache_manager
+    )
     
     # 남은 사용량 확인
     remaining = await current_app.usage_limiter.get_remaining(
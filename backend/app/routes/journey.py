@@ -1,12 +1,13 @@
 from quart import Blueprint, request, jsonify, current_app
 from bson.objectid import ObjectId
-import uuid
 from datetime import datetime, timedelta
 from app.models.journey import Journey
 from app.models.user import User
 from app.utils.response import api_response, error_response
 from app.services.gpt_service import GPTService
+from app.core.data_loader import DataLoader
 from app.services.whisper_service import WhisperService
+from app.services.content_pool import JOURNEY_TYPE_DESCRIPTIONS
 
 journey_routes = Blueprint('journey', __name__, url_prefix='/api/v1/journey')
 
@@ -28,9 +29,15 @@ async def get_content():
     if level not in ['level1', 'level2', 'level3', 'level4']:
         return error_response("유효하지 않은 레벨입니다. level1, level2, level3, level4 중 하나를 선택하세요.", 400)
     
+    # 유형 검증 (풀 키가 되므로 알려진 유형만 허용)
+    if content_type is not None and content_type not in JOURNEY_TYPE_DESCRIPTIONS:
+        return error_response(f"유효하지 않은 콘텐츠 유형입니다. {', '.join(JOURNEY_TYPE_DESCRIPTIONS)} 중 하나를 선택하세요.", 400)
+    
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "journey")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "journey", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Korean Journey 서비스 구독이 필요합니다.", 403)
@@ -45,83 +52,11 @@ async def get_content():
     if not can_use:
         return error_response("오늘의 사용량을 초과했습니다.", 429)
     
-    # 리딩 콘텐츠 조회
-    db_journey = current_app.mongo_client[current_app.config.get("MONGO_DB_JOURNEY")]
-    content_list = await Journey.find_by_level(db_journey, level, content_type, limit=1)
-    
-    if not content_list:
-        # 콘텐츠가 없는 경우, GPT로 생성
-        # 실제 구현에서는 미리 생성된 데이터를 사용하는 것이 좋음
-        
-        # 레벨별 콘텐츠 생성 프롬프트
-        level_descriptions = {
-            "level1": "한글 마스터 (완전 초급) 수준의 간단한 한국어 텍스트",
-            "level2": "기초 리더 (초급) 수준의 한국어 텍스트",
-            "level3": "중급 리더 (중급) 수준의 한국어 텍스트",
-            "level4": "고급 리더 (고급) 수준의 한국어 텍스트"
-        }
-        
-        type_descriptions = {
-            "hangul": "한글 자음과 모음 학습",
-            "reading": "읽기 연습용 텍스트",
-            "pronunciation": "발음 연습용 텍스트",
-            "dialogue": "대화 형식의 텍스트"
-        }
-        
-        type_str = type_descriptions.get(content_type, "읽기 연습용 텍스트")
-        prompt = f"{level_descriptions[level]}를 생성해주세요. 이 텍스트는 {type_str}로 사용됩니다."
-        
-        # GPT를 사용하여 콘텐츠 생성
-        generated_content = await gpt_service.generate_reading_content(prompt, level)
-        
-        # 레벨별 콘텐츠 설정
-        level_settings = {
-            "level1": {
-                "title": "한글 기초 학습",
-                "description": "한글 자음과 모음, 기초 단어를 학습합니다.",
-                "recommended_speed": 0.5
-            },
-            "level2": {
-                "title": "일상 한국어 읽기",
-                "description": "간단한 일상 대화와 문장을 읽습니다.",
-                "recommended_speed": 0.8
-            },
-            "level3": {
-                "title": "중급 한국어 텍스트",
-                "description": "뉴스, 블로그 글 등의 중급 텍스트를 읽습니다.",
-                "recommended_speed": 1.0
-            },
-            "level4": {
-                "title": "고급 한국어 콘텐츠",
-                "description": "문학 작품, 전문적인 글 등의 고급 텍스트를 읽습니다.",
-                "recommended_speed": 1.2
-            }
-        }
-        
-        # 가이드 생성
-        guide = await gpt_service.generate_reading_guide(generated_content, level)
-        
-        # 생성된 콘텐츠를 DB에 저장
-        content_data = {
-            "title": level_settings[level]["title"],
-            "description": level_settings[level]["description"],
-            "level": level,
-            "content_type": content_type or "reading",
-            "content": {
-                "text": generated_content,
-                "sentences": [{"id": str(uuid.uuid4()), "text": sentence.strip()} 
-                             for sentence in generated_content.split(".") if sentence.strip()],
-                "recommended_speed": level_settings[level]["recommended_speed"]
-            },
-            "guide": guide
-        }
-        
-        await Journey.create(db_journey, content_data)
-        content_list = await Journey.find_by_level(db_journey, level, content_type, limit=1)
+    # 리딩 콘텐츠 조회 - 콘텐츠 풀에서 조회 (생성은 풀이 백그라운드에서 처리)
+    content = await current_app.content_pool.take("journey", level, content_type)
     
     # 응답 데이터 가공
-    if content_list:
-        content = content_list[0]
+    if content:
         content_data = {
             "content_id": str(content.get('_id')),
             "title": content.get('title'),
@@ -132,8 +67,8 @@ async def get_content():
             "guide": content.get('guide', {})
         }
     else:
-        # 생성에 실패한 경우
-        return error_response("콘텐츠 생성에 실패했습니다.", 500)
+        # 풀이 아직 비어 있는 경우 (채우기는 이미 시작됨)
+        return error_response("콘텐츠를 준비 중입니다. 잠시 후 다시 시도해주세요.", 503)
     
     # 남은 사용량
     remaining = await current_app.usage_limiter.get_remaining(
@@ -165,7 +100,9 @@ async def submit_reading():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "journey")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "journey", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Korean Journey 서비스 구독이 필요합니다.", 403)
@@ -255,7 +192,9 @@ async def get_progress():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "journey")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "journey", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Korean Journey 서비스 구독이 필요합니다.", 403)
@@ -264,14 +203,13 @@ async def get_progress():
     db_journey = current_app.mongo_client[current_app.config.get("MONGO_DB_JOURNEY")]
     history_list = await Journey.get_user_history(db_journey, user_id)
     
-    # 콘텐츠 정보 조회
-    content_ids = [ObjectId(item.get('contentId')) for item in history_list]
+    # 콘텐츠 정보 조회 (중복 제거 후 $in 쿼리 한 번)
+    loader = DataLoader(db_journey[Journey.collection_name], {"title": 1, "level": 1, "content_type": 1})
     contents = {}
     
-    for content_id in content_ids:
-        content = await Journey.find_by_id(db_journey, content_id)
+    for content in await loader.load_many([item.get('contentId') for item in history_list]):
         if content:
-            contents[str(content_id)] = {
+            contents[str(content['_id'])] = {
                 "title": content.get('title'),
                 "level": content.get('level'),
                 "content_type": content.get('content_type')
@@ -369,7 +307,9 @@ async def get_usage():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "journey")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "journey", current_app.cache_manager
+    )
     
     # 남은 사용량 확인
     remaining = await current_app.usage_limiter.get_remaining(
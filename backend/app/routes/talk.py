@@ -1,12 +1,19 @@
-from quart import Blueprint, request, jsonify, current_app
+from quart import Blueprint, request, jsonify, current_app, stream_with_context
 from bson.objectid import ObjectId
+import os
 import uuid
+import json
+import asyncio
 import logging  # ✅ 추가
 from datetime import datetime, timedelta  # ✅ timedelta도 추가
 from app.utils.response import api_response, error_response
 from app.services.gpt_service import GPTService
+from app.core import resilience
 from app.services.emotion_service import EmotionService
+from app.services.whisper_service import WhisperService
 from app.models.common import XPAction, Common, ActivityType 
+from app.models.chat import Chat
+from app.models.user import User
 
 
 # ✅ Logger 설정 추가
@@ -16,70 +23,141 @@ talk_routes = Blueprint('talk', __name__, url_prefix='/api/v1/talk')
 # GPT 서비스 초기화
 gpt_service = GPTService()
 emotion_service = EmotionService()
+whisper_service = WhisperService()
 
-@talk_routes.route('/chat', methods=['POST'])
-@current_app.auth_manager.require_auth
-async def chat():
-    user_id = request.user_id
-    data = await request.json
+async def _load_chat_context(session_id, user_id, limit):
+    """기존 세션의 요약과 최근 대화 구간 불러오기 (새 세션이면 None)
     
-    if not data or not data.get('message'):
-        return error_response("메시지 내용이 필요합니다", 400)
-    
-    # 사용 제한 확인
-    can_use = await current_app.usage_limiter.check_limit(
-        user_id, 
-        "talk", 
-        current_app.config.get("TALK_DAILY_LIMIT", 60)
-    )
+    활성 세션은 Redis 세션 저장소에서 읽고, 없으면 MongoDB에서 복원합니다.
+    """
+    if not session_id:
+        return None
+    return await current_app.session_store.get_context(session_id, user_id, limit)
+
+async def _load_turn_inputs(user_id, session_id):
+    """사용량 확인, 사용자 정보, 이전 대화 기록 동시 조회
     
-    if not can_use:
-        return error_response("오늘의 사용량을 초과했습니다", 429)
+    Args:
+        user_id: 사용자 ID
+        session_id: 요청에 포함된 세션 ID (새 세션이면 None)
+        
+    Returns:
+        tuple: (사용 가능 여부, 사용자 프로필 스냅샷, 세션 컨텍스트)
+    """
+    db_users = current_app.mongo_client[current_app.config["MONGO_DB_USERS"]]
     
-    # 세션 ID 처리
-    session_id = data.get('session_id', str(uuid.uuid4()))
+    # 사용 제한 확인 + 사용자 레벨 획득 + 이전 대화 기록(요약 + 미요약 구간) 동시 조회
+    return await asyncio.gather(
+        current_app.usage_limiter.check_limit(
+            user_id,
+            "talk",
+            current_app.config.get("TALK_DAILY_LIMIT", 60)
+        ),
+        User.get_profile_snapshot(db_users, user_id, current_app.cache_manager),
+        _load_chat_context(session_id, user_id, gpt_service.context_manager.fetch_limit)
+    )
+
+def _start_turn(session_id, user, chat_context, message):
+    """턴 컨텍스트 구성 및 감정 분석 시작
     
-    # 사용자 레벨 획득
-    users_collection = current_app.mongo_client[current_app.config["MONGO_DB_USERS"]].users
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    user_level = user.get("profile", {}).get("koreanLevel", "beginner")
-    native_language = user.get("profile", {}).get("nativeLanguage", "en")
+    감정 분석은 GPT 응답과 겹쳐 실행되도록 태스크로만 시작하고, 결과는 _complete_turn에서 기다립니다.
     
-    # 이전 대화 기록 가져오기
-    chat_logs_collection = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]].chat_logs
-    chat_history = []
+    Args:
+        session_id: 세션 ID
+        user: 사용자 프로필 스냅샷
+        chat_context: 세션 컨텍스트 (새 세션이면 None)
+        message: 사용자 메시지
+        
+    Returns:
+        dict: 턴 컨텍스트 (session_id, user_level, native_language, chat_history, emotion_task 등)
+    """
+    user_level = user.get("koreanLevel", "beginner")
+    native_language = user.get("nativeLanguage", "en")
     
-    if data.get('session_id'):
-        # 기존 세션이면 기록 불러오기
-        chat_log = await chat_logs_collection.find_one({"sessionId": session_id, "userId": ObjectId(user_id)})
-        if chat_log:
-            chat_history = chat_log.get("messages", [])
+    chat_history = gpt_service.context_manager.unsummarized_messages(chat_context)
     
-    # 사용자 메시지 감정 분석
-    emotion_data = await emotion_service.analyze_emotion(data['message'])
+    # 사용자 메시지 감정 분석 (GPT 호출과 동시에 진행)
+    emotion_task = asyncio.ensure_future(emotion_service.analyze_emotion(message))
     
-    # 사용자 메시지 저장
+    # 사용자 메시지 저장 (감정 데이터는 분석이 끝난 뒤 채움)
     user_message = {
         "role": "user",
-        "content": data['message'],
+        "content": message,
         "timestamp": datetime.utcnow(),
-        "emotion": emotion_data
+        "emotion": None
     }
     
     # 대화 기록에 사용자 메시지 추가
     chat_history.append(user_message)
     
-    # ✅ GPT 응답 생성 (빠진 부분 추가)
+    return {
+        "session_id": session_id,
+        "user_level": user_level,
+        "native_language": native_language,
+        "chat_history": chat_history,
+        "summary": (chat_context or {}).get("summary"),
+        "message_count": (chat_context or {}).get("messageCount", 0),
+        "summarized_count": (chat_context or {}).get("summarizedCount", 0),
+        "user_message": user_message,
+        "emotion_task": emotion_task,
+        "message": message
+    }
+
+async def _prepare_turn(user_id, data):
+    """대화 턴 준비 - 사용량 확인, 사용자 정보, 이전 대화 기록, 감정 분석 시작
+    
+    Args:
+        user_id: 사용자 ID
+        data: 요청 데이터 (message, session_id)
+        
+    Returns:
+        dict: 턴 컨텍스트, 사용량을 초과한 경우 None
+    """
+    # 세션 ID 처리
+    session_id = data.get('session_id', str(uuid.uuid4()))
+    
+    can_use, user, chat_context = await _load_turn_inputs(user_id, data.get('session_id'))
+    
+    if not can_use:
+        return None
+    
+    return _start_turn(session_id, user, chat_context, data['message'])
+
+def _cancel_turn(turn):
+    """응답 생성에 실패한 턴의 진행 중인 감정 분석 취소"""
+    emotion_task = turn["emotion_task"]
+    if not emotion_task.done():
+        emotion_task.cancel()
+
+async def _resolve_emotion(turn):
+    """감정 분석 결과 대기 - 실패해도 대화 턴은 감정 데이터 없이 진행"""
     try:
-        gpt_response = await gpt_service.generate_response(
-            chat_history, 
-            user_level,
-            native_language,
-            session_id
-        )
+        return await turn["emotion_task"]
     except Exception as e:
-        logger.error(f"GPT response generation failed: {e}")
-        return error_response("대화 생성 중 오류가 발생했습니다", 500)
+        logger.error(f"Emotion analysis failed: {e}")
+        return None
+
+async def _complete_turn(user_id, turn, gpt_response):
+    """대화 턴 마무리 - 채팅 로그 저장 및 게임화 처리
+    
+    채팅 로그 저장, XP, 활동 로그, 스트릭, 사용량 증가는 서로 독립적이므로 동시에 실행하고,
+    이벤트 발행은 응답을 보낸 뒤 백그라운드에서 처리합니다.
+    
+    Args:
+        user_id: 사용자 ID
+        turn: _prepare_turn이 반환한 턴 컨텍스트
+        gpt_response: 생성된 AI 응답 텍스트
+        
+    Returns:
+        dict: 응답에 포함할 턴 결과 (session_id, emotion, xp_earned, streak_days, remaining_usage)
+    """
+    session_id = turn["session_id"]
+    user_level = turn["user_level"]
+    daily_limit = current_app.config.get("TALK_DAILY_LIMIT", 60)
+    
+    # GPT 응답과 겹쳐 실행된 감정 분석 결과 반영
+    emotion_data = await _resolve_emotion(turn)
+    turn["user_message"]["emotion"] = emotion_data
     
     # 응답 메시지 저장
     assistant_message = {
@@ -89,49 +167,55 @@ async def chat():
         "emotion": None  # AI는 감정 데이터 없음
     }
     
-    # 대화 기록에 AI 응답 추가
-    chat_history.append(assistant_message)
-    
-    # 채팅 로그 업데이트 또는 생성
-    if data.get('session_id'):
-        # 기존 세션 업데이트
-        await chat_logs_collection.update_one(
-            {"sessionId": session_id, "userId": ObjectId(user_id)},
-            {"$set": {"messages": chat_history, "updated_at": datetime.utcnow()}}
-        )
-    else:
-        # 새 세션 생성
-        await chat_logs_collection.insert_one({
-            "userId": ObjectId(user_id),
-            "sessionId": session_id,
-            "messages": chat_history,
-            "level": user_level,
-            "date": datetime.utcnow(),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        })
-    
     # ✅ 게임화 시스템 추가
     db = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
     
-    # XP 추가
-    await Common.add_xp(db, user_id, 8, XPAction.TALK_CHAT_COMPLETE.value)
+    results = await asyncio.gather(
+        # 이번 턴의 메시지만 세션 저장소에 추가 (MongoDB 저장은 백그라운드 flush에서 처리)
+        current_app.session_store.append_messages(
+            session_id,
+            user_id,
+            [turn["user_message"], assistant_message],
+            user_level,
+            turn["message_count"]
+        ),
+        # XP 추가
+        Common.add_xp(db, user_id, 8, XPAction.TALK_CHAT_COMPLETE.value),
+        # 활동 로깅
+        Common.log_activity(db, user_id, ActivityType.TALK_CHAT.value, "talk", {
+            "session_id": session_id,
+            "message_length": len(turn["message"]),
+            "user_level": user_level
+        }),
+        # 스트릭 업데이트
+        Common.update_streak(db, user_id),
+        # 사용량 증가 (증가 후 사용량을 반환하므로 남은 사용량을 따로 조회하지 않음)
+        current_app.usage_limiter.increment_usage(user_id, "talk"),
+        return_exceptions=True
+    )
+    saved, _, _, streak_result, current_usage = results
     
-    # 활동 로깅
-    await Common.log_activity(db, user_id, ActivityType.TALK_CHAT.value, "talk", {
-        "session_id": session_id,
-        "message_length": len(data['message']),
-        "user_level": user_level
-    })
+    # 채팅 로그 저장 실패는 그대로 전파, 게임화 처리 실패는 기록만 남김
+    if isinstance(saved, Exception):
+        raise saved
+    for result in results[1:]:
+        if isinstance(result, Exception):
+            logger.error(f"Talk bookkeeping failed: {result}")
     
-    # 스트릭 업데이트
-    streak_result = await Common.update_streak(db, user_id)
+    if isinstance(streak_result, Exception) or not streak_result:
+        streak_result = {}
     
-    # 사용량 증가
-    await current_app.usage_limiter.increment_usage(user_id, "talk")
+    if isinstance(current_usage, int):
+        remaining_usage = max(0, daily_limit - current_usage)
+    else:
+        remaining_usage = await current_app.usage_limiter.get_remaining(user_id, "talk", daily_limit)
     
-    # ✅ 이벤트 발행 (수정됨)
-    await current_app.event_bus.publish("user_activity", {
+    # 유지 구간 밖의 메시지가 충분히 쌓였으면 응답 이후 백그라운드에서 요약 갱신 (요청과 별도의 시간 예산)
+    if gpt_service.context_manager.needs_summary(turn["message_count"] + 2, turn["summarized_count"]):
+        current_app.add_background_task(resilience.detached(_refresh_summary), user_id, session_id, user_level)
+    
+    # ✅ 이벤트 발행 (응답 이후 백그라운드)
+    current_app.add_background_task(current_app.event_bus.publish, "user_activity", {
         "user_id": user_id,
         "activity": "talk_chat",
         "session_id": session_id,
@@ -140,52 +224,352 @@ async def chat():
         "timestamp": datetime.utcnow().isoformat()
     })
     
-    return api_response({
-        "response": gpt_response,
+    return {
         "session_id": session_id,
         "emotion": emotion_data,
         "xp_earned": 8,
         "streak_days": streak_result.get("streak_days"),
-        "remaining_usage": await current_app.usage_limiter.get_remaining(
-            user_id, "talk", current_app.config.get("TALK_DAILY_LIMIT", 60)
+        "remaining_usage": remaining_usage
+    }
+
+async def _refresh_summary(user_id, session_id, user_level):
+    """유지 구간 밖의 오래된 메시지를 세션 요약에 접어 넣기
+    
+    요청 경로 밖(백그라운드)에서 실행되므로 요약 생성 시간은 턴 지연에 포함되지 않습니다.
+    
+    Args:
+        user_id: 사용자 ID
+        session_id: 세션 ID
+        user_level: 사용자 레벨
+    """
+    try:
+        db_talk = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]]
+        context_manager = gpt_service.context_manager
+        
+        # 아직 MongoDB에 저장되지 않은 메시지까지 요약 구간에 포함되도록 먼저 저장
+        await current_app.session_store.flush_session(session_id, user_id)
+        
+        state = await Chat.get_summary_state(db_talk, session_id, user_id)
+        if not state:
+            return
+        
+        message_count = state["messageCount"]
+        summarized_count = state["summarizedCount"]
+        if not context_manager.needs_summary(message_count, summarized_count):
+            return
+        
+        skip, limit = context_manager.summary_range(message_count, summarized_count)
+        messages = await Chat.get_message_range(db_talk, session_id, user_id, skip, limit)
+        if not messages:
+            return
+        
+        summary = await gpt_service.summarize_conversation(state["summary"], messages, user_level)
+        updated = await Chat.update_summary(
+            db_talk,
+            session_id,
+            user_id,
+            summary,
+            summarized_count + len(messages),
+            summarized_count,
+            message_count
         )
+        if updated:
+            await current_app.session_store.update_summary(
+                session_id, user_id, summary, summarized_count + len(messages)
+            )
+    except Exception as e:
+        logger.error(f"Chat summary refresh failed: {e}")
+
+def _ndjson(event):
+    """스트리밍 이벤트를 NDJSON 한 줄로 직렬화"""
+    return (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+def _unavailable_event(error):
+    """서킷 열림/시간 예산 초과 스트림 이벤트 (스트림은 이미 200으로 시작했으므로 재시도 시간을 이벤트에 담음)"""
+    return {
+        "type": "error",
+        "message": "외부 서비스가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요",
+        "error_type": "service_unavailable",
+        "retry_after": resilience.retry_after_seconds(error)
+    }
+
+NDJSON_HEADERS = {
+    "Content-Type": "application/x-ndjson; charset=utf-8",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+async def _stream_turn(user_id, build_turn, voice=False):
+    """대화 턴을 NDJSON 이벤트 스트림으로 실행
+    
+    Args:
+        user_id: 사용자 ID
+        build_turn: 턴 컨텍스트를 반환하는 비동기 함수 (음성 입력이면 음성 인식 포함)
+        voice: 음성 입력 여부 (True면 인식 결과를 transcript 이벤트로 먼저 전송)
+    """
+    chunks = []
+    completed = False
+    failed = False
+    turn = None
+    
+    try:
+        turn = await build_turn()
+    except resilience.UNAVAILABLE_ERRORS as e:
+        logger.warning(f"Talk turn preparation unavailable: {e}")
+        yield _ndjson(_unavailable_event(e))
+        return
+    except Exception as e:
+        logger.error(f"Talk turn preparation failed: {e}")
+        message = "음성 인식 중 오류가 발생했습니다" if voice else "대화 생성 중 오류가 발생했습니다"
+        yield _ndjson({"type": "error", "message": message})
+        return
+    
+    if voice:
+        yield _ndjson({
+            "type": "transcript",
+            "session_id": turn["session_id"],
+            "text": turn["message"]
+        })
+    
+    yield _ndjson({
+        "type": "start",
+        "session_id": turn["session_id"]
+    })
+    
+    try:
+        async for token in gpt_service.stream_response(
+            turn["chat_history"],
+            turn["user_level"],
+            turn["native_language"],
+            turn["session_id"],
+            summary=turn["summary"]
+        ):
+            chunks.append(token)
+            yield _ndjson({"type": "token", "content": token})
+        
+        gpt_response = "".join(chunks).strip()
+        result = await _complete_turn(user_id, turn, gpt_response)
+        completed = True
+        
+        yield _ndjson({
+            "type": "done",
+            "response": gpt_response,
+            **result
+        })
+    except resilience.UNAVAILABLE_ERRORS as e:
+        logger.warning(f"GPT response streaming unavailable: {e}")
+        failed = True
+        _cancel_turn(turn)
+        yield _ndjson(_unavailable_event(e))
+    except Exception as e:
+        logger.error(f"GPT response streaming failed: {e}")
+        failed = True
+        _cancel_turn(turn)
+        yield _ndjson({"type": "error", "message": "대화 생성 중 오류가 발생했습니다"})
+    finally:
+        # 클라이언트가 중간에 연결을 끊은 경우에도 이미 전달된 응답은 저장
+        if not completed and not failed and chunks:
+            current_app.add_background_task(
+                resilience.detached(_complete_turn), user_id, turn, "".join(chunks).strip()
+            )
+
+@talk_routes.route('/chat', methods=['POST'])
+@current_app.auth_manager.require_auth
+async def chat():
+    user_id = request.user_id
+    data = await request.json
+    
+    if not data or not data.get('message'):
+        return error_response("메시지 내용이 필요합니다", 400)
+    
+    turn = await _prepare_turn(user_id, data)
+    
+    # 사용 제한 확인
+    if turn is None:
+        return error_response("오늘의 사용량을 초과했습니다", 429)
+    
+    # ✅ GPT 응답 생성 (빠진 부분 추가)
+    try:
+        gpt_response = await gpt_service.generate_response(
+            turn["chat_history"], 
+            turn["user_level"],
+            turn["native_language"],
+            turn["session_id"],
+            summary=turn["summary"]
+        )
+    except resilience.UNAVAILABLE_ERRORS:
+        # 서킷 열림/시간 예산 초과는 앱 핸들러에서 503 + Retry-After로 응답
+        _cancel_turn(turn)
+        raise
+    except Exception as e:
+        logger.error(f"GPT response generation failed: {e}")
+        _cancel_turn(turn)
+        return error_response("대화 생성 중 오류가 발생했습니다", 500)
+    
+    result = await _complete_turn(user_id, turn, gpt_response)
+    
+    return api_response({
+        "response": gpt_response,
+        **result
     }, "대화 응답이 생성되었습니다")
 
+@talk_routes.route('/chat/stream', methods=['POST'])
+@current_app.auth_manager.require_auth
+async def chat_stream():
+    """스트리밍 대화 API
+    
+    응답은 NDJSON(application/x-ndjson) 스트림이며 한 줄에 하나의 이벤트를 담습니다.
+        {"type": "start", "session_id": ...}
+        {"type": "token", "content": ...}   # 모델이 생성하는 대로 반복
+        {"type": "done", "response": ..., "emotion": ..., "xp_earned": ..., ...}
+        {"type": "error", "message": ...}   # 생성 실패 시 (일시적 장애면 error_type, retry_after 포함)
+    
+    스트림이 끝나면 /chat과 동일하게 채팅 로그 저장과 게임화 처리가 실행됩니다.
+    """
+    user_id = request.user_id
+    data = await request.json
+    
+    if not data or not data.get('message'):
+        return error_response("메시지 내용이 필요합니다", 400)
+    
+    turn = await _prepare_turn(user_id, data)
+    
+    # 사용 제한 확인
+    if turn is None:
+        return error_response("오늘의 사용량을 초과했습니다", 429)
+    
+    async def build_turn():
+        return turn
+    
+    generate = stream_with_context(_stream_turn)
+    return generate(user_id, build_turn), 200, NDJSON_HEADERS
+
+@talk_routes.route('/voice', methods=['POST'])
+@current_app.auth_manager.require_auth
+async def voice_chat():
+    """음성 대화 API
+    
+    multipart/form-data로 음성 파일(audio)과 선택적 session_id를 받아
+    음성 인식 → 대화 응답 생성을 한 번의 요청으로 처리합니다.
+    응답은 /chat/stream과 같은 NDJSON 스트림이며, 인식 결과가 나오는 즉시 먼저 전송됩니다.
+        {"type": "transcript", "session_id": ..., "text": ...}
+        {"type": "start", "session_id": ...}
+        {"type": "token", "content": ...}
+        {"type": "done", "response": ..., "emotion": ..., "xp_earned": ..., ...}
+        {"type": "error", "message": ...}
+    """
+    user_id = request.user_id
+    form = await request.form
+    files = await request.files
+    
+    audio_file = files.get('audio')
+    if not audio_file:
+        return error_response("음성 파일이 필요합니다", 400)
+    
+    audio_data = audio_file.read()
+    if not audio_data:
+        return error_response("음성 파일이 비어 있습니다", 400)
+    
+    suffix = os.path.splitext(audio_file.filename or "")[1] or ".wav"
+    
+    # 음성 인식은 사용량/사용자/대화 기록 조회와 동시에 시작
+    transcribe_task = asyncio.ensure_future(whisper_service.transcribe_audio(audio_data, suffix))
+    try:
+        can_use, user, chat_context = await _load_turn_inputs(user_id, form.get('session_id'))
+    except BaseException:
+        # 조회가 실패하면 아무도 기다리지 않을 음성 인식 호출도 취소
+        transcribe_task.cancel()
+        raise
+
+    # 사용 제한 확인
+    if not can_use:
+        transcribe_task.cancel()
+        return error_response("오늘의 사용량을 초과했습니다", 429)
+    
+    session_id = form.get('session_id') or str(uuid.uuid4())
+    
+    async def build_turn():
+        transcript = await transcribe_task
+        text = (transcript.get("text") or "").strip()
+        if not text:
+            raise ValueError("Empty transcript")
+        return _start_turn(session_id, user, chat_context, text)
+    
+    generate = stream_with_context(_stream_turn)
+    return generate(user_id, build_turn, voice=True), 200, NDJSON_HEADERS
+
 @talk_routes.route('/sessions', methods=['GET'])
 @current_app.auth_manager.require_auth
 async def get_sessions():
+    """채팅 세션 목록 조회 API
+    
+    Query Parameters:
+        limit: 페이지 크기 (기본값 20, 최대 50)
+        cursor: 이전 응답의 next_cursor (다음 페이지 조회 시)
+    """
     user_id = request.user_id
     
-    # 채팅 세션 목록 가져오기
-    chat_logs_collection = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]].chat_logs
-    cursor = chat_logs_collection.find(
-        {"userId": ObjectId(user_id)},
-        {"_id": 1, "sessionId": 1, "date": 1, "updated_at": 1}
-    ).sort("updated_at", -1)
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 50)
+    except ValueError:
+        return error_response("limit은 숫자여야 합니다", 400)
+    
+    # 채팅 세션 목록 가져오기 (최근 업데이트 순, 커서 기반 페이지)
+    db_talk = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]]
+    try:
+        page, next_cursor = await Chat.get_user_sessions_page(
+            db_talk,
+            user_id,
+            limit,
+            request.args.get('cursor')
+        )
+    except ValueError:
+        return error_response("유효하지 않은 커서입니다", 400)
     
     sessions = []
-    async for session in cursor:
+    for session in page:
         sessions.append({
             "id": str(session["_id"]),
             "sessionId": session["sessionId"],
             "date": session["date"].isoformat() if "date" in session else None,
-            "updated_at": session["updated_at"].isoformat() if "updated_at" in session else None
+            "updated_at": session["updated_at"].isoformat() if "updated_at" in session else None,
+            "level": session.get("level"),
+            "message_count": session.get("messageCount")
         })
     
     return api_response({
-        "sessions": sessions
+        "sessions": sessions,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }, "세션 목록을 성공적으로 조회했습니다")
 
 @talk_routes.route('/session/<session_id>', methods=['GET'])
 @current_app.auth_manager.require_auth
 async def get_session(session_id):
+    """채팅 세션 상세 조회 API
+    
+    Query Parameters:
+        limit: 가져올 메시지 수 (기본값 50, 최대 100)
+        before: 이전 응답의 next_before (더 오래된 메시지 조회 시)
+    """
     user_id = request.user_id
     
-    # 특정 채팅 세션 가져오기
-    chat_logs_collection = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]].chat_logs
-    session = await chat_logs_collection.find_one(
-        {"sessionId": session_id, "userId": ObjectId(user_id)}
-    )
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 100)
+        before = request.args.get('before')
+        before = int(before) if before is not None else None
+    except ValueError:
+        return error_response("limit과 before는 숫자여야 합니다", 400)
+    
+    # 활성 세션이면 아직 저장되지 않은 메시지를 먼저 MongoDB에 반영
+    try:
+        await current_app.session_store.flush_session(session_id, user_id)
+    except Exception as e:
+        logger.error(f"Session flush before read failed: {e}")
+    
+    # 특정 채팅 세션의 메시지 구간 가져오기
+    db_talk = current_app.mongo_client[current_app.config["MONGO_DB_TALK"]]
+    session = await Chat.get_message_window(db_talk, session_id, user_id, limit, before)
     
     if not session:
         return error_response("세션을 찾을 수 없습니다", 404)
@@ -201,9 +585,14 @@ async def get_session(session_id):
         }
         messages.append(formatted_msg)
     
+    start = session.get("start", 0)
+    
     return api_response({
         "session_id": session_id,
         "messages": messages,
+        "total_messages": session.get("total", 0),
+        "next_before": start if start > 0 else None,
+        "has_more": start > 0,
         "level": session.get("level", "beginner"),
         "created_at": session.get("created_at").isoformat() if "created_at" in session else None,
         "updated_at": session.get("updated_at").isoformat() if "updated_at" in session else None
@@ -1,11 +1,11 @@
 from quart import Blueprint, request, jsonify, current_app
 from bson.objectid import ObjectId
-import uuid
 from datetime import datetime, timedelta
 from app.models.test import Test
 from app.models.user import User
 from app.utils.response import api_response, error_response
 from app.services.gpt_service import GPTService
+from app.services.content_pool import TEST_TYPE_DESCRIPTIONS
 
 test_routes = Blueprint('test', __name__, url_prefix='/api/v1/test')
 
@@ -31,13 +31,19 @@ async def get_questions():
     except ValueError:
         return error_response("레벨은 정수여야 합니다.", 400)
     
+    # 유형 검증 (풀 키가 되므로 알려진 유형만 허용)
+    if test_type is not None and test_type not in TEST_TYPE_DESCRIPTIONS:
+        return error_response(f"유효하지 않은 문제 유형입니다. {', '.join(TEST_TYPE_DESCRIPTIONS)} 중 하나를 선택하세요.", 400)
+    
     # 문제 개수 제한
     if count > 20:
         count = 20
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "test")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "test", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Test & Study 서비스 구독이 필요합니다.", 403)
@@ -52,53 +58,11 @@ async def get_questions():
     if not can_use:
         return error_response("오늘의 사용량을 초과했습니다.", 429)
     
-    # 테스트 문제 조회
-    db_test = current_app.mongo_client[current_app.config.get("MONGO_DB_TEST")]
-    test_content = await Test.find_by_level_and_type(db_test, level, test_type, limit=1)
-    
-    if not test_content:
-        # 테스트 데이터가 없는 경우, GPT로 생성
-        # 실제 구현에서는 미리 생성된 데이터를 사용하는 것이 좋음
-        
-        # 레벨별 문제 생성 프롬프트
-        level_descriptions = {
-            1: "TOPIK I - 1급 (초급) 수준의 한국어 문제",
-            2: "TOPIK I - 2급 (초급) 수준의 한국어 문제",
-            3: "TOPIK II - 3급 (중급) 수준의 한국어 문제",
-            4: "TOPIK II - 4급 (중급) 수준의 한국어 문제",
-            5: "TOPIK II - 5급 (고급) 수준의 한국어 문제",
-            6: "TOPIK II - 6급 (고급) 수준의 한국어 문제"
-        }
-        
-        type_descriptions = {
-            "vocabulary": "어휘",
-            "grammar": "문법",
-            "reading": "읽기",
-            "listening": "듣기",
-            "writing": "쓰기"
-        }
-        
-        type_str = type_descriptions.get(test_type, "종합")
-        prompt = f"{level_descriptions[level]}의 {type_str} 문제 {count}개를 생성해주세요. 각 문제는 질문, 4개의 선택지, 정답, 해설을 포함해야 합니다."
-        
-        # GPT를 사용하여 문제 생성
-        generated_questions = await gpt_service.generate_test_questions(prompt, count)
-        
-        # 생성된 문제를 DB에 저장
-        test_data = {
-            "title": f"TOPIK {level}급 {type_str} 문제",
-            "description": f"TOPIK {level}급 {type_str} 테스트",
-            "level": level,
-            "test_type": test_type,
-            "questions": generated_questions
-        }
-        
-        await Test.create(db_test, test_data)
-        test_content = await Test.find_by_level_and_type(db_test, level, test_type, limit=1)
+    # 테스트 문제 조회 - 콘텐츠 풀에서 조회 (생성은 풀이 백그라운드에서 처리)
+    test = await current_app.content_pool.take("test", level, test_type)
     
     # 응답 데이터 가공
-    if test_content:
-        test = test_content[0]
+    if test:
         questions = test.get('questions', [])
         
         # 문제 수 제한
@@ -121,8 +85,8 @@ async def get_questions():
             "total_questions": len(questions)
         }
     else:
-        # 생성에 실패한 경우
-        return error_response("문제 생성에 실패했습니다.", 500)
+        # 풀이 아직 비어 있는 경우 (채우기는 이미 시작됨)
+        return error_response("문제를 준비 중입니다. 잠시 후 다시 시도해주세요.", 503)
     
     # 남은 사용량
     remaining = await current_app.usage_limiter.get_remaining(
@@ -148,7 +112,9 @@ async def submit_answers():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "test")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "test", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Test & Study 서비스 구독이 필요합니다.", 403)
@@ -261,7 +227,9 @@ async def get_results():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "test")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "test", current_app.cache_manager
+    )
     
     if not has_subscription:
         return error_response("Test & Study 서비스 구독이 필요합니다.", 403)
@@ -333,7 +301,9 @@ async def get_usage():
     
     # 구독 상태 확인
     db_users = current_app.mongo_client[current_app.config.get("MONGO_DB_USERS")]
-    has_subscription = await User.has_active_subscription(db_users, user_id, "test")
+    has_subscription = await User.has_active_subscription(
+        db_users, user_id, "test", current_app.cache_manager
+    )
     
     # 남은 사용량 확인
     remaining = await current_app.usage_limiter.get_remaining(
@@ -0,0 +1,394 @@
+"""
+SpitKorean 콘텐츠 풀
+(상품, 레벨, 유형)별로 최근 생성된 콘텐츠를 목표 수량만큼 유지하고, 부족해지면 백그라운드에서 GPT로 채웁니다.
+요청 처리 경로는 풀에서 읽기만 하고 GPT 생성을 기다리지 않습니다.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.core import resilience
+from app.models.drama import Drama
+from app.models.journey import Journey
+from app.models.test import Test
+from app.services.gpt_service import GPTService
+
+logger = logging.getLogger(__name__)
+
+# 풀 키: (상품, 레벨, 유형)
+PoolKey = Tuple[str, object, Optional[str]]
+
+DRAMA_PROMPTS = {
+    "beginner": "한국어 초급 레벨(3-5단어)의 간단한 한국 드라마 대화 문장 5개를 생성해주세요. 일상 대화 위주로 만들어주세요.",
+    "intermediate": "한국어 중급 레벨(7-10단어)의 한국 드라마 대화 문장 5개를 생성해주세요. 감정 표현과 연결어미를 포함해주세요.",
+    "advanced": "한국어 고급 레벨(12단어 이상)의 복잡한 한국 드라마 대화 문장 5개를 생성해주세요. 관형절과 고급 표현을 포함해주세요."
+}
+
+TEST_LEVEL_DESCRIPTIONS = {
+    1: "TOPIK I - 1급 (초급) 수준의 한국어 문제",
+    2: "TOPIK I - 2급 (초급) 수준의 한국어 문제",
+    3: "TOPIK II - 3급 (중급) 수준의 한국어 문제",
+    4: "TOPIK II - 4급 (중급) 수준의 한국어 문제",
+    5: "TOPIK II - 5급 (고급) 수준의 한국어 문제",
+    6: "TOPIK II - 6급 (고급) 수준의 한국어 문제"
+}
+
+TEST_TYPE_DESCRIPTIONS = {
+    "vocabulary": "어휘",
+    "grammar": "문법",
+    "reading": "읽기",
+    "listening": "듣기",
+    "writing": "쓰기"
+}
+
+TEST_QUESTION_COUNT = 20  # 테스트 하나에 생성할 문제 수 (요청별 개수는 조회 시 자름)
+
+JOURNEY_LEVEL_DESCRIPTIONS = {
+    "level1": "한글 마스터 (완전 초급) 수준의 간단한 한국어 텍스트",
+    "level2": "기초 리더 (초급) 수준의 한국어 텍스트",
+    "level3": "중급 리더 (중급) 수준의 한국어 텍스트",
+    "level4": "고급 리더 (고급) 수준의 한국어 텍스트"
+}
+
+JOURNEY_TYPE_DESCRIPTIONS = {
+    "hangul": "한글 자음과 모음 학습",
+    "reading": "읽기 연습용 텍스트",
+    "pronunciation": "발음 연습용 텍스트",
+    "dialogue": "대화 형식의 텍스트"
+}
+
+JOURNEY_LEVEL_SETTINGS = {
+    "level1": {
+        "title": "한글 기초 학습",
+        "description": "한글 자음과 모음, 기초 단어를 학습합니다.",
+        "recommended_speed": 0.5
+    },
+    "level2": {
+        "title": "일상 한국어 읽기",
+        "description": "간단한 일상 대화와 문장을 읽습니다.",
+        "recommended_speed": 0.8
+    },
+    "level3": {
+        "title": "중급 한국어 텍스트",
+        "description": "뉴스, 블로그 글 등의 중급 텍스트를 읽습니다.",
+        "recommended_speed": 1.0
+    },
+    "level4": {
+        "title": "고급 한국어 콘텐츠",
+        "description": "문학 작품, 전문적인 글 등의 고급 텍스트를 읽습니다.",
+        "recommended_speed": 1.2
+    }
+}
+
+class ContentPool:
+    """콘텐츠 풀 관리자
+
+    최근 CONTENT_POOL_FRESH_DAYS일 안에 만들어진 콘텐츠를 키별 재고로 보고, 재고가
+    CONTENT_POOL_LOW_WATER 아래로 떨어지면 CONTENT_POOL_TARGETS까지 채웁니다.
+    기본으로 각 상품의 레벨별(유형 없음) 키를 관리하고, 요청에서 들어온 키(notify)를 추가로 관리합니다.
+
+    채우기는 키별 single-flight(Redis 락)로 감싸서 여러 워커가 같은 콘텐츠를 중복 생성하지 않습니다.
+    워커는 확인 주기마다 유사 문장/문법 포인트가 없는 기존 드라마 문장도 배치로 채웁니다 (enrich_pending).
+    """
+
+    def __init__(self, mongo_client, gpt_service: GPTService = None, targets: Dict[str, int] = None,
+                 low_water: Dict[str, int] = None, fresh_days: int = None, check_interval: float = None):
+        """
+        Args:
+            mongo_client: MongoDB 클라이언트
+            gpt_service: 콘텐츠 생성에 사용할 GPT 서비스
+            targets: {상품: 키별 목표 재고}
+            low_water: {상품: 채우기를 시작할 재고}
+            fresh_days: 재고로 보는 콘텐츠의 최대 생성 경과 일수
+            check_interval: 재고 확인 주기(초)
+        """
+        self.mongo_client = mongo_client
+        self.gpt_service = gpt_service or GPTService()
+        self.targets = targets or settings.CONTENT_POOL_TARGETS
+        self.low_water = low_water or settings.CONTENT_POOL_LOW_WATER
+        self.fresh_days = fresh_days or settings.CONTENT_POOL_FRESH_DAYS
+        self.check_interval = check_interval or settings.CONTENT_POOL_CHECK_INTERVAL
+        self.is_running = False
+
+        self.keys: Set[PoolKey] = set()
+        for level in DRAMA_PROMPTS:
+            self.keys.add(("drama", level, None))
+        for level in TEST_LEVEL_DESCRIPTIONS:
+            self.keys.add(("test", level, None))
+        for level in JOURNEY_LEVEL_DESCRIPTIONS:
+            self.keys.add(("journey", level, None))
+
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+
+    def _collection(self, product: str):
+        """상품별 콘텐츠 컬렉션"""
+        if product == "drama":
+            return self.mongo_client[settings.MONGO_DB_DRAMA][Drama.collection_name]
+        if product == "test":
+            return self.mongo_client[settings.MONGO_DB_TEST][Test.collection_name]
+        return self.mongo_client[settings.MONGO_DB_JOURNEY][Journey.collection_name]
+
+    @staticmethod
+    def _query(product: str, level, content_type: Optional[str] = None) -> Dict:
+        """상품별 키 조회 조건"""
+        query = {"level": level}
+        if content_type:
+            query["test_type" if product == "test" else "content_type"] = content_type
+        return query
+
+    def _fresh_query(self, product: str, level, content_type: Optional[str] = None) -> Dict:
+        query = self._query(product, level, content_type)
+        query["created_at"] = {"$gte": datetime.utcnow() - timedelta(days=self.fresh_days)}
+        return query
+
+    async def count_fresh(self, product: str, level, content_type: Optional[str] = None) -> int:
+        """키별 재고 수"""
+        return await self._collection(product).count_documents(
+            self._fresh_query(product, level, content_type)
+        )
+
+    async def take(self, product: str, level, content_type: Optional[str] = None) -> Optional[Dict]:
+        """풀에서 콘텐츠 하나 조회 (재고 중 무작위, 재고가 없으면 가장 최근 콘텐츠)
+
+        Args:
+            product: test 또는 journey
+            level: 레벨
+            content_type: 유형 (선택적)
+
+        Returns:
+            dict: 콘텐츠 문서, 아직 하나도 없으면 None (채우기를 바로 시작함)
+        """
+        self.notify(product, level, content_type)
+        collection = self._collection(product)
+
+        sampled = await collection.aggregate([
+            {"$match": self._fresh_query(product, level, content_type)},
+            {"$sample": {"size": 1}}
+        ]).to_list(length=None)
+        if sampled:
+            return sampled[0]
+
+        latest = await collection.find(self._query(product, level, content_type)).sort(
+            "created_at", -1
+        ).limit(1).to_list(length=None)
+        if latest:
+            return latest[0]
+
+        self.request_refill(product, level, content_type)
+        return None
+
+    @staticmethod
+    def is_known_key(product: str, level, content_type: Optional[str] = None) -> bool:
+        """상품/레벨/유형이 생성 프롬프트가 있는 조합인지 확인"""
+        if product == "drama":
+            return level in DRAMA_PROMPTS and content_type is None
+        if product == "test":
+            return level in TEST_LEVEL_DESCRIPTIONS and (content_type is None or content_type in TEST_TYPE_DESCRIPTIONS)
+        if product == "journey":
+            return level in JOURNEY_LEVEL_DESCRIPTIONS and (content_type is None or content_type in JOURNEY_TYPE_DESCRIPTIONS)
+        return False
+
+    def notify(self, product: str, level, content_type: Optional[str] = None):
+        """요청에서 사용된 키를 관리 대상에 추가 (I/O 없음, 알 수 없는 키는 무시)"""
+        key = (product, level, content_type)
+        if key not in self.keys and self.is_known_key(product, level, content_type):
+            self.keys.add(key)
+            self.request_refill(product, level, content_type)
+
+    def request_refill(self, product: str, level, content_type: Optional[str] = None):
+        """키 채우기를 백그라운드로 시작 (이미 진행 중이거나 알 수 없는 키면 무시)"""
+        if not self.is_known_key(product, level, content_type):
+            return
+        key = (product, level, content_type)
+        task = self._refills.get(key)
+        if task is None or task.done():
+            self._refills[key] = asyncio.ensure_future(self.refill(product, level, content_type))
+
+    async def refill(self, product: str, level, content_type: Optional[str] = None) -> int:
+        """재고가 low-water 아래면 목표 수량까지 생성
+
+        Returns:
+            int: 이 워커가 생성한 콘텐츠 수
+        """
+        target = self.targets.get(product, 1)
+        if await self.count_fresh(product, level, content_type) >= self.low_water.get(product, 1):
+            return 0
+
+        async def generate_one():
+            # 다른 워커가 그사이 채웠으면 생성하지 않음
+            if await self.count_fresh(product, level, content_type) >= target:
+                return False
+            resilience.start_deadline(settings.CONTENT_GENERATION_DEADLINE)
+            await self._generate(product, level, content_type)
+            return True
+
+        created = 0
+        try:
+            for _ in range(target):
+                if not await self.gpt_service.single_flight.do(
+                    f"pool:{product}:{level}:{content_type}", generate_one
+                ):
+                    break
+                created += 1
+        except Exception as e:
+            logger.error(f"Content pool refill failed for {product}/{level}/{content_type}: {e}")
+
+        if created:
+            logger.info(f"Content pool refilled {product}/{level}/{content_type} with {created} item(s)")
+        return created
+
+    async def _generate(self, product: str, level, content_type: Optional[str] = None):
+        """콘텐츠 하나 생성 후 저장"""
+        if product == "drama":
+            await self._generate_drama(level)
+        elif product == "test":
+            await self._generate_test(level, content_type)
+        else:
+            await self._generate_journey(level, content_type)
+
+    async def _generate_drama(self, level: str):
+        """드라마 문장 생성 (유사 문장/문법 포인트 포함)"""
+        generated_sentences = await self.gpt_service.generate_drama_sentences(DRAMA_PROMPTS[level])
+
+        # 실패하면 enriched_at 없이 저장되고 워커의 enrich_pending이 다음 확인 때 채움
+        try:
+            enrichments = await self.gpt_service.enrich_sentences(generated_sentences, level)
+        except Exception as e:
+            logger.error(f"Drama sentence enrichment failed: {e}")
+            enrichments = [None] * len(generated_sentences)
+
+        enriched_at = datetime.utcnow()
+        sentences = []
+        for sentence, enrichment in zip(generated_sentences, enrichments):
+            item = {
+                "id": str(uuid.uuid4()),
+                "content": sentence,
+                "translation": "",  # 실제로는 번역 서비스 사용
+                "grammar_points": []
+            }
+            if enrichment:
+                item.update(enrichment, enriched_at=enriched_at)
+            sentences.append(item)
+
+        await Drama.create(self.mongo_client[settings.MONGO_DB_DRAMA], {
+            "title": f"{level.capitalize()} 드라마 대화",
+            "description": f"{level} 레벨에 적합한 드라마 대화 문장",
+            "level": level,
+            "sentences": sentences,
+            "genre": "daily",
+            "source": "AI 생성"
+        })
+
+    async def _generate_test(self, level: int, test_type: Optional[str] = None):
+        """TOPIK 문제 생성"""
+        type_str = TEST_TYPE_DESCRIPTIONS.get(test_type, "종합")
+        prompt = f"{TEST_LEVEL_DESCRIPTIONS[level]}의 {type_str} 문제 {TEST_QUESTION_COUNT}개를 생성해주세요. 각 문제는 질문, 4개의 선택지, 정답, 해설을 포함해야 합니다."
+
+        generated_questions = await self.gpt_service.generate_test_questions(prompt, TEST_QUESTION_COUNT)
+
+        await Test.create(self.mongo_client[settings.MONGO_DB_TEST], {
+            "title": f"TOPIK {level}급 {type_str} 문제",
+            "description": f"TOPIK {level}급 {type_str} 테스트",
+            "level": level,
+            "test_type": test_type,
+            "questions": generated_questions
+        })
+
+    async def _generate_journey(self, level: str, content_type: Optional[str] = None):
+        """리딩 콘텐츠와 가이드 생성"""
+        type_str = JOURNEY_TYPE_DESCRIPTIONS.get(content_type, "읽기 연습용 텍스트")
+        prompt = f"{JOURNEY_LEVEL_DESCRIPTIONS[level]}를 생성해주세요. 이 텍스트는 {type_str}로 사용됩니다."
+
+        generated_content = await self.gpt_service.generate_reading_content(prompt, level)
+        guide = await self.gpt_service.generate_reading_guide(generated_content, level)
+
+        level_settings = JOURNEY_LEVEL_SETTINGS[level]
+        await Journey.create(self.mongo_client[settings.MONGO_DB_JOURNEY], {
+            "title": level_settings["title"],
+            "description": level_settings["description"],
+            "level": level,
+            "content_type": content_type or "reading",
+            "content": {
+                "text": generated_content,
+                "sentences": [{"id": str(uuid.uuid4()), "text": sentence.strip()}
+                              for sentence in generated_content.split(".") if sentence.strip()],
+                "recommended_speed": level_settings["recommended_speed"]
+            },
+            "guide": guide
+        })
+
+    async def enrich_pending(self, limit: int = None) -> int:
+        """유사 문장/문법 포인트가 없는 기존 드라마 문장을 배치로 채움
+
+        생성 시 보강에 실패했거나 사전 생성 이전에 만들어진 드라마를 처리합니다.
+        single-flight(Redis 락)로 감싸 한 번에 한 워커만 처리합니다.
+
+        Args:
+            limit: 한 번에 처리할 드라마 수 (없으면 CONTENT_POOL_ENRICH_BATCH)
+
+        Returns:
+            int: 보강된 문장 수
+        """
+        limit = limit or settings.CONTENT_POOL_ENRICH_BATCH
+        db = self.mongo_client[settings.MONGO_DB_DRAMA]
+
+        async def enrich_batch():
+            resilience.start_deadline(settings.CONTENT_GENERATION_DEADLINE)
+            dramas = await Drama.find_unenriched(db, limit=limit)
+
+            async def enrich(drama):
+                pending = [s for s in drama.get("sentences", []) if "enriched_at" not in s and s.get("content")]
+                if not pending:
+                    return 0
+                enrichments = await self.gpt_service.enrich_sentences(
+                    [s["content"] for s in pending], drama.get("level", "beginner")
+                )
+                return await Drama.set_sentence_enrichment(
+                    db, drama["_id"], {s["id"]: e for s, e in zip(pending, enrichments) if e}
+                )
+
+            results = await asyncio.gather(*(enrich(drama) for drama in dramas), return_exceptions=True)
+            for error in (r for r in results if isinstance(r, Exception)):
+                logger.error(f"Drama sentence enrichment failed: {error}")
+            return sum(r for r in results if isinstance(r, int))
+
+        enriched = await self.gpt_service.single_flight.do("pool:drama:enrich", enrich_batch)
+        if enriched:
+            logger.info(f"Content pool enriched {enriched} drama sentence(s)")
+        return enriched
+
+    async def start_worker(self):
+        """주기적 재고 확인 시작 (백그라운드 태스크)"""
+        if self.is_running:
+            logger.warning("Content pool worker already running")
+            return
+
+        self.is_running = True
+        logger.info("Content pool worker started")
+
+        while self.is_running:
+            semaphore = asyncio.Semaphore(settings.CONTENT_POOL_CONCURRENCY)
+
+            async def check(key):
+                async with semaphore:
+                    await self.refill(*key)
+
+            try:
+                await asyncio.gather(*(check(key) for key in list(self.keys)))
+                await self.enrich_pending()
+            except Exception as e:
+                logger.error(f"Content pool worker error: {e}")
+            await asyncio.sleep(self.check_interval)
+
+        logger.info("Content pool worker stopped")
+
+    async def stop_worker(self):
+        """주기적 재고 확인 중지 및 진행 중인 채우기 취소"""
+        self.is_running = False
+        for task in self._refills.values():
+            if not task.done():
+                task.cancel()
+        logger.info("Content pool worker stop requested")
@@ -0,0 +1,167 @@
+"""
+SpitKorean 대화 컨텍스트 관리자
+토큰 예산 안에서 시스템 프롬프트, 요약, 최근 대화를 조합
+"""
+import logging
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+try:
+    import tiktoken  # 선택적 의존성: 설치되어 있으면 정확한 토큰 수 계산
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+class ContextWindowManager:
+    """토큰 예산 기반 대화 컨텍스트 관리자
+
+    프롬프트는 [시스템 프롬프트] + [이전 대화 요약] + [최근 N턴 원문]으로 구성됩니다.
+    오래된 턴은 세션 문서의 summary 필드에 점진적으로 요약되어 저장되므로,
+    대화가 길어져도 매 턴의 프롬프트 크기는 예산 안에서 일정하게 유지됩니다.
+    """
+
+    # 메시지 하나당 role/구분자 등에 붙는 고정 토큰 수
+    MESSAGE_OVERHEAD_TOKENS = 4
+
+    def __init__(self, token_budget: int = None, keep_turns: int = None,
+                 summary_batch_turns: int = None, model: str = "gpt-4"):
+        """
+        Args:
+            token_budget: 프롬프트 전체 토큰 예산
+            keep_turns: 원문 그대로 유지할 최근 턴 수 (1턴 = 사용자 + AI 메시지)
+            summary_batch_turns: 요약을 갱신할 때 한 번에 접어 넣을 턴 수
+            model: 토큰 계산에 사용할 모델 이름
+        """
+        self.token_budget = token_budget or settings.TALK_CONTEXT_TOKEN_BUDGET
+        self.keep_turns = keep_turns or settings.TALK_CONTEXT_KEEP_TURNS
+        self.summary_batch_turns = summary_batch_turns or settings.TALK_SUMMARY_BATCH_TURNS
+        self.encoding = None
+
+        if tiktoken:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, using estimate: {e}")
+
+    @property
+    def keep_messages(self) -> int:
+        """원문 그대로 유지할 최근 메시지 수"""
+        return self.keep_turns * 2
+
+    @property
+    def fetch_limit(self) -> int:
+        """세션에서 불러올 최근 메시지 수
+
+        아직 요약되지 않은 메시지가 최대 (유지 턴 + 요약 배치 턴)만큼 쌓이므로
+        그 범위를 모두 불러와야 요약과 원문 사이에 빠지는 메시지가 없습니다.
+        """
+        return (self.keep_turns + self.summary_batch_turns) * 2
+
+    def count_tokens(self, text: str) -> int:
+        """텍스트 토큰 수 계산
+
+        Args:
+            text: 계산할 텍스트
+
+        Returns:
+            int: 토큰 수 (tiktoken이 없으면 추정값)
+        """
+        if not text:
+            return 0
+
+        if self.encoding:
+            return len(self.encoding.encode(text))
+
+        # 추정: 한글 등 비 ASCII 문자는 글자당 약 1토큰, ASCII는 4글자당 약 1토큰
+        non_ascii = sum(1 for ch in text if ord(ch) > 127)
+        ascii_chars = len(text) - non_ascii
+        return non_ascii + (ascii_chars + 3) // 4
+
+    def count_message_tokens(self, message: Dict) -> int:
+        """메시지 하나의 토큰 수 계산"""
+        return self.count_tokens(message.get("content", "")) + self.MESSAGE_OVERHEAD_TOKENS
+
+    def unsummarized_messages(self, context: Optional[Dict]) -> List[Dict]:
+        """요약에 포함되지 않은 최근 메시지만 추출
+
+        Args:
+            context: Chat.get_context가 반환한 세션 정보
+
+        Returns:
+            list: 요약 이후의 메시지 목록 (오래된 순)
+        """
+        if not context:
+            return []
+
+        messages = context.get("messages", [])
+        message_count = context.get("messageCount") or len(messages)
+        summarized_count = context.get("summarizedCount", 0)
+
+        # 불러온 구간의 첫 메시지 인덱스
+        first_index = max(0, message_count - len(messages))
+        skip = max(0, summarized_count - first_index)
+        return messages[skip:]
+
+    def build_messages(self, system_prompt: str, chat_history: List[Dict],
+                       summary: Optional[str] = None) -> List[Dict]:
+        """토큰 예산에 맞춘 프롬프트 메시지 구성
+
+        시스템 프롬프트와 요약은 항상 포함하고, 최근 메시지부터 거꾸로 채우다가
+        예산을 넘으면 더 오래된 메시지는 버립니다. 마지막 사용자 메시지는 항상 포함합니다.
+
+        Args:
+            system_prompt: 시스템 프롬프트
+            chat_history: 요약 이후의 대화 메시지 목록
+            summary: 이전 대화 요약 (선택적)
+
+        Returns:
+            list: 모델에 전달할 메시지 목록
+        """
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"지금까지의 대화 요약:\n{summary}"
+            })
+
+        used = sum(self.count_message_tokens(msg) for msg in messages)
+
+        selected = []
+        for msg in reversed(chat_history[-self.fetch_limit:]):
+            formatted = {"role": msg["role"], "content": msg["content"]}
+            tokens = self.count_message_tokens(formatted)
+            if selected and used + tokens > self.token_budget:
+                break
+            selected.append(formatted)
+            used += tokens
+
+        selected.reverse()
+        return messages + selected
+
+    def needs_summary(self, message_count: int, summarized_count: int) -> bool:
+        """요약 갱신 필요 여부
+
+        Args:
+            message_count: 세션 전체 메시지 수
+            summarized_count: 요약에 포함된 메시지 수
+
+        Returns:
+            bool: 유지 구간 밖의 미요약 메시지가 배치 크기 이상 쌓였는지 여부
+        """
+        pending = message_count - summarized_count - self.keep_messages
+        return pending >= self.summary_batch_turns * 2
+
+    def summary_range(self, message_count: int, summarized_count: int) -> tuple:
+        """이번에 요약할 메시지 구간 계산
+
+        Args:
+            message_count: 세션 전체 메시지 수
+            summarized_count: 요약에 포함된 메시지 수
+
+        Returns:
+            tuple: (시작 인덱스, 개수)
+        """
+        end = max(summarized_count, message_count - self.keep_messages)
+        return summarized_count, end - summarized_count
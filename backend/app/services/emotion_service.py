@@ -1,38 +1,120 @@
-import os
-import json
-import random
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+import re
+import numpy as np
 
 class EmotionService:
+    """한국어 감정 분석 서비스 - 감정 어휘, 이모티콘, 어미 패턴 기반의 로컬 분류기
+
+    외부 API 호출 없이 프로세스 안에서 동작하므로 대화 턴마다 네트워크 왕복이 생기지 않고,
+    같은 입력에는 항상 같은 결과를 반환합니다.
+    """
+
+    EMOTIONS = ["neutral", "happy", "sad", "surprised", "angry", "fearful"]
+
+    # 감정 표현이 전혀 없을 때 neutral로 판단되도록 주는 기본 점수
+    NEUTRAL_BASELINE = 0.6
+
+    # (패턴, {감정: 가중치}) - 어간 위주로 적어 활용형까지 잡히도록 함
+    FEATURES = [
+        # 부정 표현: 긍정 어휘를 상쇄하고 슬픔/분노 쪽으로 이동
+        # 같은 위치에서 시작하면 먼저 적힌 패턴이 이기므로 기쁨 어휘보다 앞에 둠 ("행복하지 않아요")
+        (r"(?:안|못)\s?(?:좋|행복|기쁘|즐겁|재밌)|(?:좋|좋아하|행복하|기쁘|즐겁|재밌)지\s?(?:않|못)|재미\s?없|별로", {"happy": -1.5, "sad": 0.7, "angry": 0.3}),
+        # 기쁨
+        (r"행복|기쁘|기뻐|즐겁|즐거|신나|신난|설레|좋아|좋다|좋네|좋은|최고|재밌|재미있|고마|감사|사랑|다행|뿌듯|웃기", {"happy": 1.0}),
+        (r"ㅋㅋ+|ㅎㅎ+|\^\^|\^_\^|:\)|:D|😀|😁|😂|😊|😄|🥰|❤️?|♥", {"happy": 0.8}),
+        (r"\bhappy\b|\bglad\b|\bgreat\b|\blove\b|\bfun\b|\bthanks?\b", {"happy": 0.6}),
+        # 슬픔
+        (r"슬프|슬퍼|슬픈|우울|외롭|외로|눈물|울고|울었|힘들|힘드|속상|아쉽|아쉬|그립|그리워|서운|허전|지쳤|지친", {"sad": 1.0}),
+        (r"ㅠ+|ㅜ+|T_T|T\.T|:\(|😢|😭|😞|😔", {"sad": 0.8}),
+        (r"\bsad\b|\bdepressed\b|\blonely\b|\bmiss\b|\btired\b", {"sad": 0.6}),
+        # 놀람
+        (r"놀라|놀랐|놀랍|깜짝|헐|대박|어머|세상에|믿을 수 없|진짜요\?|정말요\?|설마", {"surprised": 1.0}),
+        (r"[!?]{2,}|😮|😲|😱|🤯", {"surprised": 0.7}),
+        (r"\bwow\b|\bomg\b|\bsurpris", {"surprised": 0.6}),
+        # 분노
+        (r"화나|화가|화났|짜증|열받|빡치|빡쳐|싫어|싫다|미워|억울|어이없|답답|귀찮|분하", {"angry": 1.0}),
+        (r"😠|😡|🤬|💢", {"angry": 0.8}),
+        (r"\bangry\b|\bannoy|\bhate\b|\bmad\b", {"angry": 0.6}),
+        # 두려움
+        (r"무서|무섭|두려|두렵|걱정|불안|긴장|떨려|떨리|겁나|겁이|초조|막막", {"fearful": 1.0}),
+        (r"까\s?봐|면 어떡|면 어떻게 하", {"fearful": 0.8}),
+        (r"😨|😰|😟|😧", {"fearful": 0.8}),
+        (r"\bscared\b|\bafraid\b|\bworried\b|\bnervous\b", {"fearful": 0.6}),
+        # 감탄형 어미는 약한 놀람
+        (r"(?:네요|군요|구나|다니)(?=[\s.!?~]|$)", {"surprised": 0.3}),
+        # 느낌표 강조는 이미 잡힌 감정을 키우도록 약하게 전체에 분산
+        (r"!", {"happy": 0.1, "surprised": 0.1, "angry": 0.1}),
+    ]
+
     def __init__(self):
-        # 실제로는 Hume.ai API를 사용하지만, 예시를 위해 간단히 구현
-        self.emotions = ["neutral", "happy", "sad", "surprised", "angry", "fearful"]
-        self.confidences = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
-    
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
+        # 모든 패턴을 named group 하나의 정규식으로 합쳐 텍스트당 한 번만 스캔
+        self._pattern = re.compile(
+            "|".join(f"(?P<f{i}>{pattern})" for i, (pattern, _) in enumerate(self.FEATURES)),
+            re.IGNORECASE
+        )
+        self._group_index = {f"f{i}": i for i in range(len(self.FEATURES))}
+
+        # 특징 × 감정 가중치 테이블
+        self._weights = np.zeros((len(self.FEATURES), len(self.EMOTIONS)), dtype=np.float32)
+        for i, (_, weights) in enumerate(self.FEATURES):
+            for emotion, weight in weights.items():
+                self._weights[i, self.EMOTIONS.index(emotion)] = weight
+
+    def _feature_counts(self, texts):
+        """텍스트 목록의 특징 등장 횟수 행렬 (N × 특징 수)"""
+        counts = np.zeros((len(texts), len(self.FEATURES)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for match in self._pattern.finditer(text or ""):
+                counts[row, self._group_index[match.lastgroup]] += 1
+        return counts
+
+    def score_batch(self, texts):
+        """여러 텍스트의 감정 확률을 한 번에 계산
+
+        Args:
+            texts: 분석할 텍스트 목록
+
+        Returns:
+            numpy.ndarray: (N × 감정 수) 확률 행렬, 열 순서는 EMOTIONS와 같음
+        """
+        scores = self._feature_counts(texts) @ self._weights
+        scores = np.clip(scores, 0.0, None)
+        scores[:, 0] += self.NEUTRAL_BASELINE
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def classify_batch(self, texts):
+        """여러 텍스트의 감정 분석
+
+        Args:
+            texts: 분석할 텍스트 목록
+
+        Returns:
+            list: 텍스트별 분석 결과 (analyze_emotion과 같은 형태)
+        """
+        probabilities = self.score_batch(texts)
+        results = []
+        for row in probabilities:
+            best = int(row.argmax())
+            results.append({
+                "emotion": self.EMOTIONS[best],
+                "confidence": round(float(row[best]), 2),
+                "analysis": {
+                    emotion: round(float(score), 2)
+                    for emotion, score in zip(self.EMOTIONS, row)
+                }
+            })
+        return results
+
+    def classify(self, text):
+        """텍스트 하나의 감정 분석 (동기)"""
+        return self.classify_batch([text])[0]
+
     async def analyze_emotion(self, text):
-        """텍스트에서 감정을 분석 (예시 구현)"""
-        # 실제로는 Hume.ai API를 호출하지만, 테스트를 위해 랜덤 감정 반환
-        
-        # 실제 구현에서는 API 호출
-        # response = await requests.post(
-        #     "https://api.hume.ai/v0/batch/text",
-        #     headers={"Authorization": f"Bearer {os.getenv('HUME_AI_API_KEY')}"},
-        #     json={"texts": [text]}
-        # )
-        # result = response.json()
-        
-        # 테스트용 가짜 결과
-        emotion = random.choice(self.emotions)
-        confidence = random.choice(self.confidences)
-        
-        result = {
-            "emotion": emotion,
-            "confidence": confidence,
-            "analysis": {
-                emotion: confidence,
-                "neutral": 1.0 - confidence
-            }
-        }
-        
-        return result
\ No newline at end of file
+        """텍스트에서 감정을 분석
+
+        Args:
+            text: 분석할 텍스트
+
+        Returns:
+            dict: {"emotion": 대표 감정, "confidence": 확률, "analysis": {감정: 확률}}
+        """
+        return self.classify(text)
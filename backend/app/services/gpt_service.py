@@ -1,27 +1,118 @@
 import os
-import openai
 import json
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+import time
+import asyncio
+import logging
+from app.services.context_manager import ContextWindowManager
+from app.services.openai_client import openai_registry
+from app.core.response_cache import ResponseCache
+from app.core.single_flight import SingleFlight
+from app.core.metrics import model_metrics
+from app.services.structured_output import JSON_RESPONSE_FORMAT, parse_json_object, conform
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 안의 모든 GPTService가 공유하는 응답 캐시/요청 합치기 (앱 시작 시 앱 Redis 클라이언트 연결)
+gpt_response_cache = ResponseCache("gpt")
+gpt_single_flight = SingleFlight("gpt")
 
 class GPTService:
     """GPT-4 서비스 - 대화 및 콘텐츠 생성을 위한 서비스"""
     
+    # 레벨별 유사 문장 생성 개수
+    SIMILAR_SENTENCE_COUNTS = {
+        "beginner": 3,
+        "intermediate": 5,
+        "advanced": 7
+    }
+    
     def __init__(self):
-        """API 키 설정"""
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        """공유 OpenAI 클라이언트 및 컨텍스트 관리자 설정"""
+        self.client = openai_registry
+        self.context_manager = ContextWindowManager()
+        self.response_cache = gpt_response_cache
+        self.single_flight = gpt_single_flight
+        self.cache_ttls = settings.GPT_CACHE_TTLS
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
-    async def generate_response(self, chat_history, user_level, native_language, session_id=None):
-        """대화 응답 생성
+    async def _chat(self, method, messages, cacheable=None, **params):
+        """채팅 완성 호출 - 모든 GPT 호출이 거치는 공통 경로
+        
+        모델은 메서드 이름으로 OPENAI_TASK_TIERS 등급을 찾아 고르며,
+        해당 등급이 시간 초과/오류면 대체 등급 모델로 다시 호출합니다.
+        
+        GPT_CACHE_TTLS에 등록된 메서드는 (메서드, 모델, 파라미터, 정규화된 입력) 해시로
+        응답을 캐시하므로 같은 입력이 반복되면 GPT를 다시 호출하지 않습니다 (대체 등급 응답은 캐시하지 않음).
+        캐시 미스 상태에서 같은 키로 동시에 들어온 호출은 single-flight로 합쳐 한 번만 호출합니다.
+        
+        Args:
+            method: 호출한 메서드 이름 (같은 메서드의 후속 호출은 "메서드:용도")
+            messages: 메시지 목록
+            cacheable: 응답을 캐시해도 되는지 판단하는 함수 (선택적, 예: 파싱 가능한 JSON인지)
+            **params: temperature, max_tokens 등 추가 파라미터
+            
+        Returns:
+            str: 응답 텍스트 (앞뒤 공백 제거)
+        """
+        task = method.split(":")[0]
+        ttl = self.cache_ttls.get(task)
+        if not ttl:
+            response = await self.client.chat_routed(task, messages, **params)
+            return (response.choices[0].message.content or "").strip()
+        
+        start = time.perf_counter()
+        model = self.client.model_for(task)
+        cache_key = self.response_cache.make_key(method, model, params, messages)
+        cached = await self.response_cache.get(cache_key)
+        if cached is not None:
+            model_metrics.record_call(task, model, time.perf_counter() - start, cache_hit=True)
+            return cached
+        
+        async def load():
+            response = await self.client.chat_routed(task, messages, **params)
+            content = (response.choices[0].message.content or "").strip()
+            # 대체 등급 모델의 응답은 기본 모델 키로 캐시하지 않음 (장애가 풀리면 기본 모델로 다시 생성)
+            from_primary = (getattr(response, "model", None) or model).startswith(model)
+            if content and from_primary and (cacheable is None or cacheable(content)):
+                await self.response_cache.set(cache_key, content, ttl)
+            return content
+        
+        return await self.single_flight.do(cache_key, load)
+    
+    async def _chat_json(self, method, messages, schema, **params):
+        """JSON 모드 채팅 완성 호출 - 한 번의 호출로 구조화된 결과를 받음
+        
+        Args:
+            method: 호출한 메서드 이름
+            messages: 메시지 목록 (프롬프트에 JSON 출력 형식이 명시되어 있어야 함)
+            schema: 결과 필드별 항목 형식 (structured_output.conform 참고)
+            **params: temperature, max_tokens 등 추가 파라미터
+            
+        Returns:
+            tuple: (스키마에 맞춘 dict 또는 None, 원본 응답 텍스트)
+        """
+        def parse(text):
+            return conform(parse_json_object(text), schema)
+        
+        content = await self._chat(
+            method, messages,
+            cacheable=lambda text: parse(text) is not None,
+            response_format=JSON_RESPONSE_FORMAT,
+            **params
+        )
+        return parse(content), content
+    
+    def _build_chat_messages(self, chat_history, user_level, native_language, summary=None):
+        """대화용 프롬프트 메시지 구성
         
         Args:
-            chat_history: 대화 히스토리
+            chat_history: 대화 히스토리 (요약 이후의 메시지)
             user_level: 사용자 레벨 (beginner, intermediate, advanced)
             native_language: 사용자 모국어
-            session_id: 세션 ID (선택적)
+            summary: 이전 대화 요약 (선택적)
             
         Returns:
-            str: 생성된 응답
+            list: 시스템 프롬프트가 포함된 메시지 목록
         """
         # 레벨별 시스템 프롬프트 설정
         system_prompts = {
@@ -38,23 +129,30 @@ class GPTService:
         # 레벨 선택, 기본값은 초급
         system_prompt = system_prompts.get(user_level, system_prompts["beginner"])
         
-        # 대화 히스토리 포맷팅
-        formatted_history = []
-        for msg in chat_history:
-            formatted_history.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # 토큰 예산에 맞춰 요약 + 최근 대화 구성
+        messages = self.context_manager.build_messages(system_prompt, chat_history, summary)
         
-        # 시스템 메시지 추가
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ] + formatted_history
+        return messages
+    
+    async def generate_response(self, chat_history, user_level, native_language, session_id=None, summary=None):
+        """대화 응답 생성
+        
+        Args:
+            chat_history: 대화 히스토리 (요약 이후의 메시지)
+            user_level: 사용자 레벨 (beginner, intermediate, advanced)
+            native_language: 사용자 모국어
+            session_id: 세션 ID (선택적)
+            summary: 이전 대화 요약 (선택적)
+            
+        Returns:
+            str: 생성된 응답
+        """
+        messages = self._build_chat_messages(chat_history, user_level, native_language, summary)
         
         # GPT 호출
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",  # 또는 gpt-4, gpt-3.5-turbo 등 사용 가능한 모델
-            messages=messages,
+        response_text = await self._chat(
+            "generate_response",
+            messages,
             temperature=0.7,
             max_tokens=800,
             top_p=1.0,
@@ -62,12 +160,71 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        # 응답 텍스트 추출
-        response_text = response.choices[0].message.content.strip()
-        
         return response_text
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
+    async def stream_response(self, chat_history, user_level, native_language, session_id=None, summary=None):
+        """대화 응답 스트리밍 생성
+        
+        generate_response와 같은 프롬프트를 사용하지만, 전체 응답을 기다리지 않고
+        모델이 생성하는 토큰 조각을 바로 전달합니다. 스트림 도중 재시도는 불가능하므로
+        재시도는 스트림을 여는 단계에서만 적용됩니다.
+        
+        Args:
+            chat_history: 대화 히스토리 (요약 이후의 메시지)
+            user_level: 사용자 레벨 (beginner, intermediate, advanced)
+            native_language: 사용자 모국어
+            session_id: 세션 ID (선택적)
+            summary: 이전 대화 요약 (선택적)
+            
+        Yields:
+            str: 생성된 응답 텍스트 조각
+        """
+        messages = self._build_chat_messages(chat_history, user_level, native_language, summary)
+        
+        async for delta in self.client.chat_stream_routed(
+            "stream_response",
+            messages,
+            temperature=0.7,
+            max_tokens=800,
+            top_p=1.0,
+            frequency_penalty=0.0,
+            presence_penalty=0.0
+        ):
+            yield delta
+    
+    async def summarize_conversation(self, previous_summary, messages, user_level):
+        """대화 요약 갱신
+        
+        이전 요약에 새 메시지 구간을 접어 넣어 하나의 요약으로 만듭니다.
+        
+        Args:
+            previous_summary: 기존 요약 (없으면 빈 문자열)
+            messages: 새로 요약할 메시지 목록
+            user_level: 사용자 레벨
+            
+        Returns:
+            str: 갱신된 요약
+        """
+        transcript = "\n".join(
+            f"{'학습자' if msg.get('role') == 'user' else '튜터'}: {msg.get('content', '')}"
+            for msg in messages
+        )
+        
+        messages = [
+            {"role": "system", "content": "당신은 한국어 튜터링 대화를 간결하게 요약하는 어시스턴트입니다. 대화 주제, 학습자가 공유한 개인 정보, 자주 틀린 표현, 튜터가 설명한 문법을 중심으로 요약하세요."},
+            {"role": "user", "content": f"학습자 레벨: {user_level}\n\n기존 요약:\n{previous_summary or '(없음)'}\n\n새 대화:\n{transcript}\n\n기존 요약과 새 대화를 합쳐 200단어 이내의 요약 하나로 작성해주세요."}
+        ]
+        
+        return await self._chat(
+            "summarize_conversation",
+            messages,
+            temperature=0.3,
+            max_tokens=400,
+            top_p=1.0,
+            frequency_penalty=0.0,
+            presence_penalty=0.0
+        )
+    
     async def generate_drama_sentences(self, prompt, count=5):
         """드라마 문장 생성
         
@@ -83,9 +240,9 @@ class GPTService:
             {"role": "user", "content": f"{prompt}\n각 문장은 대화체로, 실제 드라마에서 사용될 수 있는 자연스러운 문장이어야 합니다. {count}개의 문장을 생성해주세요."}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        content = await self._chat(
+            "generate_drama_sentences",
+            messages,
             temperature=0.8,
             max_tokens=1000,
             top_p=1.0,
@@ -93,8 +250,6 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        content = response.choices[0].message.content.strip()
-        
         # 문장 추출
         sentences = []
         for line in content.split('\n'):
@@ -112,7 +267,6 @@ class GPTService:
         
         return sentences
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def generate_similar_sentences(self, original_sentence, level):
         """유사 문장 생성
         
@@ -123,22 +277,16 @@ class GPTService:
         Returns:
             list: 유사 문장 목록
         """
-        counts = {
-            "beginner": 3,
-            "intermediate": 5,
-            "advanced": 7
-        }
-        
-        count = counts.get(level, 3)
+        count = self.SIMILAR_SENTENCE_COUNTS.get(level, 3)
         
         messages = [
             {"role": "system", "content": "당신은 한국어 학습 콘텐츠 생성을 돕는 AI 어시스턴트입니다."},
             {"role": "user", "content": f"다음 한국어 문장과 유사한 구조를 가진 {count}개의 다른 문장을 생성해주세요. 문법과 어휘 수준은 {level} 레벨에 맞춰주세요.\n\n원본 문장: {original_sentence}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        content = await self._chat(
+            "generate_similar_sentences",
+            messages,
             temperature=0.7,
             max_tokens=1000,
             top_p=1.0,
@@ -146,8 +294,6 @@ class GPTService:
             presence_penalty=0.4
         )
         
-        content = response.choices[0].message.content.strip()
-        
         # 문장 추출
         sentences = []
         for line in content.split('\n'):
@@ -170,7 +316,6 @@ class GPTService:
         
         return sentences
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def extract_grammar_points(self, sentence, level):
         """문법 포인트 추출
         
@@ -182,13 +327,14 @@ class GPTService:
             list: 문법 포인트 목록
         """
         messages = [
-            {"role": "system", "content": "당신은 한국어 문법 전문가입니다."},
-            {"role": "user", "content": f"다음 한국어 문장에서 {level} 레벨에 중요한 문법 포인트를 3개 추출해주세요. 각 포인트는 '문법 요소', '설명', '예시'를 포함해야 합니다.\n\n문장: {sentence}"}
+            {"role": "system", "content": "당신은 한국어 문법 전문가입니다. 항상 JSON 객체로만 응답합니다."},
+            {"role": "user", "content": f"다음 한국어 문장에서 {level} 레벨에 중요한 문법 포인트를 3개 추출해주세요. 결과는 'grammar_points' 필드 하나를 가진 JSON 객체로 제공하고, 각 포인트는 'element'(문법 요소), 'explanation'(설명), 'example'(예시) 키를 가진 객체여야 합니다.\n\n문장: {sentence}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        result, content = await self._chat_json(
+            "extract_grammar_points",
+            messages,
+            {"grammar_points": ("element", "explanation", "example")},
             temperature=0.3,
             max_tokens=1000,
             top_p=1.0,
@@ -196,64 +342,173 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        content = response.choices[0].message.content.strip()
+        if result and result["grammar_points"]:
+            return result["grammar_points"]
         
-        # 파싱 시도
-        grammar_points = []
-        try:
-            # 구조화된 형태로 다시 요청
-            messages.append({"role": "assistant", "content": content})
-            messages.append({"role": "user", "content": "위 문법 포인트를 JSON 형식으로 변환해주세요. 각 포인트는 'element', 'explanation', 'example' 키를 가진 객체여야 합니다."})
+        # 파싱 실패시 원본 텍스트 반환
+        return [{"element": "문법 분석", "explanation": content, "example": sentence}]
+    
+    def _chunk_sentences(self, sentences):
+        """문장 목록을 배치 호출 단위로 분할 (입력 토큰 예산과 최대 문장 수 기준)
+        
+        Args:
+            sentences: 문장 목록
             
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4-1106-preview",
-                messages=messages,
-                temperature=0.1,
-                max_tokens=1000,
-                top_p=1.0,
-                frequency_penalty=0.0,
-                presence_penalty=0.0
+        Returns:
+            list: [(원래 인덱스, 문장), ...] 목록의 목록
+        """
+        chunks = []
+        current = []
+        tokens = 0
+        for index, sentence in enumerate(sentences):
+            cost = self.context_manager.count_tokens(sentence)
+            if current and (tokens + cost > settings.GPT_BATCH_TOKEN_BUDGET
+                            or len(current) >= settings.GPT_BATCH_MAX_ITEMS):
+                chunks.append(current)
+                current = []
+                tokens = 0
+            current.append((index, sentence))
+            tokens += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    async def _map_batches(self, method, sentences, field, item_type, system_prompt, build_prompt,
+                           tokens_per_item, fallback, **params):
+        """문장 목록을 배치로 나눠 동시에 호출하고 문장 순서대로 결과 반환
+        
+        응답에서 빠지거나 형식이 맞지 않는 문장은 단건 메서드(fallback)로 보충합니다.
+        
+        Args:
+            method: 호출 메서드 이름 (라우팅/캐시 기준)
+            sentences: 문장 목록
+            field: 문장별 결과 필드 이름
+            item_type: 결과 항목 형식 (structured_output.conform 참고)
+            system_prompt: 시스템 프롬프트
+            build_prompt: 번호 붙인 문장 목록을 받아 사용자 프롬프트를 만드는 함수
+            tokens_per_item: 문장당 예상 출력 토큰 수 (max_tokens 계산용)
+            fallback: 문장 하나를 처리하는 단건 메서드
+            **params: temperature 등 추가 파라미터
+            
+        Returns:
+            list: 문장별 결과 목록
+        """
+        results = [None] * len(sentences)
+        semaphore = asyncio.Semaphore(settings.GPT_BATCH_CONCURRENCY)
+        
+        async def run(chunk):
+            numbered = "\n".join(f"{i + 1}. {sentence}" for i, (_, sentence) in enumerate(chunk))
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": build_prompt(numbered)}
+            ]
+            async with semaphore:
+                try:
+                    data, _ = await self._chat_json(
+                        method, messages, {"results": None},
+                        max_tokens=min(4000, tokens_per_item * len(chunk)),
+                        **params
+                    )
+                except Exception as e:
+                    logger.warning(f"{method} batch of {len(chunk)} failed: {e}")
+                    return
+            
+            for entry in (data or {}).get("results", []):
+                if not isinstance(entry, dict):
+                    continue
+                position = entry.get("index")
+                if not isinstance(position, int) or not 1 <= position <= len(chunk):
+                    continue
+                value = conform({field: entry.get(field)}, {field: item_type})
+                if value and value[field]:
+                    results[chunk[position - 1][0]] = value[field]
+        
+        await asyncio.gather(*(run(chunk) for chunk in self._chunk_sentences(sentences)))
+        
+        # 배치 응답에서 빠진 문장은 단건 호출로 보충
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            filled = await asyncio.gather(
+                *(fallback(sentences[i]) for i in missing), return_exceptions=True
             )
+            for i, value in zip(missing, filled):
+                results[i] = [] if isinstance(value, Exception) else value
+        
+        return results
+    
+    async def generate_similar_sentences_batch(self, sentences, level):
+        """여러 문장의 유사 문장을 배치 호출로 생성
+        
+        Args:
+            sentences: 원본 문장 목록
+            level: 난이도 (beginner, intermediate, advanced)
             
-            json_content = response.choices[0].message.content.strip()
-            # JSON 부분 추출
-            import re
-            json_match = re.search(r'\{[\s\S]*\}|\[[\s\S]*\]', json_content)
-            if json_match:
-                json_str = json_match.group(0)
-                grammar_points = json.loads(json_str)
-            else:
-                # 일반 텍스트 파싱
-                current_point = {}
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line.startswith(('1.', '2.', '3.')):
-                        if current_point and 'element' in current_point:
-                            grammar_points.append(current_point)
-                            current_point = {}
-                        # 새 포인트 시작
-                        parts = line.split('.', 1)
-                        if len(parts) > 1:
-                            current_point = {'element': parts[1].strip()}
-                    elif ':' in line:
-                        key, value = line.split(':', 1)
-                        key = key.strip().lower()
-                        value = value.strip()
-                        if key in ('설명', 'explanation'):
-                            current_point['explanation'] = value
-                        elif key in ('예시', 'example'):
-                            current_point['example'] = value
-                
-                # 마지막 포인트 추가
-                if current_point and 'element' in current_point:
-                    grammar_points.append(current_point)
-        except:
-            # 파싱 실패시 원본 텍스트 반환
-            grammar_points = [{"element": "문법 분석", "explanation": content, "example": sentence}]
+        Returns:
+            list: 원본 문장 순서대로 유사 문장 목록
+        """
+        count = self.SIMILAR_SENTENCE_COUNTS.get(level, 3)
+        
+        results = await self._map_batches(
+            "generate_similar_sentences:batch",
+            sentences,
+            "similar_sentences",
+            str,
+            "당신은 한국어 학습 콘텐츠 생성을 돕는 AI 어시스턴트입니다. 항상 JSON 객체로만 응답합니다.",
+            lambda numbered: f"다음 한국어 문장 각각에 대해 유사한 구조를 가진 {count}개의 다른 문장을 생성해주세요. 문법과 어휘 수준은 {level} 레벨에 맞춰주세요. 결과는 'results' 필드 하나를 가진 JSON 객체로 제공하고, 각 항목은 'index'(문장 번호)와 'similar_sentences'(문자열 목록) 키를 가져야 합니다.\n\n{numbered}",
+            40 * count,
+            lambda sentence: self.generate_similar_sentences(sentence, level),
+            temperature=0.7,
+            top_p=1.0,
+            frequency_penalty=0.8,
+            presence_penalty=0.4
+        )
         
-        return grammar_points
+        return [list(dict.fromkeys(result))[:count] for result in results]
+    
+    async def extract_grammar_points_batch(self, sentences, level):
+        """여러 문장의 문법 포인트를 배치 호출로 추출
+        
+        Args:
+            sentences: 문장 목록
+            level: 난이도 (beginner, intermediate, advanced)
+            
+        Returns:
+            list: 문장 순서대로 문법 포인트 목록
+        """
+        return await self._map_batches(
+            "extract_grammar_points:batch",
+            sentences,
+            "grammar_points",
+            ("element", "explanation", "example"),
+            "당신은 한국어 문법 전문가입니다. 항상 JSON 객체로만 응답합니다.",
+            lambda numbered: f"다음 한국어 문장 각각에서 {level} 레벨에 중요한 문법 포인트를 3개 추출해주세요. 결과는 'results' 필드 하나를 가진 JSON 객체로 제공하고, 각 항목은 'index'(문장 번호)와 'grammar_points' 키를 가져야 합니다. 각 문법 포인트는 'element'(문법 요소), 'explanation'(설명), 'example'(예시) 키를 가진 객체여야 합니다.\n\n{numbered}",
+            350,
+            lambda sentence: self.extract_grammar_points(sentence, level),
+            temperature=0.3,
+            top_p=1.0,
+            frequency_penalty=0.0,
+            presence_penalty=0.0
+        )
+    
+    async def enrich_sentences(self, sentences, level):
+        """문장 목록의 유사 문장과 문법 포인트를 동시에 생성
+        
+        Args:
+            sentences: 문장 목록
+            level: 난이도 (beginner, intermediate, advanced)
+            
+        Returns:
+            list: 문장 순서대로 {"similar_sentences": [...], "grammar_points": [...]}
+        """
+        similar, grammar = await asyncio.gather(
+            self.generate_similar_sentences_batch(sentences, level),
+            self.extract_grammar_points_batch(sentences, level)
+        )
+        return [
+            {"similar_sentences": similar_sentences, "grammar_points": grammar_points}
+            for similar_sentences, grammar_points in zip(similar, grammar)
+        ]
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def generate_test_questions(self, prompt, count=10):
         """TOPIK 문제 생성
         
@@ -269,9 +524,9 @@ class GPTService:
             {"role": "user", "content": f"{prompt}\n\n각 문제는 'id', 'question', 'options', 'answer', 'explanation' 필드를 JSON 형식으로 가져야 합니다. options는 4개의 선택지를 포함해야 합니다."}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        content = await self._chat(
+            "generate_test_questions",
+            messages,
             temperature=0.7,
             max_tokens=2500,
             top_p=1.0,
@@ -279,8 +534,6 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        content = response.choices[0].message.content.strip()
-        
         # JSON 파싱 시도
         questions = []
         try:
@@ -365,7 +618,6 @@ class GPTService:
         # 개수 제한
         return questions[:count]
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def analyze_test_weaknesses(self, wrong_answers):
         """TOPIK 시험 취약점 분석
         
@@ -380,9 +632,9 @@ class GPTService:
             {"role": "user", "content": f"다음은 한국어 시험에서 틀린 문제들입니다. 이를 바탕으로 학습자의 주요 취약점을 5가지 이내로 분석해주세요.\n\n{wrong_answers}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        content = await self._chat(
+            "analyze_test_weaknesses",
+            messages,
             temperature=0.3,
             max_tokens=1000,
             top_p=1.0,
@@ -390,8 +642,6 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        content = response.choices[0].message.content.strip()
-        
         # 취약점 추출
         weaknesses = []
         for line in content.split('\n'):
@@ -413,7 +663,6 @@ class GPTService:
         
         return weaknesses
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def generate_reading_content(self, prompt, level):
         """리딩 콘텐츠 생성
         
@@ -439,19 +688,16 @@ class GPTService:
             {"role": "user", "content": f"{prompt}\n\n이 텍스트는 한국어 학습자의 {level} 레벨에 맞게 생성되어야 합니다."}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        return await self._chat(
+            "generate_reading_content",
+            messages,
             temperature=0.7,
             max_tokens=tokens,
             top_p=1.0,
             frequency_penalty=0.3,
             presence_penalty=0.2
         )
-        
-        return response.choices[0].message.content.strip()
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def generate_reading_guide(self, content, level):
         """리딩 가이드 생성
         
@@ -463,13 +709,14 @@ class GPTService:
             dict: 생성된 가이드
         """
         messages = [
-            {"role": "system", "content": "당신은 한국어 읽기 교육 전문가입니다."},
-            {"role": "user", "content": f"다음 한국어 텍스트에 대한 읽기 가이드를 생성해주세요. 주요 어휘, 문법 포인트, 발음 팁을 포함해야 합니다. 가이드는 {level} 레벨 학습자에게 적합해야 합니다.\n\n{content}"}
+            {"role": "system", "content": "당신은 한국어 읽기 교육 전문가입니다. 항상 JSON 객체로만 응답합니다."},
+            {"role": "user", "content": f"다음 한국어 텍스트에 대한 읽기 가이드를 생성해주세요. 주요 어휘, 문법 포인트, 발음 팁, 문화 노트를 포함해야 합니다. 가이드는 {level} 레벨 학습자에게 적합해야 합니다. 결과는 'vocabulary', 'grammar', 'pronunciation', 'cultural_notes' 필드를 가진 JSON 객체로 제공하고, 각 필드는 리스트 형태여야 합니다.\n\n{content}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        guide, _ = await self._chat_json(
+            "generate_reading_guide",
+            messages,
+            {"vocabulary": None, "grammar": None, "pronunciation": None, "cultural_notes": None},
             temperature=0.5,
             max_tokens=1500,
             top_p=1.0,
@@ -477,75 +724,13 @@ class GPTService:
             presence_penalty=0.0
         )
         
-        guide_text = response.choices[0].message.content.strip()
-        
-        # 구조화된 가이드 요청
-        messages.append({"role": "assistant", "content": guide_text})
-        messages.append({"role": "user", "content": "위 가이드를 'vocabulary', 'grammar', 'pronunciation', 'cultural_notes' 필드를 가진 JSON 형식으로 변환해주세요. 각 필드는 리스트 형태여야 합니다."})
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
-            temperature=0.1,
-            max_tokens=1500,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0
-        )
-        
-        json_content = response.choices[0].message.content.strip()
-        
-        # JSON 파싱 시도
-        guide = {}
-        try:
-            # JSON 부분 추출
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', json_content)
-            if json_match:
-                json_str = json_match.group(0)
-                guide = json.loads(json_str)
-        except:
-            # 파싱 실패 시 수동 파싱
+        # 파싱 실패 시 빈 가이드
+        if not guide:
             guide = {
                 "vocabulary": [],
                 "grammar": [],
                 "pronunciation": [],
                 "cultural_notes": []
             }
-            
-            current_section = None
-            for line in guide_text.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 섹션 제목 확인
-                lower_line = line.lower()
-                if '어휘' in lower_line or 'vocabulary' in lower_line:
-                    current_section = "vocabulary"
-                    continue
-                elif '문법' in lower_line or 'grammar' in lower_line:
-                    current_section = "grammar"
-                    continue
-                elif '발음' in lower_line or 'pronunciation' in lower_line:
-                    current_section = "pronunciation"
-                    continue
-                elif '문화' in lower_line or 'cultural' in lower_line or 'note' in lower_line:
-                    current_section = "cultural_notes"
-                    continue
-                
-                # 항목 추가
-                if current_section and line.startswith(('-', '•', '1.', '2.', '3.', '4.', '5.')):
-                    # 번호 또는 기호 제거
-                    item = re.sub(r'^[-•\d.]\s*', '', line)
-                    if item:
-                        guide[current_section].append(item)
-                elif current_section and line:
-                    guide[current_section].append(line)
-        
-        # 필요한 필드 확인
-        for key in ["vocabulary", "grammar", "pronunciation", "cultural_notes"]:
-            if key not in guide:
-                guide[key] = []
         
         return guide
@@ -0,0 +1,302 @@
+"""
+SpitKorean OpenAI 클라이언트 레지스트리
+프로세스 전체가 공유하는 AsyncOpenAI 클라이언트와 모델별 동시 호출 제한
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from app.config import settings
+from app.core.metrics import model_metrics
+from app.core import resilience
+from app.core.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# 일시적인 오류 - 재시도/서킷 실패로 취급 (요청 자체가 잘못된 경우는 제외)
+TRANSIENT_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+# 다른 등급 모델로 넘겨 재시도할 수 있는 오류
+FALLBACK_ERRORS = TRANSIENT_ERRORS + (CircuitOpenError,)
+
+class OpenAIClientRegistry:
+    """공유 OpenAI 클라이언트 레지스트리
+
+    서비스마다 전역 openai 모듈 설정을 바꾸는 대신 keep-alive 연결 풀을 가진
+    AsyncOpenAI 클라이언트 하나를 공유합니다. 모델별 세마포어로 워커당 동시 호출 수를 제한하고,
+    모델별 요청 타임아웃을 적용합니다. 모든 호출의 소요 시간과 토큰 사용량을 메트릭에 기록합니다.
+    
+    *_routed 메서드는 작업 이름으로 모델 등급(OPENAI_TASK_TIERS)을 골라 등급별 타임아웃으로 호출하고,
+    시간 초과나 일시적인 오류가 나면 대체 등급(OPENAI_TIER_FALLBACKS)의 모델로 다시 호출합니다.
+    
+    모든 호출은 모델별 서킷 브레이커와 요청 시간 예산(core.resilience)을 거칩니다.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_connections: Optional[int] = None, max_keepalive: Optional[int] = None,
+                 model_concurrency: Optional[Dict[str, int]] = None,
+                 model_timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            api_key: OpenAI API 키
+            base_url: API 기본 URL (로컬 테스트 서버 사용 시 변경)
+            max_connections: 연결 풀 최대 연결 수
+            max_keepalive: 유지할 keep-alive 연결 수
+            model_concurrency: {모델: 동시 호출 수}
+            model_timeouts: {모델: 요청 타임아웃(초)}
+        """
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.base_url = base_url or settings.OPENAI_API_BASE
+        self.max_connections = max_connections or settings.OPENAI_MAX_CONNECTIONS
+        self.max_keepalive = max_keepalive or settings.OPENAI_MAX_KEEPALIVE
+        self.model_concurrency = model_concurrency or settings.OPENAI_MODEL_CONCURRENCY
+        self.model_timeouts = model_timeouts or settings.OPENAI_MODEL_TIMEOUTS
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """AsyncOpenAI 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive
+                ),
+                timeout=settings.OPENAI_DEFAULT_TIMEOUT
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+        return self._client
+
+    def semaphore(self, model: str) -> asyncio.Semaphore:
+        """모델별 동시 호출 제한 세마포어"""
+        if model not in self._semaphores:
+            limit = self.model_concurrency.get(model, settings.OPENAI_DEFAULT_CONCURRENCY)
+            self._semaphores[model] = asyncio.Semaphore(limit)
+        return self._semaphores[model]
+
+    def timeout(self, model: str) -> float:
+        """모델별 요청 타임아웃(초)"""
+        return self.model_timeouts.get(model, settings.OPENAI_DEFAULT_TIMEOUT)
+    
+    def route(self, task: str) -> List[Tuple[str, str]]:
+        """작업에 사용할 (등급, 모델) 목록 - 첫 항목이 기본, 나머지는 대체 순서"""
+        tier = settings.OPENAI_TASK_TIERS.get(task, settings.OPENAI_DEFAULT_TIER)
+        tiers = [tier] + [t for t in settings.OPENAI_TIER_FALLBACKS.get(tier, []) if t != tier]
+        return [(t, settings.OPENAI_MODEL_TIERS[t]) for t in tiers if t in settings.OPENAI_MODEL_TIERS]
+    
+    def model_for(self, task: str) -> str:
+        """작업의 기본 모델 이름"""
+        return self.route(task)[0][1]
+    
+    def tier_timeout(self, tier: str, model: str) -> float:
+        """등급별 요청 타임아웃(초), 없으면 모델별 타임아웃"""
+        return settings.OPENAI_TIER_TIMEOUTS.get(tier) or self.timeout(model)
+
+    async def chat(self, model: str, messages: list, method: str = None,
+                   timeout: Optional[float] = None, hedge_delay: Optional[float] = None, **params):
+        """채팅 완성 호출
+        
+        Args:
+            model: 모델 이름
+            messages: 메시지 목록
+            method: 메트릭에 기록할 호출 메서드 이름
+            timeout: 요청 타임아웃(초), 없으면 모델별 타임아웃
+            hedge_delay: 지정하면 이 시간(초) 안에 응답이 없을 때 같은 요청을 하나 더 보냄
+                (헤지 요청도 모델별 동시 호출 슬롯을 하나 잡으며, 빈 슬롯이 없으면 보내지 않음)
+            **params: temperature, max_tokens 등 추가 파라미터
+        
+        Returns:
+            ChatCompletion: 응답 객체
+        """
+        async with self.semaphore(model):
+            start = time.perf_counter()
+            status = "error"
+            usage = None
+            try:
+                response = await resilience.call(
+                    f"openai:{model}",
+                    lambda t: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        timeout=t,
+                        **params
+                    ),
+                    timeout or self.timeout(model),
+                    transient=TRANSIENT_ERRORS,
+                    hedge_delay=hedge_delay,
+                    hedge_gate=self.semaphore(model),
+                    label=method
+                )
+                status = "ok"
+                usage = response.usage
+                return response
+            finally:
+                model_metrics.record_call(
+                    method, model, time.perf_counter() - start,
+                    prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                    completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                    status=status
+                )
+    
+    async def chat_stream(self, model: str, messages: list, method: str = None,
+                          timeout: Optional[float] = None, **params):
+        """채팅 완성 스트리밍 호출 - 스트림이 끝날 때까지 동시 호출 슬롯을 유지
+        
+        스트리밍 응답에는 사용량 정보가 없으므로 출력 토큰 수는 받은 조각 수로 추정합니다.
+        재시도는 스트림을 여는 단계에서만 적용됩니다.
+        
+        Yields:
+            str: 생성된 응답 텍스트 조각
+        """
+        async with self.semaphore(model):
+            start = time.perf_counter()
+            status = "error"
+            chunks = 0
+            try:
+                stream = await resilience.call(
+                    f"openai:{model}",
+                    lambda t: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        timeout=t,
+                        stream=True,
+                        **params
+                    ),
+                    timeout or self.timeout(model),
+                    transient=TRANSIENT_ERRORS,
+                    label=method
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks += 1
+                        yield delta
+                status = "ok"
+            finally:
+                model_metrics.record_call(
+                    method, model, time.perf_counter() - start,
+                    completion_tokens=chunks, status=status
+                )
+    
+    def hedge_delay(self, task: str, model: str) -> Optional[float]:
+        """헤지 요청을 보내기까지의 대기 시간
+        
+        평소보다 오래 걸리는 꼬리 요청에만 헤지하도록 이 워커에서 관측한 (작업, 모델)의 지연 시간 분위수
+        (OPENAI_HEDGE_QUANTILE)를 쓰고, 설정값은 하한으로만 사용합니다.
+        
+        Returns:
+            float: 대기 시간(초), 헤지가 꺼져 있거나 관측이 부족하면 None
+        """
+        floor = settings.OPENAI_HEDGE_DELAYS.get(task)
+        if floor is None:
+            return None
+        observed, samples = model_metrics.latency_quantile(task, model, settings.OPENAI_HEDGE_QUANTILE)
+        if observed is None or samples < settings.OPENAI_HEDGE_MIN_SAMPLES:
+            return None
+        return max(floor, observed)
+    
+    async def chat_routed(self, task: str, messages: list, **params):
+        """작업 등급에 맞는 모델로 채팅 완성 호출 (시간 초과/일시 오류 시 대체 등급으로 재시도)
+        
+        OPENAI_HEDGE_DELAYS에 등록된 작업은 지연 시간이 긴 요청에 헤지 요청을 함께 보냅니다 (hedge_delay 참고).
+        
+        Args:
+            task: 작업 이름 (OPENAI_TASK_TIERS 키, 메트릭 메서드 이름으로도 사용)
+            messages: 메시지 목록
+            **params: temperature, max_tokens 등 추가 파라미터
+        
+        Returns:
+            ChatCompletion: 응답 객체
+        """
+        route = self.route(task)
+        for i, (tier, model) in enumerate(route):
+            try:
+                return await self.chat(
+                    model, messages, method=task,
+                    timeout=self.tier_timeout(tier, model), hedge_delay=self.hedge_delay(task, model), **params
+                )
+            except FALLBACK_ERRORS as e:
+                if i == len(route) - 1:
+                    raise
+                logger.warning(f"{task}: {tier} tier ({model}) failed with {type(e).__name__}, "
+                               f"falling back to {route[i + 1][0]}")
+    
+    async def chat_stream_routed(self, task: str, messages: list, **params):
+        """작업 등급에 맞는 모델로 스트리밍 호출
+        
+        첫 조각을 받기 전에 실패한 경우에만 대체 등급으로 넘어갑니다.
+        
+        Yields:
+            str: 생성된 응답 텍스트 조각
+        """
+        route = self.route(task)
+        for i, (tier, model) in enumerate(route):
+            started = False
+            try:
+                async for delta in self.chat_stream(
+                    model, messages, method=task,
+                    timeout=self.tier_timeout(tier, model), **params
+                ):
+                    started = True
+                    yield delta
+                return
+            except FALLBACK_ERRORS as e:
+                if started or i == len(route) - 1:
+                    raise
+                logger.warning(f"{task}: {tier} tier ({model}) stream failed with {type(e).__name__}, "
+                               f"falling back to {route[i + 1][0]}")
+    
+    async def transcribe(self, file, model: str = "whisper-1", method: str = None, **params):
+        """음성 인식 호출
+        
+        Args:
+            file: (파일 이름, 바이너리) 튜플 또는 파일 객체
+            model: 모델 이름
+            method: 메트릭에 기록할 호출 메서드 이름
+            **params: language 등 추가 파라미터
+        
+        Returns:
+            Transcription: 응답 객체
+        """
+        async with self.semaphore(model):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                response = await resilience.call(
+                    f"openai:{model}",
+                    lambda t: self.client.audio.transcriptions.create(
+                        model=model,
+                        file=file,
+                        timeout=t,
+                        **params
+                    ),
+                    self.timeout(model),
+                    transient=TRANSIENT_ERRORS,
+                    label=method
+                )
+                status = "ok"
+                return response
+            finally:
+                model_metrics.record_call(method, model, time.perf_counter() - start, status=status)
+    
+    async def close(self):
+        """연결 풀 정리"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            logger.info("OpenAI client closed")
+
+# 프로세스 전체에서 공유하는 인스턴스
+openai_registry = OpenAIClientRegistry()
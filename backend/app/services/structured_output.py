@@ -0,0 +1,124 @@
+"""
+SpitKorean 구조화 출력 처리
+JSON 모드 응답의 파싱, 간단한 복구, 스키마 검증
+"""
+import json
+import re
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# JSON 모드 요청 파라미터
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+def _extract_object(text: str) -> Optional[str]:
+    """문자열 안의 첫 번째 최상위 {...} 블록 추출 (문자열 리터럴 안의 괄호는 무시)"""
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    closers = []
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if closers:
+                closers.pop()
+            if not closers:
+                return text[start:i + 1]
+
+    # 응답이 max_tokens에서 잘린 경우 열린 괄호를 순서대로 닫음
+    if in_string:
+        return None
+    return text[start:].rstrip().rstrip(",") + "".join(reversed(closers))
+
+def parse_json_object(text: str) -> Optional[Dict]:
+    """JSON 객체 응답 파싱
+
+    JSON 모드 응답은 대부분 그대로 파싱되고, 실패하면 코드 블록 표시, 앞뒤 설명 문장,
+    스마트 따옴표, 끝의 쉼표, 잘린 닫는 괄호를 정리한 뒤 한 번 더 시도합니다.
+
+    Args:
+        text: 모델 응답 텍스트
+
+    Returns:
+        dict: 파싱된 객체, 복구할 수 없으면 None
+    """
+    if not text:
+        return None
+
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, dict) else None
+    except ValueError:
+        pass
+
+    candidate = _extract_object(_CODE_FENCE.sub("", text.strip()).translate(_SMART_QUOTES))
+    if not candidate:
+        return None
+
+    try:
+        data = json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+        return data if isinstance(data, dict) else None
+    except ValueError as e:
+        logger.warning(f"Structured output repair failed: {e}")
+        return None
+
+def conform(data: Optional[Dict], schema: Dict[str, Any]) -> Optional[Dict]:
+    """파싱된 객체를 스키마에 맞게 정리
+
+    스키마는 {필드: 항목 형식}이며 모든 필드는 리스트로 맞춥니다.
+        str            문자열 리스트 (다른 값은 문자열로 변환)
+        (키, ...)      해당 키를 가진 객체 리스트 (없는 키는 빈 문자열)
+        None           항목 형식 제한 없음
+
+    Args:
+        data: parse_json_object 결과
+        schema: 필드별 항목 형식
+
+    Returns:
+        dict: 스키마 필드만 가진 객체, 스키마 필드가 하나도 없으면 None
+    """
+    if not isinstance(data, dict) or not any(field in data for field in schema):
+        return None
+
+    result = {}
+    for field, item_type in schema.items():
+        value = data.get(field) or []
+        if not isinstance(value, list):
+            value = [value]
+
+        if item_type is str:
+            value = [
+                item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+                for item in value if item not in (None, "")
+            ]
+        elif isinstance(item_type, tuple):
+            items = []
+            for item in value:
+                if isinstance(item, dict):
+                    items.append({key: item.get(key) or "" for key in item_type})
+                elif item:
+                    items.append({key: (str(item) if i == 0 else "") for i, key in enumerate(item_type)})
+            value = items
+
+        result[field] = value
+
+    return result
@@ -1,11 +1,14 @@
 # backend/app/services/translation_service.py
 import os
 import json
+import asyncio
 import aiohttp
 from redis.asyncio import Redis  # 최신 Redis 라이브러리 사용
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-import openai  # ChatGPT를 사용하기 위한 openai 라이브러리
+from app.services.openai_client import openai_registry  # ChatGPT 호출용 공유 클라이언트
+from app.core import resilience
+from app.config import settings
 
 class TranslationService:
     """번역 서비스 클래스"""
@@ -13,14 +16,13 @@ class TranslationService:
     def __init__(self):
         self.api_key = os.environ.get('GOOGLE_TRANSLATE_API_KEY')
         self.project_id = os.environ.get('GOOGLE_PROJECT_ID')
-        self.base_url = "https://translation.googleapis.com/language/translate/v2"
+        self.base_url = settings.GOOGLE_TRANSLATE_API_BASE
         self.languages_url = f"{self.base_url}/languages"
         self.redis = None
         self.cache_expiration = 7 * 24 * 60 * 60  # 7일 캐시
         
-        # OpenAI API 키 설정
-        self.openai_api_key = os.environ.get('OPENAI_API_KEY')
-        openai.api_key = self.openai_api_key
+        # 공유 OpenAI 클라이언트 (연결 풀 및 모델별 동시 호출 제한)
+        self.openai_client = openai_registry
         
         # 영어 기본 번역 (클라이언트에서 제공)
         self.base_en_translations = self._load_base_translations()
@@ -32,6 +34,34 @@ class TranslationService:
             self.redis = Redis.from_url(redis_url)
         return self.redis
     
+    async def _google_request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """Google Translate API 호출 - 서킷 브레이커/시간 예산 적용
+        
+        Args:
+            method: HTTP 메서드
+            url: 요청 URL
+            **kwargs: aiohttp 요청 인자 (json 등)
+            
+        Returns:
+            응답 JSON
+        """
+        async def send(timeout):
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    return await response.json()
+        
+        return await resilience.call(
+            "google_translate",
+            send,
+            settings.GOOGLE_TRANSLATE_TIMEOUT,
+            transient=(aiohttp.ClientError, asyncio.TimeoutError),
+            label="google_translate"
+        )
+    
     def _load_base_translations(self) -> Dict[str, Any]:
         """기본 영어 번역 로드"""
         try:
@@ -66,18 +96,17 @@ class TranslationService:
             return cached.decode('utf-8')
         
         # Google Translate API 호출
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}?key={self.api_key}",
-                json={
-                    "q": text,
-                    "source": source_language,
-                    "target": target_language,
-                    "format": "text"
-                }
-            ) as response:
-                result = await response.json()
-                
+        result = await self._google_request(
+            "POST",
+            f"{self.base_url}?key={self.api_key}",
+            json={
+                "q": text,
+                "source": source_language,
+                "target": target_language,
+                "format": "text"
+            }
+        )
+        
         if "data" in result and "translations" in result["data"]:
             translated_text = result["data"]["translations"][0]["translatedText"]
             
@@ -152,10 +181,10 @@ class TranslationService:
         Translated feedback:"""
         
         try:
-            # openai.ChatCompletion을 사용한 비동기 호출
-            completion = await openai.ChatCompletion.acreate(
-                model="gpt-4",  # 또는 사용 가능한 모델
-                messages=[
+            # 공유 클라이언트를 사용한 비동기 호출
+            completion = await self.openai_client.chat_routed(
+                "translate_learning_feedback",
+                [
                     {"role": "system", "content": "You are a helpful language learning assistant that provides accurate and natural translations."},
                     {"role": "user", "content": prompt}
                 ],
@@ -227,12 +256,11 @@ class TranslationService:
             return json.loads(cached.decode('utf-8'))
         
         # Google Translate API 호출
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.languages_url}?key={self.api_key}&target=en"
-            ) as response:
-                result = await response.json()
-                
+        result = await self._google_request(
+            "GET",
+            f"{self.languages_url}?key={self.api_key}&target=en"
+        )
+        
         if "data" in result and "languages" in result["data"]:
             languages = []
             
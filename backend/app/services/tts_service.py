@@ -1,17 +1,41 @@
 import os
+import asyncio
+from google.api_core import exceptions as google_exceptions
+from google.auth.credentials import AnonymousCredentials
 from google.cloud import texttospeech
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechRestTransport
+from app.core import resilience
+from app.config import settings
+
+# 일시적인 오류 - 재시도/서킷 실패로 취급
+TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.TooManyRequests,
+    asyncio.TimeoutError,
+    ConnectionError
+)
 
 class TTSService:
     """TTS 서비스 - 텍스트를 음성으로 변환하는 서비스"""
     
     def __init__(self):
         """Google Cloud TTS 클라이언트 초기화"""
-        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        if not credentials_path:
-            raise ValueError("GOOGLE_APPLICATION_CREDENTIALS 환경변수가 설정되지 않았습니다.")
-        
-        self.client = texttospeech.TextToSpeechClient()
+        if settings.GOOGLE_TTS_API_ENDPOINT:
+            # 로컬 대역 서버 (app.tools.fake_upstream) - 인증 없이 HTTP REST로 호출
+            transport = TextToSpeechRestTransport(
+                host=settings.GOOGLE_TTS_API_ENDPOINT,
+                credentials=AnonymousCredentials(),
+                url_scheme="http"
+            )
+            self.client = texttospeech.TextToSpeechClient(transport=transport)
+        else:
+            credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+            if not credentials_path:
+                raise ValueError("GOOGLE_APPLICATION_CREDENTIALS 환경변수가 설정되지 않았습니다.")
+            
+            self.client = texttospeech.TextToSpeechClient()
         
         # 기본 음성 설정
         self.default_voice = texttospeech.VoiceSelectionParams(
@@ -34,7 +58,31 @@ class TTSService:
             volume_gain_db=0.0  # 0.0 = 정상 볼륨
         )
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
+    async def _synthesize(self, synthesis_input, voice, audio_config):
+        """TTS API 호출 - 동기 클라이언트를 스레드에서 실행하고 서킷 브레이커/시간 예산 적용
+        
+        Args:
+            synthesis_input: 입력 텍스트 또는 SSML
+            voice: 음성 설정
+            audio_config: 오디오 설정
+            
+        Returns:
+            SynthesizeSpeechResponse: 응답 객체
+        """
+        return await resilience.call(
+            "google_tts",
+            lambda t: asyncio.to_thread(
+                self.client.synthesize_speech,
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config,
+                timeout=t
+            ),
+            settings.GOOGLE_TTS_TIMEOUT,
+            transient=TRANSIENT_ERRORS,
+            label="google_tts"
+        )
+    
     async def synthesize_speech(self, text, voice_gender="female", speed=1.0):
         """텍스트를 음성으로 변환
         
@@ -61,15 +109,10 @@ class TTSService:
         synthesis_input = texttospeech.SynthesisInput(text=text)
         
         # TTS API 호출
-        response = self.client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
+        response = await self._synthesize(synthesis_input, voice, audio_config)
         
         return response.audio_content
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def generate_pronunciation_guide(self, text):
         """발음 가이드 생성
         
@@ -233,7 +276,6 @@ class TTSService:
             "description": descriptions.get(jongseong, "설명이 없습니다.")
         }
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def synthesize_with_emphasis(self, text, emphasized_text, voice_gender="female"):
         """강조가 있는 음성 합성
         
@@ -272,15 +314,10 @@ class TTSService:
         synthesis_input = texttospeech.SynthesisInput(ssml=ssml)
         
         # TTS API 호출
-        response = self.client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=self.audio_config
-        )
+        response = await self._synthesize(synthesis_input, voice, self.audio_config)
         
         return response.audio_content
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def synthesize_with_pauses(self, text, pause_positions, voice_gender="female"):
         """정지 지점이 있는 음성 합성
         
@@ -314,10 +351,6 @@ class TTSService:
         synthesis_input = texttospeech.SynthesisInput(ssml=ssml)
         
         # TTS API 호출
-        response = self.client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=self.audio_config
-        )
+        response = await self._synthesize(synthesis_input, voice, self.audio_config)
         
         return response.audio_content
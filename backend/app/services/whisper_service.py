@@ -1,46 +1,39 @@
 import os
-import tempfile
 import json
-from tenacity import retry, stop_after_attempt, wait_random_exponential
-import openai
+import asyncio
+from app.services.openai_client import openai_registry
+from app.services.structured_output import JSON_RESPONSE_FORMAT, parse_json_object, conform
 
 class WhisperService:
     """Whisper 서비스 - 음성 인식 및 발음 평가를 위한 서비스"""
     
     def __init__(self):
-        """API 키 설정"""
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        """공유 OpenAI 클라이언트 설정"""
+        self.client = openai_registry
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
-    async def transcribe_audio(self, audio_data):
+    async def transcribe_audio(self, audio_data, suffix=".wav"):
         """음성 인식
         
         Args:
             audio_data: 오디오 바이너리 데이터
+            suffix: 오디오 파일 확장자 (예: .wav, .webm, .m4a)
             
         Returns:
             dict: 인식 결과
         """
-        # 임시 파일 생성
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Whisper API 호출
-            with open(temp_file_path, "rb") as audio_file:
-                response = await openai.Audio.atranscribe("whisper-1", audio_file, language="ko")
-            
-            return {
-                "text": response["text"],
-                "language": response.get("language", "ko")
-            }
-        finally:
-            # 임시 파일 삭제
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+        # Whisper API 호출 (임시 파일 없이 메모리에서 바로 업로드, 확장자로 오디오 형식 판단)
+        response = await self.client.transcribe(
+            (f"audio{suffix}", audio_data),
+            model="whisper-1",
+            method="transcribe_audio",
+            language="ko"
+        )
+        
+        return {
+            "text": response.text,
+            "language": getattr(response, "language", None) or "ko"
+        }
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def evaluate_pronunciation(self, transcribed_text, original_text):
         """발음 평가
         
@@ -60,9 +53,9 @@ class WhisperService:
             {"role": "user", "content": f"원본 텍스트와 음성 인식 결과를 비교하여 발음 정확도를 평가해주세요. 100점 만점으로 점수를 매겨주세요.\n\n원본 텍스트:\n{original_text}\n\n인식된 텍스트:\n{transcribed_text}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
+        response = await self.client.chat_routed(
+            "evaluate_pronunciation",
+            messages,
             temperature=0.1,
             max_tokens=300,
             top_p=1.0,
@@ -113,7 +106,6 @@ class WhisperService:
         jaccard = intersection / union
         return round(jaccard * 100)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
     async def analyze_pronunciation_details(self, audio_data, original_text):
         """상세 발음 분석
         
@@ -128,53 +120,32 @@ class WhisperService:
         recognition_result = await self.transcribe_audio(audio_data)
         transcribed_text = recognition_result.get("text", "")
         
-        # 발음 점수
-        pronunciation_score = await self.evaluate_pronunciation(transcribed_text, original_text)
-        
-        # GPT-4를 사용하여 상세 분석
+        # 발음 점수와 상세 분석은 인식 결과만 있으면 되므로 동시에 요청
         messages = [
-            {"role": "system", "content": "당신은 한국어 발음 평가 전문가입니다. 발음의 강점과 약점을 분석하고 개선 방법을 제시해야 합니다."},
-            {"role": "user", "content": f"다음 음성 인식 결과와 원본 텍스트를 비교하여 발음의 강점, 약점, 개선점을 분석해주세요.\n\n원본 텍스트:\n{original_text}\n\n인식된 텍스트:\n{transcribed_text}"}
+            {"role": "system", "content": "당신은 한국어 발음 평가 전문가입니다. 발음의 강점과 약점을 분석하고 개선 방법을 제시해야 합니다. 항상 JSON 객체로만 응답합니다."},
+            {"role": "user", "content": f"다음 음성 인식 결과와 원본 텍스트를 비교하여 발음의 강점, 약점, 개선점을 분석해주세요. 결과는 'strengths', 'weaknesses', 'improvements' 필드를 가진 JSON 객체로 제공하고, 각 필드는 문자열 목록이어야 합니다.\n\n원본 텍스트:\n{original_text}\n\n인식된 텍스트:\n{transcribed_text}"}
         ]
         
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
-            temperature=0.3,
-            max_tokens=800,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0
+        pronunciation_score, response = await asyncio.gather(
+            self.evaluate_pronunciation(transcribed_text, original_text),
+            self.client.chat_routed(
+                "analyze_pronunciation_details",
+                messages,
+                response_format=JSON_RESPONSE_FORMAT,
+                temperature=0.3,
+                max_tokens=800,
+                top_p=1.0,
+                frequency_penalty=0.0,
+                presence_penalty=0.0
+            )
         )
         
-        analysis_text = response.choices[0].message.content.strip()
-        
-        # 구조화된 분석 결과 요청
-        messages.append({"role": "assistant", "content": analysis_text})
-        messages.append({"role": "user", "content": "위 분석을 'strengths', 'weaknesses', 'improvements' 필드를 가진 JSON 형식으로 변환해주세요. 각 필드는 문자열 목록이어야 합니다."})
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4-1106-preview",
-            messages=messages,
-            temperature=0.1,
-            max_tokens=800,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0
+        analysis = conform(
+            parse_json_object((response.choices[0].message.content or "").strip()),
+            {"strengths": str, "weaknesses": str, "improvements": str}
         )
         
-        json_content = response.choices[0].message.content.strip()
-        
-        # JSON 파싱 시도
-        analysis = {}
-        try:
-            # JSON 부분 추출
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', json_content)
-            if json_match:
-                json_str = json_match.group(0)
-                analysis = json.loads(json_str)
-        except:
+        if not analysis:
             # 파싱 실패 시 기본 분석 결과 제공
             analysis = {
                 "strengths": ["분석을 위한 충분한 정보가 없습니다."],
@@ -182,11 +153,6 @@ class WhisperService:
                 "improvements": ["더 많은 연습이 필요합니다."]
             }
         
-        # 필요한 필드 확인
-        for key in ["strengths", "weaknesses", "improvements"]:
-            if key not in analysis:
-                analysis[key] = []
-        
         return {
             "score": pronunciation_score,
             "transcribed_text": transcribed_text,
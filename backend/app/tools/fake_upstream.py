@@ -0,0 +1,545 @@
+"""
+SpitKorean 외부 API 대역 서버
+유료 API 없이 백엔드 전체 요청 경로를 벤치마크/부하 테스트할 수 있도록 서비스들이 사용하는
+OpenAI Chat Completions(스트리밍 포함), Audio Transcriptions, Google TTS(REST), Google Translate v2
+엔드포인트를 흉내 냅니다.
+
+모드
+    synthetic  요청 형식에 맞는 가짜 응답 생성
+    record     실제 API로 전달하고 응답을 fixture 파일로 저장
+    replay     저장된 fixture로 응답 (없는 요청은 synthetic 응답, --strict면 404)
+
+실행 예
+    python -m app.tools.fake_upstream --port 8090 --mode replay --fixtures ./fixtures \\
+        --latency chat=lognormal:800:0.5 --latency chunk=constant:25 --latency tts=recorded
+
+백엔드 환경변수
+    OPENAI_API_BASE=http://localhost:8090/v1
+    GOOGLE_TRANSLATE_API_BASE=http://localhost:8090/language/translate/v2
+    GOOGLE_TTS_API_ENDPOINT=localhost:8090
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from quart import Quart, Response, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+# 엔드포인트 종류별 기본 지연 시간 분포 (실제 API의 대략적인 응답 시간)
+DEFAULT_LATENCIES = {
+    "chat": "lognormal:1200:0.5",  # 스트리밍은 첫 청크까지의 시간
+    "chunk": "constant:20",  # 스트리밍 청크 사이 간격
+    "transcription": "lognormal:900:0.4",
+    "tts": "lognormal:250:0.3",
+    "translate": "lognormal:120:0.3"
+}
+
+SUPPORTED_LANGUAGES = {
+    "en": "English", "ko": "Korean", "ja": "Japanese", "zh": "Chinese", "vi": "Vietnamese",
+    "es": "Spanish", "fr": "French", "hi": "Hindi", "th": "Thai", "de": "German",
+    "mn": "Mongolian", "ar": "Arabic", "pt": "Portuguese", "tr": "Turkish"
+}
+
+SAMPLE_SENTENCES = [
+    "오늘 날씨가 정말 좋네요.",
+    "주말에 같이 영화 보러 갈래요?",
+    "그 이야기는 처음 들어 봐요.",
+    "지금 어디에 있어요?",
+    "늦어서 정말 미안해요.",
+    "이 음식은 생각보다 맵지 않아요.",
+    "내일 아침에 다시 연락할게요.",
+    "무슨 일이 있어도 포기하지 마세요."
+]
+
+# 무음 MP3 프레임 (MPEG-1 Layer III, 128kbps, 44.1kHz, 약 26ms)
+SILENT_MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+class LatencyModel:
+    """지연 시간 분포
+
+    명세 형식 (단위: 밀리초)
+        constant:<ms>
+        uniform:<min>:<max>
+        normal:<mean>:<stddev>
+        lognormal:<median>:<sigma>
+        recorded[:<배율>]   fixture에 기록된 실제 응답 시간 (기록이 없으면 fallback 분포)
+    """
+
+    ARITY = {"constant": 1, "uniform": 2, "normal": 2, "lognormal": 2, "recorded": None}
+
+    def __init__(self, spec: str, fallback: "LatencyModel" = None):
+        """
+        Args:
+            spec: 분포 명세
+            fallback: recorded 분포에서 기록이 없을 때 사용할 분포
+        """
+        name, *args = spec.split(":")
+        if name not in self.ARITY:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        if self.ARITY[name] is not None and len(args) != self.ARITY[name]:
+            raise ValueError(f"{name} latency needs {self.ARITY[name]} parameter(s): {spec}")
+
+        self.spec = spec
+        self.name = name
+        self.args = [float(arg) for arg in args]
+        self.fallback = fallback
+
+    def sample(self, recorded: Optional[float] = None) -> float:
+        """지연 시간 하나 추출
+
+        Args:
+            recorded: fixture에 기록된 응답 시간(초)
+
+        Returns:
+            float: 지연 시간(초)
+        """
+        if self.name == "recorded":
+            if recorded is not None:
+                return recorded * (self.args[0] if self.args else 1.0)
+            return self.fallback.sample() if self.fallback else 0.0
+
+        if self.name == "constant":
+            ms = self.args[0]
+        elif self.name == "uniform":
+            ms = random.uniform(*self.args)
+        elif self.name == "normal":
+            ms = random.gauss(*self.args)
+        else:
+            ms = self.args[0] * math.exp(random.gauss(0, self.args[1]))
+        return max(ms, 0.0) / 1000
+
+class FixtureStore:
+    """요청별 응답 fixture 저장소
+
+    {디렉터리}/{종류}/{요청 해시}.json 파일 하나에 요청, 응답, 실제 응답 시간을 저장합니다.
+    요청 해시는 스트리밍 여부처럼 응답 내용과 무관한 필드를 뺀 요청 본문으로 계산합니다.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._loaded: Dict[Tuple[str, str], Optional[Dict]] = {}
+
+    @staticmethod
+    def key(kind: str, payload: Dict) -> str:
+        """요청 해시"""
+        raw = json.dumps({"kind": kind, "payload": payload}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def load(self, kind: str, key: str) -> Optional[Dict]:
+        """fixture 조회 (없으면 None)"""
+        if (kind, key) not in self._loaded:
+            path = self._path(kind, key)
+            fixture = None
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    fixture = json.load(f)
+            self._loaded[(kind, key)] = fixture
+        return self._loaded[(kind, key)]
+
+    def save(self, kind: str, key: str, payload: Dict, response: Any, elapsed: float):
+        """fixture 저장"""
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {"request": payload, "response": response, "elapsed": round(elapsed, 4)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        self._loaded[(kind, key)] = fixture
+
+def _rng(text: str) -> random.Random:
+    """같은 요청에는 같은 synthetic 응답을 만들도록 요청 내용으로 초기화한 난수 생성기"""
+    return random.Random(hashlib.md5(text.encode("utf-8")).hexdigest())
+
+def _count_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한국어 기준 2글자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+def _synthetic_object(prompt: str, rng: random.Random) -> Dict:
+    """JSON 모드 요청의 가짜 응답 - 프롬프트에 따옴표로 적힌 필드 이름으로 객체 구성"""
+    fields = list(dict.fromkeys(re.findall(r"'([a-z_]+)'", prompt)))
+    item_keys = [field for field in fields if field in ("element", "explanation", "example")]
+    list_fields = [field for field in fields if field not in item_keys and field not in ("results", "index")]
+
+    def value(field):
+        if field == "grammar_points" and item_keys:
+            return [
+                {"element": element, "explanation": f"{element} 표현의 쓰임", "example": rng.choice(SAMPLE_SENTENCES)}
+                for element in rng.sample(["-아/어요", "-고 싶다", "-(으)ㄹ게요", "-지 않다", "-는데"], 3)
+            ]
+        return rng.sample(SAMPLE_SENTENCES, 3)
+
+    if "results" in fields:
+        count = len(re.findall(r"^\d+\. ", prompt, re.MULTILINE)) or 1
+        return {"results": [dict(index=i + 1, **{field: value(field) for field in list_fields}) for i in range(count)]}
+    return {field: value(field) for field in list_fields}
+
+def synthetic_chat_content(body: Dict) -> str:
+    """Chat Completions 요청의 가짜 응답 텍스트
+
+    서비스가 응답을 파싱하는 형식(JSON 객체, 문제 JSON 배열, 점수, 번호 목록)에 맞춥니다.
+    """
+    messages = body.get("messages") or []
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    rng = _rng(prompt)
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(_synthetic_object(prompt, rng), ensure_ascii=False)
+
+    if "'question'" in prompt and "'options'" in prompt:
+        questions = [
+            {
+                "id": str(i + 1),
+                "question": f"다음 빈칸에 알맞은 것을 고르십시오. ({i + 1})",
+                "options": rng.sample(SAMPLE_SENTENCES, 4),
+                "answer": "1",
+                "explanation": "문맥에 가장 자연스러운 표현입니다."
+            }
+            for i in range(5)
+        ]
+        return json.dumps(questions, ensure_ascii=False)
+
+    if "100점" in prompt:
+        return f"발음 정확도 점수: {rng.randint(60, 95)}/100\n전반적으로 자연스럽지만 받침 발음을 조금 더 연습해 보세요."
+
+    if "문장" in prompt and "개" in prompt:
+        return "\n".join(f"{i + 1}. {sentence}" for i, sentence in enumerate(rng.sample(SAMPLE_SENTENCES, 5)))
+
+    return " ".join(rng.sample(SAMPLE_SENTENCES, 2))
+
+def synthetic_chat_completion(body: Dict) -> Dict:
+    """Chat Completions 응답 객체"""
+    content = synthetic_chat_content(body)
+    prompt_tokens = sum(_count_tokens(str(m.get("content", ""))) for m in body.get("messages") or [])
+    completion_tokens = _count_tokens(content)
+    return {
+        "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+def _error(status: int, message: str) -> Tuple[Response, int]:
+    """OpenAI/Google 클라이언트가 모두 읽을 수 있는 오류 응답"""
+    return jsonify({"error": {"code": status, "message": message, "type": "fake_upstream"}}), status
+
+class FakeUpstream:
+    """외부 API 대역 서버"""
+
+    def __init__(self, mode: str = "synthetic", fixtures: str = "./fixtures",
+                 latencies: Optional[Dict[str, str]] = None, strict: bool = False,
+                 error_rate: float = 0.0, openai_upstream: str = "https://api.openai.com/v1",
+                 translate_upstream: str = "https://translation.googleapis.com/language/translate/v2",
+                 tts_upstream: str = "https://texttospeech.googleapis.com",
+                 google_api_key: Optional[str] = None):
+        """
+        Args:
+            mode: synthetic, record, replay 중 하나
+            fixtures: fixture 디렉터리
+            latencies: {종류: 분포 명세} (DEFAULT_LATENCIES를 덮어씀)
+            strict: replay 모드에서 fixture가 없는 요청을 404로 응답
+            error_rate: 503으로 응답할 요청 비율 (서킷 브레이커/재시도 확인용)
+            openai_upstream: record 모드에서 사용할 OpenAI API 기본 URL
+            translate_upstream: record 모드에서 사용할 Translate API URL
+            tts_upstream: record 모드에서 사용할 TTS API 기본 URL
+            google_api_key: record 모드에서 TTS 호출에 붙일 API 키
+        """
+        if mode not in ("synthetic", "record", "replay"):
+            raise ValueError(f"Unknown mode: {mode}")
+
+        self.mode = mode
+        self.store = FixtureStore(fixtures)
+        self.strict = strict
+        self.error_rate = error_rate
+        self.openai_upstream = openai_upstream.rstrip("/")
+        self.translate_upstream = translate_upstream.rstrip("/")
+        self.tts_upstream = tts_upstream.rstrip("/")
+        self.google_api_key = google_api_key
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+
+        specs = {**DEFAULT_LATENCIES, **(latencies or {})}
+        self.latencies = {
+            kind: LatencyModel(spec, LatencyModel(DEFAULT_LATENCIES[kind]))
+            for kind, spec in specs.items()
+        }
+
+        self.app = Quart(__name__)
+        self.app.add_url_rule("/v1/chat/completions", view_func=self.chat_completions, methods=["POST"])
+        self.app.add_url_rule("/v1/audio/transcriptions", view_func=self.transcriptions, methods=["POST"])
+        self.app.add_url_rule("/v1/text:synthesize", view_func=self.synthesize, methods=["POST"])
+        self.app.add_url_rule("/language/translate/v2", view_func=self.translate, methods=["POST"])
+        self.app.add_url_rule("/language/translate/v2/languages", view_func=self.languages, methods=["GET"])
+        self.app.add_url_rule("/_fake/stats", view_func=self.get_stats, methods=["GET"])
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """record 모드에서 실제 API 호출에 쓰는 클라이언트"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=120.0)
+        return self._http
+
+    def _count(self, kind: str, outcome: str):
+        per_kind = self.stats.setdefault(kind, {})
+        per_kind[outcome] = per_kind.get(outcome, 0) + 1
+
+    async def _serve(self, kind: str, payload: Dict, synthesize: Callable[[], Any],
+                     forward: Callable[[], Awaitable[Tuple[Any, int]]]) -> Tuple[Any, int, float]:
+        """모드에 따라 응답 본문과 응답 전 대기 시간 결정
+
+        Args:
+            kind: 엔드포인트 종류
+            payload: fixture 해시에 쓸 요청 내용
+            synthesize: 가짜 응답을 만드는 함수
+            forward: 실제 API를 호출해 (응답, 상태 코드)를 돌려주는 함수
+
+        Returns:
+            tuple: (응답 본문, 상태 코드, 대기 시간(초))
+        """
+        if self.error_rate and random.random() < self.error_rate:
+            self._count(kind, "injected_error")
+            error = {"error": {"code": 503, "message": "Injected failure", "type": "fake_upstream"}}
+            return error, 503, self.latencies[kind].sample()
+
+        key = self.store.key(kind, payload)
+
+        if self.mode == "record":
+            # 실제 호출 시간이 그대로 지연되므로 추가로 기다리지 않음
+            started = time.monotonic()
+            response, status = await forward()
+            if status == 200:
+                self.store.save(kind, key, payload, response, time.monotonic() - started)
+                self._count(kind, "recorded")
+            else:
+                self._count(kind, "upstream_error")
+            return response, status, 0.0
+
+        recorded = None
+        response = None
+        if self.mode == "replay":
+            fixture = self.store.load(kind, key)
+            if fixture is not None:
+                response, recorded = fixture["response"], fixture.get("elapsed")
+                self._count(kind, "hit")
+            elif self.strict:
+                self._count(kind, "miss")
+                error = {"error": {"code": 404, "message": f"No fixture for {kind} request {key}", "type": "fake_upstream"}}
+                return error, 404, 0.0
+            else:
+                logger.info(f"No fixture for {kind} request {key}, using synthetic response")
+                self._count(kind, "miss")
+
+        if response is None:
+            response = synthesize()
+            if self.mode == "synthetic":
+                self._count(kind, "synthetic")
+
+        return response, 200, self.latencies[kind].sample(recorded)
+
+    async def chat_completions(self):
+        """POST /v1/chat/completions"""
+        body = await request.get_json()
+        stream = bool(body.get("stream"))
+        payload = {k: v for k, v in body.items() if k not in ("stream", "stream_options", "user")}
+
+        async def forward():
+            # 스트리밍 요청도 완성된 응답으로 기록하고 재생할 때 청크로 나눔
+            upstream = await self.http.post(
+                f"{self.openai_upstream}/chat/completions",
+                json={**body, "stream": False},
+                headers={"Authorization": request.headers.get("Authorization", "")}
+            )
+            return upstream.json(), upstream.status_code
+
+        completion, status, wait = await self._serve(
+            "chat", payload, lambda: synthetic_chat_completion(body), forward
+        )
+        if status != 200 or not stream:
+            await asyncio.sleep(wait)
+            return jsonify(completion), status
+
+        # 스트리밍은 chat 분포를 첫 청크까지의 시간으로 쓰고 이후 청크 간격은 chunk 분포
+        content = completion["choices"][0]["message"].get("content") or ""
+        pieces = [content[i:i + 4] for i in range(0, len(content), 4)] or [""]
+
+        def chunk(delta, finish_reason=None):
+            data = {
+                "id": completion.get("id"),
+                "object": "chat.completion.chunk",
+                "created": completion.get("created", int(time.time())),
+                "model": completion.get("model"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            await asyncio.sleep(wait)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                yield chunk({"content": piece})
+                if self.mode != "record":
+                    await asyncio.sleep(self.latencies["chunk"].sample())
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return Response(events(), mimetype="text/event-stream")
+
+    async def transcriptions(self):
+        """POST /v1/audio/transcriptions"""
+        form = await request.form
+        files = await request.files
+        audio = files.get("file")
+        audio_data = audio.read() if audio else b""
+        fields = {k: v for k, v in form.items()}
+        payload = {**fields, "audio_sha256": hashlib.sha256(audio_data).hexdigest()}
+
+        def synthesize():
+            return {"text": _rng(payload["audio_sha256"]).choice(SAMPLE_SENTENCES), "language": fields.get("language", "ko")}
+
+        async def forward():
+            upstream = await self.http.post(
+                f"{self.openai_upstream}/audio/transcriptions",
+                data={**fields, "response_format": "json"},
+                files={"file": (audio.filename if audio else "audio.webm", audio_data)},
+                headers={"Authorization": request.headers.get("Authorization", "")}
+            )
+            return upstream.json(), upstream.status_code
+
+        result, status, wait = await self._serve("transcription", payload, synthesize, forward)
+        await asyncio.sleep(wait)
+        if status != 200:
+            return jsonify(result), status
+        if fields.get("response_format") in ("text", "srt", "vtt"):
+            return Response(result.get("text", ""), mimetype="text/plain")
+        return jsonify(result)
+
+    async def synthesize(self):
+        """POST /v1/text:synthesize (Google TTS REST)"""
+        body = await request.get_json()
+
+        def synthesize():
+            text = (body.get("input") or {}).get("text") or (body.get("input") or {}).get("ssml") or ""
+            frames = int(len(text) * 0.15 / 0.026) + 1  # 글자당 약 0.15초
+            return {"audioContent": base64.b64encode(SILENT_MP3_FRAME * frames).decode("ascii")}
+
+        async def forward():
+            upstream = await self.http.post(
+                f"{self.tts_upstream}/v1/text:synthesize",
+                params={"key": self.google_api_key} if self.google_api_key else None,
+                json=body
+            )
+            return upstream.json(), upstream.status_code
+
+        result, status, wait = await self._serve("tts", body, synthesize, forward)
+        await asyncio.sleep(wait)
+        return jsonify(result), status
+
+    async def translate(self):
+        """POST /language/translate/v2"""
+        body = await request.get_json()
+
+        def synthesize():
+            queries = body.get("q") if isinstance(body.get("q"), list) else [body.get("q", "")]
+            return {"data": {"translations": [
+                {"translatedText": f"[{body.get('target', 'en')}] {q}", "detectedSourceLanguage": body.get("source") or "ko"}
+                for q in queries
+            ]}}
+
+        async def forward():
+            upstream = await self.http.post(self.translate_upstream, params=request.args, json=body)
+            return upstream.json(), upstream.status_code
+
+        result, status, wait = await self._serve("translate", body, synthesize, forward)
+        await asyncio.sleep(wait)
+        return jsonify(result), status
+
+    async def languages(self):
+        """GET /language/translate/v2/languages"""
+        payload = {k: v for k, v in request.args.items() if k != "key"}
+
+        def synthesize():
+            return {"data": {"languages": [
+                {"language": code, "name": name} for code, name in SUPPORTED_LANGUAGES.items()
+            ]}}
+
+        async def forward():
+            upstream = await self.http.get(f"{self.translate_upstream}/languages", params=request.args)
+            return upstream.json(), upstream.status_code
+
+        result, status, wait = await self._serve("translate", {"languages": payload}, synthesize, forward)
+        await asyncio.sleep(wait)
+        return jsonify(result), status
+
+    async def get_stats(self):
+        """GET /_fake/stats - 종류별 fixture 적중/미적중 등 집계"""
+        return jsonify({"mode": self.mode, "stats": self.stats})
+
+def _parse_latencies(values: List[str]) -> Dict[str, str]:
+    """--latency KIND=SPEC 목록 파싱"""
+    latencies = {}
+    for value in values or []:
+        kind, _, spec = value.partition("=")
+        if kind not in DEFAULT_LATENCIES or not spec:
+            raise argparse.ArgumentTypeError(f"Invalid --latency '{value}' (kinds: {', '.join(DEFAULT_LATENCIES)})")
+        LatencyModel(spec)  # 명세 검증
+        latencies[kind] = spec
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="SpitKorean 외부 API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--mode", choices=("synthetic", "record", "replay"), default="synthetic")
+    parser.add_argument("--fixtures", default="./fixtures", help="fixture 디렉터리")
+    parser.add_argument("--latency", action="append", metavar="KIND=SPEC",
+                        help="지연 시간 분포 (예: chat=lognormal:800:0.5, tts=recorded)")
+    parser.add_argument("--strict", action="store_true", help="replay 모드에서 fixture가 없으면 404")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503으로 응답할 요청 비율")
+    parser.add_argument("--openai-upstream", default="https://api.openai.com/v1")
+    parser.add_argument("--translate-upstream", default="https://translation.googleapis.com/language/translate/v2")
+    parser.add_argument("--tts-upstream", default="https://texttospeech.googleapis.com")
+    parser.add_argument("--google-api-key", default=os.getenv("GOOGLE_API_KEY"),
+                        help="record 모드에서 TTS 호출에 사용할 API 키")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    fake = FakeUpstream(
+        mode=args.mode,
+        fixtures=args.fixtures,
+        latencies=_parse_latencies(args.latency),
+        strict=args.strict,
+        error_rate=args.error_rate,
+        openai_upstream=args.openai_upstream,
+        translate_upstream=args.translate_upstream,
+        tts_upstream=args.tts_upstream,
+        google_api_key=args.google_api_key
+    )
+    logger.info(f"Fake upstream running in {args.mode} mode on {args.host}:{args.port}")
+    fake.app.run(host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
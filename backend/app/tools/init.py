@@ -0,0 +1,4 @@
+"""
+SpitKorean 개발 도구 패키지
+이 패키지는 로컬 벤치마크와 부하 테스트용 도구를 제공합니다. 운영 앱에서는 임포트하지 않습니다.
+"""
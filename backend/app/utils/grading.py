@@ -0,0 +1,221 @@
+"""
+SpitKorean 답안 채점
+한국어 문장 답안을 자모 단위 편집 거리와 어절 단위 정렬로 비교해 부분 점수와 오류 위치를 계산합니다.
+모델 호출 없이 로컬에서 동작하므로 Drama, Test, Journey에서 공통으로 사용할 수 있습니다.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# 띄어쓰기 오류 하나당 감점 (내용이 같으면 정답으로 처리하고 점수만 조금 깎음)
+SPACING_PENALTY = 2
+
+# 어절 정렬에서 띄어쓰기 차이(두 어절 <-> 한 어절)의 비용 (치환/삽입/삭제보다 우선)
+SPACING_COST = 0.1
+
+# 조사 (어간이 같고 끝부분만 다르면 조사 오류로 분류)
+PARTICLES = {
+    "은", "는", "이", "가", "을", "를", "에", "에서", "에게", "한테", "께", "와", "과", "랑", "이랑",
+    "하고", "도", "만", "로", "으로", "의", "까지", "부터", "보다", "처럼", "께서", "요"
+}
+
+_NON_WORD = re.compile(r"[^\w]")
+
+@lru_cache(maxsize=4096)
+def to_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해 (한글 이외 문자는 소문자로 유지)"""
+    return unicodedata.normalize("NFD", text).lower()
+
+def normalize_answer(text: str) -> str:
+    """비교용 정규화 - NFC 정규화, 앞뒤 공백 제거, 연속 공백을 하나로"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+def jamo_distance(a: str, b: str) -> int:
+    """두 문자열의 자모 단위 편집 거리 (Levenshtein)"""
+    a, b = to_jamo(a), to_jamo(b)
+
+    # 공통 접두사/접미사는 거리에 영향이 없으므로 잘라내고 계산
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+
+    if not a or not b:
+        return len(a) + len(b)
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, char_b in enumerate(b, 1):
+            left = min(previous[j] + 1, left + 1, previous[j - 1] + (char_a != char_b))
+            current.append(left)
+        previous = current
+    return previous[-1]
+
+def _tokens(text: str) -> List[Tuple[str, str, int, int]]:
+    """어절 목록 (비교용 어절, 원문 어절, 시작 위치, 끝 위치) - 문장 부호만 있는 어절은 제외"""
+    tokens = []
+    for match in re.finditer(r"\S+", text):
+        key = _NON_WORD.sub("", match.group()).lower()
+        if key:
+            tokens.append((key, match.group(), match.start(), match.end()))
+    return tokens
+
+def _token_cost(expected: str, actual: str) -> float:
+    """어절 치환 비용 (0 = 같음, 1 = 완전히 다름)
+
+    같은 음절이 하나도 없는 어절은 자모 거리를 계산하지 않고 완전히 다른 것으로 봅니다.
+    """
+    if expected == actual:
+        return 0.0
+    if set(expected).isdisjoint(actual):
+        return 1.0
+    return min(1.0, jamo_distance(expected, actual) / max(len(to_jamo(expected)), len(to_jamo(actual))))
+
+def _is_particle_slip(expected: str, actual: str) -> bool:
+    """어간이 같고 끝의 조사만 다른지 확인"""
+    prefix = 0
+    while prefix < len(expected) and prefix < len(actual) and expected[prefix] == actual[prefix]:
+        prefix += 1
+    if prefix == 0:
+        return False
+    rest_expected, rest_actual = expected[prefix:], actual[prefix:]
+    return all(not rest or rest in PARTICLES for rest in (rest_expected, rest_actual))
+
+def _align(expected: List[Tuple], actual: List[Tuple]) -> List[Tuple[str, List[Tuple], List[Tuple]]]:
+    """어절 단위 정렬
+
+    치환 비용은 자모 편집 거리 비율, 삽입/삭제는 1, 두 어절을 붙이거나 한 어절을 띄운 경우는
+    SPACING_COST로 계산해 최소 비용 정렬을 찾습니다.
+
+    Returns:
+        list: (연산, 정답 어절 목록, 답안 어절 목록) - 연산은 equal, replace, delete, insert, spacing
+    """
+    n, m = len(expected), len(actual)
+    inf = float("inf")
+    token_cost = lru_cache(maxsize=None)(_token_cost)
+    cost = [[inf] * (m + 1) for _ in range(n + 1)]
+    step = [[None] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0.0
+
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i == 0 and j == 0:
+                continue
+            candidates = []
+            if i and j:
+                candidates.append((cost[i - 1][j - 1] + token_cost(expected[i - 1][0], actual[j - 1][0]), (1, 1)))
+            if i:
+                candidates.append((cost[i - 1][j] + 1, (1, 0)))
+            if j:
+                candidates.append((cost[i][j - 1] + 1, (0, 1)))
+            if i >= 2 and j and expected[i - 2][0] + expected[i - 1][0] == actual[j - 1][0]:
+                candidates.append((cost[i - 2][j - 1] + SPACING_COST, (2, 1)))
+            if i and j >= 2 and actual[j - 2][0] + actual[j - 1][0] == expected[i - 1][0]:
+                candidates.append((cost[i - 1][j - 2] + SPACING_COST, (1, 2)))
+            cost[i][j], step[i][j] = min(candidates, key=lambda c: c[0])
+
+    ops = []
+    i, j = n, m
+    while i or j:
+        di, dj = step[i][j]
+        exp_tokens, act_tokens = expected[i - di:i], actual[j - dj:j]
+        if (di, dj) == (1, 1):
+            op = "equal" if exp_tokens[0][0] == act_tokens[0][0] else "replace"
+        elif (di, dj) == (1, 0):
+            op = "delete"
+        elif (di, dj) == (0, 1):
+            op = "insert"
+        else:
+            op = "spacing"
+        ops.append((op, exp_tokens, act_tokens))
+        i, j = i - di, j - dj
+
+    ops.reverse()
+    return ops
+
+def grade_answer(user_answer: str, correct_answer: str) -> Dict:
+    """문장 답안 채점
+
+    유니코드와 공백을 정규화하고 문장 부호는 무시합니다. 어절 단위로 정렬해 오류 위치를 찾고,
+    점수는 정렬된 어절 사이의 자모 단위 편집 거리 합으로 계산합니다 (띄어쓰기 차이는 거리 0).
+    내용이 같고 띄어쓰기만 다르면 정답으로 처리합니다.
+
+    Args:
+        user_answer: 사용자 답안
+        correct_answer: 정답 문장
+
+    Returns:
+        dict: {
+            "is_correct": 정답 여부,
+            "score": 0-100 부분 점수,
+            "errors": [{"type", "expected", "actual", "start", "end"}, ...]
+                type은 spacing, particle, replaced, missing, extra 중 하나이며
+                start/end는 NFC 정규화한 정답 문장에서의 위치
+        }
+    """
+    correct_text = unicodedata.normalize("NFC", correct_answer or "")
+    expected = _tokens(correct_text)
+    actual = _tokens(normalize_answer(user_answer))
+
+    # 똑같은 어절을 기준점으로 잡고 그 사이의 다른 구간만 비용 기반으로 정렬
+    matcher = SequenceMatcher(None, [token[0] for token in expected], [token[0] for token in actual], autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(("equal", expected[i1:i2], actual[j1:j2]))
+        else:
+            ops.extend(_align(expected[i1:i2], actual[j1:j2]))
+
+    errors = []
+    distance = 0
+    for index, (op, exp_tokens, act_tokens) in enumerate(ops):
+        if op == "equal":
+            continue
+
+        if op == "replace":
+            distance += jamo_distance(exp_tokens[0][0], act_tokens[0][0])
+        elif op != "spacing":
+            distance += sum(len(to_jamo(token[0])) for token in exp_tokens + act_tokens)
+
+        if exp_tokens:
+            start, end = exp_tokens[0][2], exp_tokens[-1][3]
+        else:
+            # 추가된 어절은 다음 정답 어절의 시작 위치로 표시
+            following = [tokens[0] for _, tokens, _ in ops[index + 1:] if tokens]
+            start = end = following[0][2] if following else len(correct_text)
+
+        if op == "replace":
+            error_type = "particle" if _is_particle_slip(exp_tokens[0][0], act_tokens[0][0]) else "replaced"
+        else:
+            error_type = {"delete": "missing", "insert": "extra", "spacing": "spacing"}[op]
+
+        errors.append({
+            "type": error_type,
+            "expected": " ".join(token[1] for token in exp_tokens),
+            "actual": " ".join(token[1] for token in act_tokens),
+            "start": start,
+            "end": end
+        })
+
+    # 내용 점수 (띄어쓰기/문장 부호 제외 자모 편집 거리 비율)
+    longest = max(
+        sum(len(to_jamo(token[0])) for token in expected),
+        sum(len(to_jamo(token[0])) for token in actual),
+        1
+    )
+    spacing_errors = sum(1 for error in errors if error["type"] == "spacing")
+    score = max(0, round((1 - distance / longest) * 100) - SPACING_PENALTY * spacing_errors)
+
+    return {
+        "is_correct": bool(expected) and distance == 0,
+        "score": score,
+        "errors": errors
+    }
@@ -21,6 +21,12 @@ from app.utils.cache import Cache
 # logger.py에서 LogManager 클래스 import (✅ 이미 맞음)
 from app.utils.logger import LogManager
 
+# grading.py에서 답안 채점 함수 import
+from app.utils.grading import grade_answer
+
+# spaced_repetition.py에서 복습 품질 변환 함수 import
+from app.utils.spaced_repetition import review_quality
+
 # 편의 함수들 (실제 클래스 메서드를 함수처럼 사용)
 def generate_password_hash(password):
     """비밀번호 해시 생성 편의 함수"""
@@ -61,6 +67,8 @@ __all__ = [
     'validate_email', 
     'validate_password',
     'get_cache_key',
+    'grade_answer',
+    'review_quality',
     
     # AuthHelper의 추가 메서드들
     'validate_subscription',
@@ -0,0 +1,71 @@
+"""
+SpitKorean 간격 반복 스케줄
+SM-2 알고리즘으로 문장별 다음 복습 시점을 계산합니다.
+계산은 MongoDB 업데이트 파이프라인으로 만들어 이전 상태를 읽지 않고 한 번의 upsert로 갱신합니다.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+DEFAULT_EASINESS = 2.5  # 처음 복습하는 문장의 난이도 계수
+MIN_EASINESS = 1.3  # 난이도 계수 하한
+PASSING_QUALITY = 3  # 이 점수 이상이면 복습 성공 (간격 증가), 미만이면 처음부터 다시
+DAY_MS = 24 * 60 * 60 * 1000
+
+def review_quality(is_correct: bool, score: int) -> int:
+    """채점 결과를 SM-2 응답 품질(0-5)로 변환
+
+    Args:
+        is_correct: 정답 여부 (띄어쓰기/문장 부호 차이는 정답)
+        score: 0-100 부분 점수
+
+    Returns:
+        int: 5 = 완벽, 4 = 띄어쓰기 등 사소한 차이, 2 = 아깝게 틀림, 1 = 절반 정도 맞음, 0 = 거의 틀림
+    """
+    if is_correct:
+        return 5 if score >= 100 else 4
+    if score >= 80:
+        return 2
+    if score >= 50:
+        return 1
+    return 0
+
+def sm2_update_stages(quality: int, now: datetime = None) -> List[Dict]:
+    """SM-2 상태 갱신 파이프라인 단계
+
+    문서의 easiness, repetitions, interval(일), lapses를 갱신하고 due_at을 다음 복습 시각으로 설정합니다.
+    처음 복습하는 문서(upsert)는 기본값에서 시작합니다.
+
+    Args:
+        quality: 응답 품질 (0-5)
+        now: 복습 시각 (기본값: 현재 시각)
+
+    Returns:
+        list: 업데이트 파이프라인 단계 목록
+    """
+    now = now or datetime.utcnow()
+    passed = quality >= PASSING_QUALITY
+    miss = 5 - quality
+    easiness_delta = 0.1 - miss * (0.08 + miss * 0.02)
+
+    return [
+        {"$set": {
+            "easiness": {"$max": [
+                MIN_EASINESS,
+                {"$add": [{"$ifNull": ["$easiness", DEFAULT_EASINESS]}, easiness_delta]}
+            ]},
+            "repetitions": {"$add": [{"$ifNull": ["$repetitions", 0]}, 1]} if passed else 0,
+            "lapses": {"$add": [{"$ifNull": ["$lapses", 0]}, 0 if passed else 1]},
+            "last_quality": quality,
+            "last_reviewed_at": now
+        }},
+        {"$set": {
+            "interval": {"$switch": {
+                "branches": [
+                    {"case": {"$lte": ["$repetitions", 1]}, "then": 1},
+                    {"case": {"$eq": ["$repetitions", 2]}, "then": 6}
+                ],
+                "default": {"$round": [{"$multiply": [{"$ifNull": ["$interval", 1]}, "$easiness"]}, 0]}
+            }}
+        }},
+        {"$set": {"due_at": {"$add": [now, {"$multiply": ["$interval", DAY_MS]}]}}}
+    ]
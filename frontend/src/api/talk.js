@@ -1,4 +1,5 @@
-import apiClient from './index';
+import apiClient, { tokenManager } from './index';
+import { API_CONFIG } from '@/shared/constants/api';
 
 /**
  * Talk Like You Mean It API
@@ -18,13 +19,104 @@ export const sendChatMessage = async (data) => {
   return response.data;
 };
 
+/**
+ * NDJSON 스트림을 한 줄씩 읽어 이벤트 콜백으로 전달
+ * @param {Response} response - fetch 응답
+ * @param {Function} onEvent - 이벤트 콜백 ({type, ...})
+ * @returns {Promise<Object|null>} 마지막 done 이벤트
+ */
+const readNdjsonStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder('utf-8');
+  let buffer = '';
+  let doneEvent = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event = JSON.parse(line);
+      if (event.type === 'done') doneEvent = event;
+      onEvent?.(event);
+    }
+  }
+
+  return doneEvent;
+};
+
+/**
+ * 대화 메시지 전송 (스트리밍)
+ * POST /api/v1/talk/chat/stream
+ * @param {Object} data - 대화 데이터
+ * @param {string} data.message - 사용자 메시지
+ * @param {string} [data.session_id] - 세션 ID (선택적)
+ * @param {Function} onEvent - start/token/done/error 이벤트 콜백
+ * @returns {Promise<Object|null>} done 이벤트 (최종 응답 및 XP 정보)
+ */
+export const streamChatMessage = async (data, onEvent) => {
+  const response = await fetch(`${API_CONFIG.BASE_URL}/${API_CONFIG.VERSION}/talk/chat/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${tokenManager.getToken()}`
+    },
+    body: JSON.stringify(data)
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.message || `HTTP ${response.status}`);
+  }
+
+  return readNdjsonStream(response, onEvent);
+};
+
+/**
+ * 음성 메시지 전송 (음성 인식 + 스트리밍 응답)
+ * POST /api/v1/talk/voice
+ * @param {Blob} audio - 녹음된 음성 데이터
+ * @param {string} [sessionId] - 세션 ID (선택적)
+ * @param {Function} onEvent - transcript/start/token/done/error 이벤트 콜백
+ * @param {string} [filename] - 업로드 파일 이름 (확장자로 오디오 형식 판단)
+ * @returns {Promise<Object|null>} done 이벤트 (최종 응답 및 XP 정보)
+ */
+export const sendVoiceMessage = async (audio, sessionId, onEvent, filename = 'voice.webm') => {
+  const formData = new FormData();
+  formData.append('audio', audio, filename);
+  if (sessionId) formData.append('session_id', sessionId);
+
+  const response = await fetch(`${API_CONFIG.BASE_URL}/${API_CONFIG.VERSION}/talk/voice`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${tokenManager.getToken()}`
+    },
+    body: formData
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.message || `HTTP ${response.status}`);
+  }
+
+  return readNdjsonStream(response, onEvent);
+};
+
 /**
  * 사용자의 대화 세션 목록 조회
  * GET /api/v1/talk/sessions
+ * @param {Object} [params] - 페이지 파라미터
+ * @param {number} [params.limit] - 페이지 크기 (기본값 20, 최대 50)
+ * @param {string} [params.cursor] - 이전 응답의 next_cursor
  * @returns {Promise} 세션 목록
  */
-export const getTalkSessions = async () => {
-  const response = await apiClient.get('/talk/sessions');
+export const getTalkSessions = async (params = {}) => {
+  const response = await apiClient.get('/talk/sessions', { params });
   return response.data;
 };
 
@@ -32,10 +124,13 @@ export const getTalkSessions = async () => {
  * 특정 대화 세션 조회
  * GET /api/v1/talk/session/<session_id>
  * @param {string} sessionId - 세션 ID
+ * @param {Object} [params] - 메시지 구간 파라미터
+ * @param {number} [params.limit] - 가져올 메시지 수 (기본값 50, 최대 100)
+ * @param {number} [params.before] - 이전 응답의 next_before (더 오래된 메시지)
  * @returns {Promise} 세션 상세 정보
  */
-export const getTalkSession = async (sessionId) => {
-  const response = await apiClient.get(`/talk/session/${sessionId}`);
+export const getTalkSession = async (sessionId, params = {}) => {
+  const response = await apiClient.get(`/talk/session/${sessionId}`, { params });
   return response.data;
 };
 
@@ -78,9 +173,13 @@ export const getTalkUsage = async () => {
  *         "id": "session_object_id",
  *         "sessionId": "uuid",
  *         "date": "2024-01-01T00:00:00",
- *         "updated_at": "2024-01-01T00:00:00"
+ *         "updated_at": "2024-01-01T00:00:00",
+ *         "level": "beginner|intermediate|advanced",
+ *         "message_count": 12
  *       }
- *     ]
+ *     ],
+ *     "next_cursor": "opaque-cursor|null",
+ *     "has_more": true
  *   }
  * }
  */
@@ -100,6 +199,9 @@ export const getTalkUsage = async () => {
  *         "emotion": {...}
  *       }
  *     ],
+ *     "total_messages": 240,
+ *     "next_before": 190,
+ *     "has_more": true,
  *     "level": "beginner|intermediate|advanced",
  *     "created_at": "2024-01-01T00:00:00",
  *     "updated_at": "2024-01-01T00:00:00"
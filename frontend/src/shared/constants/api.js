@@ -26,6 +26,8 @@ export const API_ENDPOINTS = {
   // Talk Like You Mean It
   TALK: {
     CHAT: '/talk/chat',
+    CHAT_STREAM: '/talk/chat/stream',
+    VOICE: '/talk/voice',
     SESSIONS: '/talk/sessions',
     SESSION: '/talk/session', // + /:sessionId
     USAGE: '/talk/usage',